@@ -22,6 +22,9 @@ setup(
     zip_safe=False,
     keywords="ethereum vyper",
     packages=find_packages(exclude=["tests", "tests.*"]),
+    entry_points={
+        "console_scripts": ["vvm=vvm.__main__:main"],
+    },
     classifiers=[
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
@@ -2,72 +2,8 @@
 
 import pytest
 from packaging.version import Version
-from requests import ConnectionError
 
-import vvm
-
-
-def pytest_addoption(parser):
-    parser.addoption(
-        "--no-install",
-        action="store_true",
-        help="Only run vvm tests against already installed vyper versions",
-    )
-    parser.addoption(
-        "--vyper-versions",
-        action="store",
-        help="Only run tests against a specific version(s) of vyper",
-    )
-
-
-def pytest_configure(config):
-    config.addinivalue_line("markers", "min_vyper: minimum version of vyper to run test against")
-    config.addinivalue_line("markers", "max_vyper: maximum version of vyper to run test against")
-
-
-def pytest_collection(session):
-    global VERSIONS
-    if session.config.getoption("--vyper-versions"):
-        VERSIONS = [Version(i) for i in session.config.getoption("--vyper-versions").split(",")]
-    elif session.config.getoption("--no-install"):
-        VERSIONS = vvm.get_installed_vyper_versions()
-    else:
-        try:
-            VERSIONS = vvm.get_installable_vyper_versions()
-        except ConnectionError:
-            raise pytest.UsageError(
-                "ConnectionError while attempting to get vyper versions.\n"
-                "Use the --no-install flag to only run tests against already installed versions."
-            )
-        for version in VERSIONS:
-            vvm.install_vyper(version)
-
-
-# auto-parametrize the vyper_version fixture with all target vyper versions
-def pytest_generate_tests(metafunc):
-    if "vyper_version" in metafunc.fixturenames:
-        versions = VERSIONS.copy()
-        for marker in metafunc.definition.iter_markers(name="min_vyper"):
-            versions = [i for i in versions if i >= Version(marker.args[0])]
-        for marker in metafunc.definition.iter_markers(name="max_vyper"):
-            versions = [i for i in versions if i <= Version(marker.args[0])]
-        metafunc.parametrize("vyper_version", versions, indirect=True)
-
-
-@pytest.fixture
-def vyper_version(request):
-    """
-    Run a test against all vyper versions.
-    """
-    version = request.param
-    vvm.set_vyper_version(version)
-    return version
-
-
-@pytest.fixture
-def latest_version():
-    global VERSIONS
-    return VERSIONS[0]
+pytest_plugins = ["vvm.pytest_plugin"]
 
 
 @pytest.fixture
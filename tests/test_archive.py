@@ -0,0 +1,110 @@
+import base64
+import io
+import json
+import subprocess
+import zipfile
+
+import pytest
+
+import vvm
+from vvm.archive import (
+    archive_hash,
+    build_archive,
+    compile_archive,
+    get_archive_version,
+    normalize_archive,
+)
+from vvm.exceptions import UnknownOption
+
+UTIL_SOURCE = """
+@internal
+def bar() -> uint256:
+    return 42
+"""
+
+FOO_SOURCE = """
+import lib.util as util
+
+@external
+def foo() -> uint256:
+    return util.bar()
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    tmp_path.joinpath("lib").mkdir()
+    tmp_path.joinpath("lib/util.vy").write_text(UTIL_SOURCE)
+    tmp_path.joinpath("Foo.vy").write_text(FOO_SOURCE)
+    return tmp_path
+
+
+@pytest.mark.min_vyper("0.4.0")
+def test_build_is_deterministic(project, vyper_version, monkeypatch):
+    monkeypatch.chdir(project)
+    archive = build_archive("Foo.vy")
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        assert {"Foo.vy", "lib/util.vy", "MANIFEST/compiler_version"} <= set(zf.namelist())
+    assert build_archive("Foo.vy") == archive
+    assert get_archive_version(archive) == vyper_version
+
+
+@pytest.mark.min_vyper("0.4.0")
+def test_archive_hash(project, vyper_binary, monkeypatch):
+    monkeypatch.chdir(project)
+    archive = build_archive("Foo.vy")
+    raw = subprocess.check_output([vyper_binary, "-f", "archive", "Foo.vy"])
+
+    # timestamps and compression do not change the hash, contents do
+    assert archive_hash(raw) == archive_hash(archive)
+    assert normalize_archive(archive) == archive
+    project.joinpath("lib/util.vy").write_text(UTIL_SOURCE.replace("42", "43"))
+    assert archive_hash(build_archive("Foo.vy")) != archive_hash(archive)
+
+
+@pytest.mark.min_vyper("0.4.0")
+def test_compile_without_sources(project, tmp_path_factory, vyper_version, monkeypatch):
+    monkeypatch.chdir(project)
+    expected = vvm.compile_files("Foo.vy")["Foo.vy"]
+    archive = build_archive("Foo.vy")
+
+    monkeypatch.chdir(tmp_path_factory.mktemp("empty"))
+    output = compile_archive(archive)
+    assert list(output) == ["Foo.vy"]
+    assert output["Foo.vy"]["bytecode"] == expected["bytecode"]
+    abi = json.loads(compile_archive(archive, output_format="abi"))
+    assert abi[0]["name"] == "foo"
+
+
+@pytest.mark.min_vyper("0.4.0")
+def test_settings_are_stored(project, vyper_version, monkeypatch):
+    monkeypatch.chdir(project)
+    archive = build_archive("Foo.vy", evm_version="paris")
+    expected = vvm.compile_files("Foo.vy", evm_version="paris")["Foo.vy"]
+    assert compile_archive(archive)["Foo.vy"]["bytecode"] == expected["bytecode"]
+
+
+@pytest.mark.max_vyper("0.3.99")
+def test_unsupported_version(foo_path, vyper_version):
+    with pytest.raises(UnknownOption):
+        build_archive(foo_path)
+
+
+def test_invalid_archive():
+    with pytest.raises(ValueError):
+        compile_archive("not an archive")
+
+
+def test_archive_path_as_str(tmp_path):
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as zf:
+        zf.writestr("Foo.vy", FOO_SOURCE)
+    data = output.getvalue()
+    path = tmp_path.joinpath("foo.zip")
+    path.write_bytes(data)
+
+    assert archive_hash(str(path)) == archive_hash(path) == archive_hash(data)
+    assert archive_hash(base64.b64encode(data).decode()) == archive_hash(data)
+    path.write_bytes(base64.b64encode(data))
+    assert normalize_archive(str(path)) == normalize_archive(data)
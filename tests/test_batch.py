@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from vvm import wrapper
+from vvm.batch import CompileBatcher
+from vvm.exceptions import VyperError
+
+
+@pytest.fixture
+def call_count(monkeypatch):
+    calls = []
+    vyper_wrapper = wrapper.vyper_wrapper
+
+    def counting_wrapper(**kwargs):
+        calls.append(kwargs)
+        return vyper_wrapper(**kwargs)
+
+    monkeypatch.setattr(wrapper, "vyper_wrapper", counting_wrapper)
+    return calls
+
+
+def test_concurrent_requests_are_merged(foo_source, vyper_version, call_count):
+    with CompileBatcher(max_delay=0.5, max_batch_size=4) as batcher:
+        with ThreadPoolExecutor(4) as executor:
+            futures = [
+                executor.submit(batcher.compile_source, foo_source, f"Foo{i}.vy") for i in range(4)
+            ]
+            results = [i.result() for i in futures]
+
+    assert len(call_count) == 1
+    for i, result in enumerate(results):
+        assert list(result["contracts"]) == [f"Foo{i}.vy"]
+        assert result["contracts"][f"Foo{i}.vy"][f"Foo{i}"]["evm"]["bytecode"]["object"]
+
+
+def test_errors_are_split(foo_source, vyper_version):
+    bad_source = foo_source.replace("return 13", "return x")
+    with CompileBatcher(max_delay=0.5) as batcher:
+        good = batcher.submit(foo_source, "Good.vy")
+        bad = batcher.submit(bad_source, "Bad.vy")
+
+        assert "Good.vy" in good.result()["contracts"]
+        with pytest.raises(VyperError) as excinfo:
+            bad.result()
+
+    assert excinfo.value.error_dict[0]["sourceLocation"]["file"] == "Bad.vy"
+
+
+def test_submit_after_close(vyper_version):
+    batcher = CompileBatcher()
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit("")
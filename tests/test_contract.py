@@ -0,0 +1,58 @@
+import pickle
+
+import pytest
+from packaging.version import Version
+
+import vvm
+from vvm.contract import CompiledContract, from_combined_json, from_standard_json
+
+
+def test_lazy_bytecode_decoding():
+    contract = CompiledContract("Foo", bytecode="0x6001", bytecode_runtime="6002")
+    assert contract._bytecode == "0x6001"
+
+    assert contract.bytecode == b"\x60\x01"
+    assert contract.bytecode_runtime == b"\x60\x02"
+    assert contract._bytecode is contract.bytecode
+    assert contract.bytecode_hex == "0x6001"
+    assert contract.bytecode_runtime_hex == "0x6002"
+
+
+def test_pickle_roundtrip():
+    contract = CompiledContract("Foo", abi=[{"type": "function"}], bytecode="0x6001")
+    assert not hasattr(contract, "__dict__")
+
+    restored = pickle.loads(pickle.dumps(contract))
+    assert restored._bytecode == "0x6001"
+    assert restored == contract
+
+    assert contract.bytecode == b"\x60\x01"
+    restored = pickle.loads(pickle.dumps(contract))
+    assert restored._bytecode == b"\x60\x01"
+    assert restored == contract
+
+
+def test_from_combined_json(foo_source, vyper_version):
+    if Version("0.4.0b1") <= vyper_version <= Version("0.4.0b5"):
+        pytest.skip("vyper 0.4.0b1 to 0.4.0b5 have a bug with combined_json")
+    output = vvm.compile_source(foo_source)
+    contract = from_combined_json(output)["<stdin>"]
+
+    assert contract.bytecode == bytes.fromhex(output["<stdin>"]["bytecode"][2:])
+    assert contract.bytecode_runtime
+    assert contract.abi == output["<stdin>"]["abi"]
+    assert "bytecode" not in contract.extra
+
+
+def test_from_standard_json(input_json, foo_source):
+    input_json["sources"] = {"contracts/Foo.vy": {"content": foo_source}}
+    input_json["settings"]["outputSelection"] = {
+        "*": {"*": ["abi", "evm.bytecode.object", "evm.deployedBytecode.object"]}
+    }
+    output = vvm.compile_standard(input_json)
+    contract = from_standard_json(output)["contracts/Foo.vy"]["Foo"]
+
+    expected = output["contracts"]["contracts/Foo.vy"]["Foo"]["evm"]["bytecode"]["object"]
+    assert contract.bytecode_hex == expected
+    assert contract.name == "Foo"
+    assert contract.abi
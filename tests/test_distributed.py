@@ -0,0 +1,94 @@
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import vvm
+from vvm.client import VvmClient
+from vvm.distributed import DistributedExecutor
+from vvm.exceptions import VyperError, VyperNotInstalled, WorkerError
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_worker():
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "vvm", "serve", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    client = VvmClient(port=port, timeout=60)
+    for _ in range(100):
+        try:
+            client.get_installed_vyper_versions()
+            return proc, client
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("worker did not start")
+
+
+@pytest.fixture
+def workers():
+    workers = [_start_worker() for _ in range(2)]
+    yield workers
+    for proc, _ in workers:
+        proc.kill()
+        proc.wait()
+
+
+def test_distributed_compile(workers, foo_source, vyper_version):
+    with DistributedExecutor([i[1] for i in workers], slots=2) as executor:
+        assert executor.installed_versions() == vvm.get_installed_vyper_versions()
+
+        jobs = [("compile_source", {"source": foo_source, "vyper_version": vyper_version})] * 6
+        results = list(executor.map(jobs))
+
+    expected = vvm.compile_source(foo_source, vyper_version=vyper_version)
+    assert len(results) == 6
+    assert all(future.result() == expected for _, future in results)
+
+
+def test_retry_on_worker_failure(workers, foo_source, vyper_version):
+    dead_client = VvmClient(port=_free_port())
+    with DistributedExecutor([i[1] for i in workers] + [dead_client]) as executor:
+        assert dead_client not in executor.workers
+
+        # kill a worker after the inventory was taken
+        workers[0][0].kill()
+        workers[0][0].wait()
+        futures = [
+            executor.compile_source(foo_source, vyper_version=vyper_version) for _ in range(4)
+        ]
+        assert all("<stdin>" in i.result() for i in futures)
+        assert executor.workers == [workers[1][1]]
+
+
+def test_errors(workers, foo_source, vyper_version):
+    with DistributedExecutor([i[1] for i in workers]) as executor:
+        bad_source = foo_source.replace("return 13", "return x")
+        with pytest.raises(VyperError):
+            executor.compile_source(bad_source, vyper_version=vyper_version).result()
+        with pytest.raises(VyperNotInstalled):
+            executor.compile_source(foo_source, vyper_version="0.0.1").result()
+
+
+def test_all_workers_failed(workers, foo_source, vyper_version):
+    with DistributedExecutor([i[1] for i in workers]) as executor:
+        for proc, _ in workers:
+            proc.kill()
+            proc.wait()
+        with pytest.raises(WorkerError) as exc:
+            executor.compile_source(foo_source, vyper_version=vyper_version).result()
+        assert isinstance(exc.value.__cause__, OSError)
+
+        # later jobs are not reported as a missing version
+        with pytest.raises(WorkerError):
+            executor.compile_source(foo_source, vyper_version=vyper_version).result()
@@ -0,0 +1,94 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from vvm import install
+from vvm.exceptions import DownloadError
+
+PAYLOAD = bytes(range(256)) * 4096
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    # each entry of `responses` is used for one request: "drop" sends half of
+    # the requested data and closes the connection, an int is a status code,
+    # and None serves the (ranged) payload
+    responses: list = []
+    requests: list = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        self.requests.append(range_header)
+        action = self.responses.pop(0) if self.responses else None
+
+        if isinstance(action, int):
+            self.send_response(action)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        offset = int(range_header[6:-1]) if range_header else 0
+        data = PAYLOAD[offset:]
+        self.send_response(206 if offset else 200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if action == "drop":
+            self.wfile.write(data[: len(data) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(install, "DOWNLOAD_BACKOFF", 0)
+    monkeypatch.setattr(FlakyHandler, "responses", [])
+    monkeypatch.setattr(FlakyHandler, "requests", [])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/vyper"
+    server.shutdown()
+    server.server_close()
+
+
+def test_resume_dropped_download(server, tmp_path):
+    FlakyHandler.responses = ["drop", "drop"]
+    path = tmp_path.joinpath("vyper-0.4.0")
+
+    install._download_vyper(server, {}, False, path)
+
+    assert path.read_bytes() == PAYLOAD
+    assert not tmp_path.joinpath(".vyper-0.4.0.part").exists()
+    half, quarter = len(PAYLOAD) // 2, len(PAYLOAD) // 4
+    assert FlakyHandler.requests == [None, f"bytes={half}-", f"bytes={half + quarter}-"]
+
+
+def test_retry_server_error(server, tmp_path):
+    FlakyHandler.responses = [503, 502]
+    path = tmp_path.joinpath("vyper-0.4.0")
+
+    install._download_vyper(server, {}, False, path)
+
+    assert path.read_bytes() == PAYLOAD
+    assert len(FlakyHandler.requests) == 3
+
+
+def test_retries_exhausted(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(install, "DOWNLOAD_RETRIES", 2)
+    FlakyHandler.responses = [503] * 3
+
+    with pytest.raises(DownloadError):
+        install._download_vyper(server, {}, False, tmp_path.joinpath("vyper-0.4.0"))
+    assert len(FlakyHandler.requests) == 3
+
+
+def test_not_found_is_not_retried(server, tmp_path):
+    FlakyHandler.responses = [404]
+
+    with pytest.raises(DownloadError, match="404"):
+        install._download_vyper(server, {}, False, tmp_path.joinpath("vyper-0.4.0"))
+    assert len(FlakyHandler.requests) == 1
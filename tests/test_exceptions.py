@@ -0,0 +1,131 @@
+import pickle
+
+import pytest
+
+import vvm
+from vvm import exceptions
+from vvm.exceptions import VyperError
+from vvm.utils.diagnostics import Diagnostic, from_standard_json, from_stderr
+
+STDERR_03 = (
+    "vyper.exceptions.UndeclaredDefinition: 'x' has not been declared. \n"
+    '  contract "contracts/Foo.vy:3", function "foo", line 3:11 \n'
+    "       2 def foo() -> uint256:\n"
+    "  ---> 3     return x\n"
+    "  ------------------^\n"
+    "       4\n\n"
+)
+
+STDERR_02 = (
+    "Traceback (most recent call last):\n"
+    '  File "vyper/cli/vyper_compile.py", line 121, in _parse_args\n'
+    "vyper.exceptions.StructureException: line 1:0 Invalid top-level statement\n"
+)
+
+STANDARD_JSON_ERRORS = [
+    {
+        "component": "compiler",
+        "formattedMessage": "'x' has not been declared.\n\n"
+        '  contract "Foo.vy:3", function "foo", line 3:11 \n',
+        "message": "'x' has not been declared.",
+        "severity": "error",
+        "sourceLocation": {"file": "Foo.vy"},
+        "type": "UndeclaredDefinition",
+    }
+]
+
+
+@pytest.fixture
+def max_length(monkeypatch, tmp_path):
+    monkeypatch.setattr(exceptions, "MAX_DATA_LENGTH", 100)
+    monkeypatch.setattr(exceptions, "SPILL_DIRECTORY", str(tmp_path))
+    yield 100
+
+
+def test_diagnostics_from_stderr():
+    assert from_stderr(STDERR_03) == [
+        Diagnostic(
+            "contracts/Foo.vy", 3, 11, "error", "UndeclaredDefinition", "'x' has not been declared."
+        )
+    ]
+
+
+def test_diagnostics_from_stderr_location_prefix():
+    assert from_stderr(STDERR_02) == [
+        Diagnostic(None, 1, 0, "error", "StructureException", "Invalid top-level statement")
+    ]
+
+
+def test_diagnostics_from_unknown_stderr():
+    assert from_stderr("something went wrong\n\n") == [
+        Diagnostic(None, None, None, "error", None, "something went wrong")
+    ]
+    assert from_stderr("") == []
+
+
+def test_diagnostics_from_standard_json():
+    diagnostic = from_standard_json(STANDARD_JSON_ERRORS)[0]
+    assert diagnostic == Diagnostic(
+        "Foo.vy", 3, 11, "error", "UndeclaredDefinition", "'x' has not been declared."
+    )
+    assert str(diagnostic) == "Foo.vy:3:11: error: UndeclaredDefinition: 'x' has not been declared."
+
+
+def test_error_diagnostics():
+    assert VyperError(stderr_data=STDERR_03).diagnostics[0].line == 3
+    error = VyperError(stderr_data=STDERR_03, error_dict=STANDARD_JSON_ERRORS)
+    assert error.diagnostics[0].file == "Foo.vy"
+
+
+def test_small_output_not_spilled(max_length, tmp_path):
+    error = VyperError(stdin_data="a" * 100, stderr_data="error")
+    assert error.stdin_data == "a" * 100
+    assert error._spill_path is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_large_output_spilled(max_length, tmp_path):
+    stdin = "".join(str(i % 10) for i in range(1000))
+    error = VyperError(stdin_data=stdin, stdout_data="b" * 500, stderr_data="error")
+
+    assert error._data["stdin_data"].startswith(stdin[:50])
+    assert "[900 characters truncated]" in error._data["stdin_data"]
+    assert error._data["stderr_data"] == "error"
+    assert "[400 characters truncated]" in str(error)
+
+    assert error.stdin_data == stdin
+    assert error.stdout_data == "b" * 500
+    assert error.stderr_data == "error"
+
+    path = error._spill_path
+    assert path.parent == tmp_path
+    del error
+    assert not path.exists()
+
+
+def test_spill_file_removed(max_length):
+    error = VyperError(stdin_data="a" * 500)
+    error._spill_path.unlink()
+    assert "[400 characters truncated]" in error.stdin_data
+
+
+def test_set_output(max_length):
+    error = VyperError(stdin_data="a" * 500)
+    error.stdin_data = "b"
+    assert error.stdin_data == "b"
+    error.stdout_data = "c" * 500
+    assert error.stdout_data == "c" * 500
+
+
+def test_pickle(max_length):
+    error = vvm.exceptions.VyperTimeoutError(
+        "timed out", command=["vyper"], stdin_data="a" * 500, error_dict=STANDARD_JSON_ERRORS
+    )
+    restored = pickle.loads(pickle.dumps(error))
+
+    assert type(restored) is vvm.exceptions.VyperTimeoutError
+    assert restored.message == "timed out"
+    assert restored.command == ["vyper"]
+    assert restored.stdin_data == "a" * 500
+    assert restored._spill_path != error._spill_path
+    assert restored.diagnostics == error.diagnostics
@@ -0,0 +1,72 @@
+import pytest
+
+import vvm
+from vvm.__main__ import main
+from vvm.history import CompileHistory, HistoryEntry
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = CompileHistory(tmp_path.joinpath("history.db"))
+    yield history
+    history.close()
+
+
+def _entry(build, contract, duration, bytecode_size):
+    return HistoryEntry(build, 0, contract, "0.4.0", {}, duration, 100, bytecode_size, 1)
+
+
+def test_record_compile_source(history, foo_source, vyper_version):
+    with history.record(build="a"):
+        vvm.compile_source(foo_source)
+        vvm.compile_source(foo_source + "\n", contract_name="Foo")
+    vvm.compile_source(foo_source)
+
+    entries = history.entries()
+    assert len(entries) == 2
+    assert entries[0].build == "a"
+    # the name does not depend on the source, so changes can be compared
+    assert sorted(i.contract for i in entries) == ["<stdin>", "Foo"]
+    assert entries[0].compiler_version == str(vyper_version)
+    assert entries[0].bytecode_size > 0
+    assert entries[0].flags["f"] == "combined_json"
+
+
+def test_record_compile_standard(history, input_json, foo_source, vyper_version):
+    input_json["sources"] = {"contracts/Foo.vy": {"content": foo_source}}
+    with history.record(build="a"):
+        vvm.compile_standard(input_json)
+
+    entries = history.entries(compiler_version=vyper_version)
+    assert [i.contract for i in entries] == ["contracts/Foo.vy:Foo"]
+    assert entries[0].flags["standard_json"] is True
+
+
+def test_compare(history):
+    history.add(
+        [
+            _entry("a", "Foo", 1.0, 100),
+            _entry("a", "Bar", 1.0, 100),
+            _entry("b", "Foo", 2.0, 100),
+            _entry("b", "Bar", 1.05, 120),
+        ]
+    )
+
+    regressions = history.compare("a", "b")
+    assert [(i.contract, i.metric) for i in regressions] == [
+        ("Foo", "duration"),
+        ("Bar", "bytecode_size"),
+    ]
+    assert regressions[0].change == 1.0
+    assert history.compare("a", "b", time_threshold=2, size_threshold=50) == []
+
+
+def test_cli_report(history, capsys):
+    history.add([_entry("a", "Foo", 1.0, 100), _entry("b", "Foo", 1.0, 200)])
+
+    with pytest.raises(SystemExit):
+        main(["history", str(history.path), "a", "b"])
+    assert "Foo: bytecode size 100 -> 200" in capsys.readouterr().out
+
+    main(["history", str(history.path), "b", "a"])
+    assert "No regressions" in capsys.readouterr().out
@@ -0,0 +1,130 @@
+import pytest
+
+import vvm
+from vvm.index import ArtifactIndex, abi_signature
+from vvm.utils.keccak import keccak256
+
+TOKEN_SOURCE = """
+event Transfer:
+    sender: indexed(address)
+    receiver: indexed(address)
+    amount: uint256
+
+struct Point:
+    x: uint256
+    y: address
+
+@external
+def transfer(receiver: address, amount: uint256) -> bool:
+    log Transfer(msg.sender, receiver, amount)
+    return True
+
+@external
+def move(p: Point, q: DynArray[Point, 3]) -> uint256:
+    return p.x
+"""
+
+OTHER_SOURCE = """
+@external
+def transfer(receiver: address, amount: uint256) -> bool:
+    return True
+"""
+
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ArtifactIndex(tmp_path.joinpath("index.db"))
+    yield index
+    index.close()
+
+
+def test_keccak():
+    assert keccak256(b"").hex() == (
+        "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+    )
+    assert keccak256(b"a" * 300).hex() == (
+        "5b7e0e47a96f32a88b4f14ca177982790807c40e1a105742ba0fc1babe1ef826"
+    )
+
+
+def test_abi_signature():
+    item = {
+        "name": "move",
+        "inputs": [
+            {"type": "tuple", "components": [{"type": "uint256"}, {"type": "address"}]},
+            {"type": "tuple[]", "components": [{"type": "uint256"}, {"type": "address"}]},
+        ],
+    }
+    assert abi_signature(item) == "move((uint256,address),(uint256,address)[])"
+
+
+@pytest.mark.min_vyper("0.3.8")
+def test_lookups(index, vyper_version):
+    token = vvm.compile_source(TOKEN_SOURCE, vyper_version=vyper_version)
+    index.add_output(token, vyper_version, "Token")
+    index.add_output(
+        vvm.compile_source(OTHER_SOURCE, vyper_version=vyper_version), vyper_version, "Other"
+    )
+
+    matches = index.find_selector("0xa9059cbb")
+    assert [i.contract for i in matches] == ["Other", "Token"]
+    assert matches[0].signature == "transfer(address,uint256)"
+    assert matches[0].compiler_version == str(vyper_version)
+
+    (event,) = index.find_topic(TRANSFER_TOPIC)
+    assert event.contract == "Token"
+    assert event.kind == "event"
+    assert event.signature == "Transfer(address,address,uint256)"
+
+    (move,) = index.find_signature("move((uint256,address),(uint256,address)[])")
+    assert move.selector == token["<stdin>"]["method_identifiers"][move.signature]
+
+    assert index.find_interface(["transfer(address,uint256)"]) == [
+        ("Other", str(vyper_version)),
+        ("Token", str(vyper_version)),
+    ]
+    assert index.find_interface(token["<stdin>"]["abi"]) == [("Token", str(vyper_version))]
+
+
+def test_replace_and_remove(index):
+    abi = [{"type": "function", "name": "foo", "inputs": []}]
+    index.add("Foo", "0.4.0", abi)
+    index.add("Foo", "0.4.0", [{"type": "function", "name": "bar", "inputs": []}])
+    assert index.find_signature("foo()") == []
+    assert [i.contract for i in index.find_signature("bar()")] == ["Foo"]
+
+    index.add("Foo", "0.3.10", abi)
+    index.remove("Foo", "0.4.0")
+    assert index.contracts() == [("Foo", "0.3.10")]
+    index.remove("Foo")
+    assert index.contracts() == []
+
+
+def test_standard_json(index, input_json, foo_source, vyper_version):
+    input_json["sources"]["contracts/Foo.vy"] = {"content": foo_source}
+    input_json["settings"]["outputSelection"] = {"*": {"*": ["abi", "evm.methodIdentifiers"]}}
+    with index.record():
+        vvm.compile_standard(input_json, vyper_version=vyper_version)
+
+    (match,) = index.find_signature("foo()")
+    assert match.contract in ("contracts/Foo.vy:Foo", "contracts/Foo.vy:contracts/Foo.vy")
+    assert match.compiler_version == str(vyper_version)
+    assert match.selector == f"0x{keccak256(b'foo()')[:4].hex()}"
+
+
+def test_persisted(tmp_path, foo_path, vyper_version):
+    index = ArtifactIndex(tmp_path.joinpath("index.db"))
+    with index.record():
+        vvm.compile_files([foo_path], vyper_version=vyper_version)
+    index.close()
+
+    index = ArtifactIndex(tmp_path.joinpath("index.db"))
+    assert [i.signature for i in index.find_selector(keccak256(b"foo()")[:4])] == ["foo()"]
+    index.close()
+
+
+def test_invalid_selector(index):
+    with pytest.raises(ValueError):
+        index.find_selector("0xa9059c")
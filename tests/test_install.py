@@ -1,6 +1,83 @@
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from packaging.version import Version
+
 import vvm
 
 
 def test_get_installed_vyper_versions(vyper_version):
     assert "exe" not in str(vyper_version)
     assert vyper_version in vvm.install.get_installed_vyper_versions()
+
+
+@pytest.fixture
+def shared_folder(tmp_path, monkeypatch):
+    shared = tmp_path.joinpath("shared")
+    overlay = tmp_path.joinpath("overlay")
+    shared.mkdir()
+    overlay.mkdir()
+    for folder, version in [(shared, "0.3.1"), (shared, "0.3.2"), (overlay, "0.3.2")]:
+        folder.joinpath(f"vyper-{version}").write_bytes(b"")
+
+    monkeypatch.delenv(vvm.install.VVM_BINARY_PATH_VARIABLE, raising=False)
+    monkeypatch.setenv(
+        vvm.install.VVM_SHARED_BINARY_PATHS_VARIABLE,
+        os.pathsep.join([str(tmp_path.joinpath("missing")), str(shared)]),
+    )
+    return shared, overlay
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="binaries have an .exe suffix")
+def test_shared_folders(shared_folder):
+    shared, overlay = shared_folder
+
+    assert vvm.install.get_vvm_install_folders(overlay) == [shared, overlay]
+    assert vvm.get_installed_vyper_versions(overlay) == [Version("0.3.2"), Version("0.3.1")]
+    # shared folders are searched first
+    assert vvm.install.get_executable("0.3.2", overlay) == shared.joinpath("vyper-0.3.2")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="binaries have an .exe suffix")
+def test_install_links_shared_binary(shared_folder):
+    shared, overlay = shared_folder
+
+    assert vvm.install_vyper("0.3.1", vvm_binary_path=overlay) == Version("0.3.1")
+    assert os.path.samefile(overlay.joinpath("vyper-0.3.1"), shared.joinpath("vyper-0.3.1"))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="binaries have an .exe suffix")
+def test_using_version(shared_folder):
+    shared, overlay = shared_folder
+    default = vvm.install.get_executable()
+
+    with vvm.using_version("0.3.1", overlay) as vyper_binary:
+        assert vyper_binary == shared.joinpath("vyper-0.3.1")
+        assert vvm.install.get_executable() == vyper_binary
+        with vvm.using_version("0.3.2", overlay):
+            assert vvm.install.get_executable() == shared.joinpath("vyper-0.3.2")
+        assert vvm.install.get_executable() == vyper_binary
+
+        # other threads are not affected
+        with ThreadPoolExecutor(1) as executor:
+            assert executor.submit(vvm.install.get_executable).result() == default
+
+    assert vvm.install.get_executable() == default
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="binaries have an .exe suffix")
+def test_using_version_asyncio(shared_folder):
+    shared, overlay = shared_folder
+
+    async def get_executable(version):
+        with vvm.using_version(version, overlay):
+            await asyncio.sleep(0.01)
+            return vvm.install.get_executable()
+
+    async def main():
+        return await asyncio.gather(get_executable("0.3.1"), get_executable("0.3.2"))
+
+    assert asyncio.run(main()) == [shared.joinpath("vyper-0.3.1"), shared.joinpath("vyper-0.3.2")]
@@ -0,0 +1,37 @@
+from packaging.specifiers import SpecifierSet
+
+import vvm
+from vvm.exceptions import VyperNotInstalled
+from vvm.matrix import compile_version_matrix
+
+
+def test_pragma_selects_versions(foo_source, vyper_version):
+    results = compile_version_matrix(foo_source)
+
+    assert [i.version for i in results] == [vyper_version]
+    assert results[0].success
+    assert results[0].bytecode_size > results[0].bytecode_runtime_size > 0
+    assert results[0].compile_time > 0
+
+
+def test_all_installed_versions(foo_source, vyper_version):
+    installed = vvm.get_installed_vyper_versions()
+    results = compile_version_matrix(foo_source, SpecifierSet(), max_workers=2)
+
+    assert [i.version for i in results] == installed
+    assert next(i for i in results if i.version == vyper_version).success
+    for result in results:
+        assert result.success is (result.error is None)
+
+
+def test_evm_versions(foo_source, vyper_version):
+    results = compile_version_matrix(foo_source, [vyper_version], evm_versions=[None, "invalid"])
+
+    assert [(i.evm_version, i.success) for i in results] == [(None, True), ("invalid", False)]
+
+
+def test_not_installed():
+    results = compile_version_matrix("", ["0.0.1"])
+
+    assert not results[0].success
+    assert isinstance(results[0].error, VyperNotInstalled)
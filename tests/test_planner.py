@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from packaging.version import Version
+
+import vvm
+from vvm import scheduler
+from vvm.__main__ import main
+from vvm.exceptions import VyperError
+from vvm.history import CompileHistory, HistoryEntry
+from vvm.planner import STARTUP_COST, execute_plan, plan_build
+
+VERSION = Version("0.4.0")
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = CompileHistory(tmp_path.joinpath("history.db"))
+    yield history
+    history.close()
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = []
+    for i in range(6):
+        path = f"C{i}.vy"
+        tmp_path.joinpath(path).write_text(f"@external\ndef f() -> uint256:\n    return {i}\n")
+        paths.append(path)
+    return paths
+
+
+def _entry(contract, duration):
+    return HistoryEntry(None, 0, contract, str(VERSION), {}, duration, 100, 100, 1)
+
+
+def test_longest_first(files, history):
+    history.add([_entry(path, duration) for path, duration in zip(files, [5, 4, 3, 3, 2, 2])])
+    plan = plan_build(files, vyper_version=VERSION, max_workers=2, history=history, group=False)
+
+    assert plan.estimates == dict(zip(files, [5, 4, 3, 3, 2, 2]))
+    assert [[job.source_files for job in worker] for worker in plan.workers] == [
+        [["C0.vy"], ["C3.vy"], ["C5.vy"]],
+        [["C1.vy"], ["C2.vy"], ["C4.vy"]],
+    ]
+    assert plan.makespan == 10
+    assert plan.serial_duration == 19
+    assert plan.cached == []
+
+
+def test_group_short_jobs(files, history):
+    history.add([_entry(path, 10 if path == "C0.vy" else 0.4) for path in files])
+    plan = plan_build(files, vyper_version=VERSION, max_workers=2, history=history)
+
+    # the long job runs alone, the others share a single process
+    assert [job.source_files for job in plan.jobs] == [["C0.vy"], files[1:]]
+    assert plan.jobs[1].estimate < sum(plan.estimates[i] for i in files[1:])
+    plan = plan_build(files, vyper_version=VERSION, history=history, group=False)
+    assert all(len(job.source_files) == 1 for job in plan.jobs)
+
+
+def test_size_estimate(files, tmp_path):
+    tmp_path.joinpath("C0.vy").write_text("# padding\n" * 1000)
+    plan = plan_build(files, vyper_version=VERSION)
+    assert plan.estimates["C0.vy"] > plan.estimates["C1.vy"] > STARTUP_COST
+
+
+def test_execute(files, history, vyper_version):
+    plan = plan_build(files, vyper_version=vyper_version, max_workers=2)
+    with history.record():
+        output = execute_plan(plan)
+
+    assert list(output) == files
+    assert output["C1.vy"]["bytecode"] == vvm.compile_files(["C1.vy"])["C1.vy"]["bytecode"]
+    assert {i.contract for i in history.entries()} == set(files)
+
+
+def test_execute_error(files, tmp_path, vyper_version):
+    tmp_path.joinpath("C2.vy").write_text("x: = 1\n")
+    plan = plan_build(files, vyper_version=vyper_version, max_workers=1)
+    assert len(plan.jobs) == 1
+
+    with pytest.raises(VyperError, match="C2.vy"):
+        execute_plan(plan)
+
+
+def test_cli(files, tmp_path, capsys, vyper_version):
+    main(["build", *files, "--vyper-version", str(vyper_version), "--dry-run"])
+    out = capsys.readouterr().out
+    assert "Predicted makespan" in out
+    assert not tmp_path.joinpath("out.json").exists()
+
+    main(["build", *files, "--vyper-version", str(vyper_version), "--output", "out.json"])
+    assert list(json.loads(tmp_path.joinpath("out.json").read_text())) == files
+
+
+def test_cli_adaptive(files, tmp_path, vyper_version):
+    args = ["build", *files, "--vyper-version", str(vyper_version), "--output", "out.json"]
+    main(args + ["--adaptive"])
+    assert list(json.loads(tmp_path.joinpath("out.json").read_text())) == files
+    assert scheduler.get_scheduler() is None
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+from packaging.version import Version
+
+from vvm import install
+from vvm.utils.lock import binary_in_use, get_process_lock
+
+
+@pytest.fixture
+def install_folder(tmp_path, monkeypatch):
+    monkeypatch.delenv(install.VVM_BINARY_PATH_VARIABLE, raising=False)
+    monkeypatch.setattr(install, "_default_vyper_binary", None)
+    monkeypatch.setattr(install, "_last_use", {})
+    for i, version in enumerate(["0.3.1", "0.3.2", "0.3.3"]):
+        path = install._get_binary_path(tmp_path, Version(version))
+        path.write_bytes(b"\0" * 10)
+        # 0.3.1 is the least recently used
+        os.utime(path, (1000 + i, 1000 + i))
+    return tmp_path
+
+
+def _installed(path):
+    return [str(i) for i in install.get_installed_vyper_versions(path)]
+
+
+def test_prune_lru(install_folder):
+    removed = install.prune(max_bytes=15, vvm_binary_path=install_folder)
+
+    assert removed == [Version("0.3.1"), Version("0.3.2")]
+    assert _installed(install_folder) == ["0.3.3"]
+
+
+def test_get_executable_updates_last_use(install_folder):
+    install.get_executable("0.3.1", install_folder)
+
+    assert install.prune(max_bytes=20, vvm_binary_path=install_folder) == [Version("0.3.2")]
+
+
+def test_keep_and_dry_run(install_folder):
+    removed = install.prune(keep=2, vvm_binary_path=install_folder, dry_run=True)
+
+    assert removed == [Version("0.3.1")]
+    assert len(_installed(install_folder)) == 3
+
+
+def test_active_and_locked_versions_are_kept(install_folder, monkeypatch):
+    active = install._get_binary_path(install_folder, Version("0.3.1"))
+    monkeypatch.setattr(install, "_default_vyper_binary", active)
+
+    with get_process_lock("0.3.2"):
+        removed = install.prune(vvm_binary_path=install_folder)
+
+    assert removed == [Version("0.3.3")]
+    assert _installed(install_folder) == ["0.3.2", "0.3.1"]
+
+
+def test_versions_in_use_are_kept(install_folder):
+    in_use = install._get_binary_path(install_folder, Version("0.3.1"))
+
+    with binary_in_use(in_use):
+        removed = install.prune(vvm_binary_path=install_folder)
+
+    assert removed == [Version("0.3.2"), Version("0.3.3")]
+    assert _installed(install_folder) == ["0.3.1"]
+
+
+def test_linked_versions_are_kept(install_folder, tmp_path_factory):
+    shared = tmp_path_factory.mktemp("shared")
+    shared_binary = install._get_binary_path(shared, Version("0.3.0"))
+    shared_binary.write_bytes(b"\0" * 10)
+    linked = install._get_binary_path(install_folder, Version("0.3.0"))
+    os.link(shared_binary, linked)
+    os.utime(linked, (0, 0))
+
+    removed = install.prune(max_bytes=20, vvm_binary_path=install_folder)
+
+    assert removed == [Version("0.3.1")]
+    assert linked.exists()
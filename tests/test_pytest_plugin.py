@@ -0,0 +1,100 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from packaging.version import Version
+
+import vvm
+from vvm import pytest_plugin
+from vvm.pytest_plugin import CompileCache
+
+pytest_plugins = ["pytester"]
+
+# pytester changes the home directory, so the install folder is found beforehand
+INSTALL_FOLDER = vvm.get_vvm_install_folder()
+
+
+@pytest.fixture
+def pytester(pytester, monkeypatch):
+    monkeypatch.setenv("VVM_BINARY_PATH", str(INSTALL_FOLDER))
+    yield pytester
+
+
+def test_parametrize_installed_versions(pytester):
+    pytester.makepyfile(
+        """
+        import vvm
+
+        def test_version(vyper_version, vyper_binary):
+            assert vvm.get_vyper_version() == vyper_version
+            assert vyper_binary == vvm.install.get_executable(vyper_version)
+        """
+    )
+    result = pytester.runpytest("-p", "vvm.pytest_plugin")
+    result.assert_outcomes(passed=len(vvm.get_installed_vyper_versions()))
+
+
+def test_version_markers(pytester):
+    versions = vvm.get_installed_vyper_versions()
+    pytester.makepyfile(
+        f"""
+        import pytest
+
+        @pytest.mark.min_vyper("{versions[0]}")
+        def test_latest(vyper_version, latest_version):
+            assert vyper_version == latest_version
+
+        @pytest.mark.max_vyper("0.0.1")
+        def test_none(vyper_version):
+            pass
+        """
+    )
+    result = pytester.runpytest("-p", "vvm.pytest_plugin")
+    result.assert_outcomes(passed=1, skipped=1)
+
+
+def test_active_version_restored(pytester):
+    pytester.makepyfile(
+        """
+        import vvm
+
+        def test_version(vyper_version):
+            pass
+
+        def test_global_version_unchanged():
+            assert vvm.install._active_vyper_binary.get() is None
+        """
+    )
+    result = pytester.runpytest("-p", "vvm.pytest_plugin")
+    assert result.ret == 0
+
+
+def test_versions_shared_between_workers(tmp_path):
+    tmp_path.joinpath("versions.json").write_text(json.dumps(["0.3.10", "0.2.8"]))
+    config = SimpleNamespace(
+        workerinput={"vvm_session_dir": str(tmp_path)},
+        getoption=pytest.fail,
+    )
+    assert pytest_plugin._get_versions(config) == [Version("0.3.10"), Version("0.2.8")]
+
+
+def test_compile_cache(foo_source, vyper_version, tmp_path, monkeypatch):
+    cache = CompileCache(tmp_path)
+    output = cache.compile_source(foo_source)
+    assert output == vvm.compile_source(foo_source)
+
+    output["<stdin>"]["abi"] = None
+    assert cache.compile_source(foo_source) == vvm.compile_source(foo_source)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # a second worker reads the output written by the first
+    monkeypatch.setattr(pytest_plugin, "compile_source", pytest.fail)
+    assert CompileCache(tmp_path).compile_source(foo_source) == vvm.compile_source(foo_source)
+
+
+def test_compile_cache_key(foo_source, vyper_version):
+    cache = CompileCache()
+    cache.compile_source(foo_source)
+    cache.compile_source(foo_source, vyper_version=vyper_version)
+    cache.compile_source(foo_source, output_format="abi")
+    assert len(cache._cache) == 2
@@ -0,0 +1,155 @@
+import base64
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import vvm
+from vvm import remote_cache
+from vvm.archive import build_archive, compile_archive
+from vvm.planner import execute_plan, plan_build
+from vvm.remote_cache import RemoteCache
+
+
+class CacheHandler(BaseHTTPRequestHandler):
+    # a minimal stand-in for a file server that accepts uploads
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        data = self.server.files.get(self.path)
+        self.send_response(200 if data is not None else 404)
+        self.send_header("Content-Length", str(len(data or b"")))
+        self.end_headers()
+        self.wfile.write(data or b"")
+
+    def do_HEAD(self):
+        self.send_response(200 if self.path in self.server.files else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_PUT(self):
+        self.server.files[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CacheHandler)
+    server.files = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(server):
+    cache = RemoteCache(f"http://127.0.0.1:{server.server_address[1]}/cache/")
+    remote_cache.set_remote_cache(cache)
+    yield cache
+    remote_cache.set_remote_cache(None)
+
+
+def test_get_put(cache, server):
+    assert cache.get("abcd") is None
+    assert cache.put("abcd", {"a": [1, 2]})
+    assert list(server.files) == ["/cache/ab/abcd.json"]
+    assert cache.get("abcd") == {"a": [1, 2]}
+    assert (cache.hits, cache.misses, cache.uploads) == (1, 1, 1)
+
+
+def test_contains(cache, server):
+    assert not cache.contains("abcd")
+    cache.put("abcd", {"a": 1})
+    assert cache.contains("abcd")
+    assert cache.hits == cache.misses == 0
+
+
+def test_read_only(server):
+    cache = RemoteCache(f"http://127.0.0.1:{server.server_address[1]}", mode="ro")
+    assert not cache.put("abcd", {})
+    assert not server.files
+
+    with pytest.raises(ValueError):
+        RemoteCache("http://127.0.0.1", mode="w")
+
+
+def test_upload_size_limit(cache, server):
+    cache.max_upload_size = 10
+    assert not cache.put("abcd", "x" * 10)
+    assert cache.put("abcd", "x" * 8)
+
+
+def test_unreachable_server():
+    cache = RemoteCache("http://127.0.0.1:1", timeout=1)
+    assert cache.get("abcd") is None
+    assert not cache.put("abcd", {})
+    assert cache.errors == 2
+
+
+def test_compile_source(cache, server, foo_source, vyper_version, monkeypatch):
+    expected = vvm.compile_source(foo_source)
+    assert cache.uploads == 1
+
+    # a second runner gets the output without compiling
+    monkeypatch.setattr(vvm.wrapper, "vyper_wrapper", pytest.fail)
+    assert vvm.compile_source(foo_source) == expected
+    assert cache.hits == 1
+
+
+def test_compile_options_in_key(cache, server, foo_source, vyper_version):
+    vvm.compile_source(foo_source)
+    vvm.compile_source(foo_source, output_format="abi")
+    vvm.compile_source(foo_source + "\n")
+    assert cache.uploads == 3
+
+
+def test_compile_standard(cache, input_json, foo_source, vyper_version, monkeypatch):
+    input_json["sources"] = {"contracts/Foo.vy": {"content": foo_source}}
+    expected = vvm.compile_standard(input_json)
+
+    monkeypatch.setattr(vvm.wrapper, "vyper_wrapper", pytest.fail)
+    assert vvm.compile_standard(input_json) == expected
+
+
+def test_environment(server, monkeypatch):
+    assert remote_cache.get_remote_cache() is None
+    monkeypatch.setenv("VVM_REMOTE_CACHE_URL", "http://127.0.0.1:1/")
+    monkeypatch.setenv("VVM_REMOTE_CACHE_MODE", "ro")
+
+    cache = remote_cache.get_remote_cache()
+    assert (cache.url, cache.mode) == ("http://127.0.0.1:1", "ro")
+    assert remote_cache.get_remote_cache() is cache
+
+
+@pytest.mark.min_vyper("0.4.0")
+def test_compile_archive(cache, tmp_path, foo_source, vyper_version, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tmp_path.joinpath("Foo.vy").write_text(foo_source)
+    archive = build_archive("Foo.vy")
+    expected = compile_archive(archive)
+
+    # the key is the hash of the contents, not of the encoded archive
+    monkeypatch.setattr(vvm.wrapper, "vyper_wrapper", pytest.fail)
+    assert compile_archive(base64.b64encode(archive)) == expected
+    assert cache.hits == 1
+
+
+def test_build_plan(cache, tmp_path, foo_source, vyper_version, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tmp_path.joinpath("Foo.vy").write_text(foo_source)
+    tmp_path.joinpath("Bar.vy").write_text(foo_source.replace("foo", "bar"))
+    assert plan_build(["Foo.vy", "Bar.vy"]).cached == []
+    expected = execute_plan(plan_build(["Foo.vy", "Bar.vy"]))
+    assert cache.uploads == 2
+
+    # unchanged files are expected cache hits, and are not compiled
+    tmp_path.joinpath("Bar.vy").write_text(foo_source.replace("foo", "baz"))
+    plan = plan_build(["Foo.vy", "Bar.vy"])
+    assert plan.cached == ["Foo.vy"]
+    assert [job.source_files for job in plan.jobs] == [["Bar.vy"]]
+    assert execute_plan(plan)["Foo.vy"] == expected["Foo.vy"]
+    assert cache.hits == 1
@@ -0,0 +1,229 @@
+import signal
+import threading
+import time
+
+import pytest
+
+import vvm
+from vvm import scheduler
+from vvm.scheduler import (
+    BATCH,
+    INTERACTIVE,
+    NORMAL,
+    AdaptiveScheduler,
+    CompileScheduler,
+    MemoryStatus,
+)
+
+
+@pytest.fixture
+def order():
+    yield []
+
+
+def _queue(sched, order, name, priority=NORMAL, tenant=None):
+    # start a thread that waits for a slot, records its name and releases it
+    def run():
+        with sched.slot(priority, tenant):
+            order.append(name)
+
+    queued = sum(sched.stats().queued.values())
+    thread = threading.Thread(target=run)
+    thread.start()
+    while sum(sched.stats().queued.values()) == queued:
+        time.sleep(0.001)
+    return thread
+
+
+def _drain(threads):
+    for thread in threads:
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+
+
+def test_priority(order):
+    sched = CompileScheduler(1)
+    sched.acquire()
+    threads = [
+        _queue(sched, order, "batch", BATCH),
+        _queue(sched, order, "normal"),
+        _queue(sched, order, "interactive", "interactive"),
+    ]
+    assert sched.stats().queued == {BATCH: 1, NORMAL: 1, INTERACTIVE: 1}
+    sched.release()
+    _drain(threads)
+
+    assert order == ["interactive", "normal", "batch"]
+
+
+def test_fair_share(order):
+    sched = CompileScheduler(2)
+    sched.acquire(tenant="a")
+    sched.acquire(tenant="x")
+    threads = [
+        _queue(sched, order, "a2", tenant="a"),
+        _queue(sched, order, "a3", tenant="a"),
+        _queue(sched, order, "b1", tenant="b"),
+    ]
+    # tenant "b" has nothing running, so it goes before the older requests of "a"
+    sched.release(tenant="x")
+    _drain(threads)
+    assert order == ["b1", "a2", "a3"]
+    sched.release(tenant="a")
+
+
+def test_concurrency_limit():
+    sched = CompileScheduler(3)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def run():
+        with sched.slot():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+    threads = [threading.Thread(target=run) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    _drain(threads)
+
+    assert max(peak) == 3
+    stats = sched.stats()
+    assert stats.running == 0
+    assert stats.admitted == {NORMAL: 12}
+    assert stats.max_wait[NORMAL] >= stats.mean_wait[NORMAL] > 0
+
+
+def test_interrupted_wait(monkeypatch):
+    sched = CompileScheduler(1)
+    sched.acquire()
+    monkeypatch.setattr(sched._condition, "wait", _raise_interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        sched.acquire()
+    monkeypatch.undo()
+
+    assert sched.stats().queued == {}
+    sched.release()
+    assert sched.stats().running == 0
+
+
+def _raise_interrupt(*args):
+    raise KeyboardInterrupt
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError):
+        scheduler.to_priority("urgent")
+
+
+@pytest.fixture
+def global_scheduler():
+    sched = CompileScheduler(1)
+    scheduler.set_scheduler(sched)
+    yield sched
+    scheduler.set_scheduler(None)
+
+
+def test_wrapper_uses_scheduler(global_scheduler, foo_source, vyper_version):
+    with scheduler.job("batch", tenant="nightly"):
+        vvm.compile_source(foo_source)
+    vvm.compile_source(foo_source)
+
+    assert global_scheduler.stats().admitted == {BATCH: 1, NORMAL: 1}
+    assert global_scheduler.stats().running == 0
+
+
+def test_nested_slot_not_admitted_twice(global_scheduler, foo_source, vyper_version):
+    # the compile is already admitted, a second slot would deadlock
+    with global_scheduler.slot(INTERACTIVE):
+        vvm.compile_source(foo_source)
+    assert global_scheduler.stats().admitted == {INTERACTIVE: 1}
+
+
+def test_read_memory_status(tmp_path, monkeypatch):
+    meminfo = tmp_path.joinpath("meminfo")
+    meminfo.write_text(
+        "MemTotal:       16000 kB\nMemFree:         1000 kB\nMemAvailable:    4000 kB\n"
+    )
+    pressure = tmp_path.joinpath("memory")
+    pressure.write_text(
+        "some avg10=12.50 avg60=3.00 avg300=1.00 total=100\n"
+        "full avg10=2.00 avg60=1.00 avg300=0.00 total=10\n"
+    )
+    monkeypatch.setattr(scheduler, "MEMINFO_PATH", str(meminfo))
+    monkeypatch.setattr(scheduler, "PRESSURE_PATH", str(pressure))
+    assert scheduler.read_memory_status() == MemoryStatus(4000 * 1024, 16000 * 1024, 12.5)
+
+    pressure.unlink()
+    assert scheduler.read_memory_status().pressure is None
+    meminfo.unlink()
+    assert scheduler.read_memory_status() is None
+
+
+def _set_memory(monkeypatch, available, pressure=0.0):
+    status = MemoryStatus(available, 100, pressure)
+    monkeypatch.setattr(scheduler, "read_memory_status", lambda: status)
+
+
+def test_adaptive_grows(monkeypatch):
+    _set_memory(monkeypatch, 80)
+    sched = AdaptiveScheduler(4, interval=0.001)
+    assert sched.stats().max_concurrency == 1
+
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def run():
+        with sched.slot():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+    threads = [threading.Thread(target=run) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    _drain(threads)
+
+    assert 1 < max(peak) <= 4
+    assert sched.concurrency == max(peak)
+
+
+def test_adaptive_backs_off(monkeypatch):
+    sched = AdaptiveScheduler(8, interval=0)
+    sched.concurrency = 8
+
+    _set_memory(monkeypatch, 80, pressure=25.0)
+    assert sched.stats().max_concurrency == 4
+    _set_memory(monkeypatch, 5)
+    assert sched.stats().max_concurrency == 2
+    assert sched.stats().max_concurrency == 1
+    assert sched.stats().max_concurrency == 1
+
+    # no queued compiles, so there is no reason to grow
+    _set_memory(monkeypatch, 80)
+    assert sched.stats().max_concurrency == 1
+
+
+def test_adaptive_without_memory_status(monkeypatch):
+    monkeypatch.setattr(scheduler, "read_memory_status", lambda: None)
+    assert AdaptiveScheduler(6).stats().max_concurrency == 6
+
+
+def test_retry_only_after_sigkill(monkeypatch):
+    monkeypatch.setattr(scheduler, "_scheduler", AdaptiveScheduler(4))
+    assert scheduler._retry(-signal.SIGKILL, None, 0)
+    assert not scheduler._retry(1, None, 0)
+    assert not scheduler._retry(-signal.SIGKILL, 10, 0)
+
+    # on Windows, an exit code of 1 must not be mistaken for a kill
+    monkeypatch.delattr(signal, "SIGKILL")
+    assert not scheduler._retry(1, None, 0)
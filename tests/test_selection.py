@@ -0,0 +1,62 @@
+import copy
+
+import pytest
+
+import vvm
+from vvm.contract import STANDARD_JSON_FIELDS, from_standard_json
+from vvm.utils.selection import narrow_output_selection
+
+
+@pytest.mark.parametrize(
+    "selection,fields,expected",
+    [
+        (["*"], ["abi", "evm.bytecode.object"], ["abi", "evm.bytecode.object"]),
+        (["evm"], ["evm.bytecode.object"], ["evm.bytecode.object"]),
+        (["evm.bytecode.object", "ast"], ["evm.bytecode"], ["evm.bytecode.object"]),
+        (["abi", "ast", "evm"], ["abi", "layout"], ["abi"]),
+        (["abi", "abi"], ["abi", "abi"], ["abi"]),
+    ],
+)
+def test_narrow(selection, fields, expected):
+    assert narrow_output_selection({"*": selection}, fields) == {"*": expected}
+
+
+def test_narrow_nested():
+    selection = {"a.vy": {"*": ["*"]}, "b.vy": {"B": ["ast"]}, "c.vy": ["abi", "ast"]}
+    assert narrow_output_selection(selection, ["abi"]) == {
+        "a.vy": {"*": ["abi"]},
+        "c.vy": ["abi"],
+    }
+
+
+def test_compile_standard_output_fields(input_json, foo_source, vyper_version):
+    input_json["sources"] = {"contracts/Foo.vy": {"content": foo_source}}
+    input_json["settings"]["outputSelection"] = {"*": ["*"]}
+    original = copy.deepcopy(input_json)
+
+    output = vvm.compile_standard(input_json, output_fields=["evm.bytecode.object"])
+
+    assert input_json == original
+    contract = output["contracts"]["contracts/Foo.vy"]["Foo"]
+    assert contract == {"evm": {"bytecode": {"object": contract["evm"]["bytecode"]["object"]}}}
+
+
+def test_compile_standard_typed_fields(input_json, foo_source, vyper_version):
+    input_json["sources"] = {"contracts/Foo.vy": {"content": foo_source}}
+    input_json["settings"]["outputSelection"] = {"*": ["*"]}
+
+    output = vvm.compile_standard(input_json, output_fields=STANDARD_JSON_FIELDS)
+    contract = from_standard_json(output)["contracts/Foo.vy"]["Foo"]
+
+    assert contract.abi
+    assert contract.bytecode and contract.bytecode_runtime
+    assert "foo()" in contract.method_identifiers
+    assert "ast" not in contract.extra
+
+
+def test_compile_standard_unselected_fields(input_json, foo_source):
+    input_json["sources"] = {"contracts/Foo.vy": {"content": foo_source}}
+    input_json["settings"]["outputSelection"] = {"*": ["abi"]}
+
+    with pytest.raises(ValueError):
+        vvm.compile_standard(input_json, output_fields=["evm.bytecode.object"])
@@ -0,0 +1,183 @@
+import http.client
+import json
+import sys
+import threading
+
+import pytest
+
+import vvm
+from vvm.archive import build_archive, compile_archive
+from vvm.client import VvmClient, _decode_exception
+from vvm.exceptions import VyperError, VyperNotInstalled, VyperTimeoutError
+from vvm.server import _encode_exception, make_server
+
+
+def _start(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture(scope="module")
+def client():
+    server = _start(make_server(port=0, max_workers=2))
+    yield VvmClient(port=server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def test_compile_standard(client, input_json, foo_source, vyper_version):
+    input_json["sources"] = {"contracts/Foo.vy": {"content": foo_source}}
+    expected = vvm.compile_standard(input_json, vyper_version=vyper_version)
+
+    assert client.compile_standard(input_json, vyper_version=vyper_version) == expected
+    # second call is served from the shared cache
+    assert client.compile_standard(input_json, vyper_version=vyper_version) == expected
+
+
+def test_compile_source_output_format(client, foo_source, vyper_version):
+    expected = vvm.compile_source(foo_source, vyper_version=vyper_version, output_format="abi")
+    result = client.compile_source(foo_source, vyper_version=vyper_version, output_format="abi")
+    assert result == expected
+
+
+def test_errors_are_raised(client, foo_source, vyper_version):
+    with pytest.raises(VyperError) as excinfo:
+        client.compile_source(
+            foo_source.replace("return 13", "return x"), vyper_version=vyper_version
+        )
+    assert excinfo.value.return_code != 0
+
+    with pytest.raises(VyperNotInstalled):
+        client.compile_source(foo_source, vyper_version="0.0.1")
+
+
+def test_error_subclass_fields():
+    exc = VyperTimeoutError(
+        "Compilation did not finish within 1 seconds",
+        command=["vyper", "-"],
+        return_code=-9,
+        stdout_data="out",
+        stderr_data="err",
+    )
+    decoded = _decode_exception(json.loads(json.dumps(_encode_exception(exc))))
+
+    assert type(decoded) is VyperTimeoutError
+    assert decoded.message == exc.message
+    assert decoded.command == ["vyper", "-"]
+    assert decoded.return_code == -9
+    assert (decoded.stdout_data, decoded.stderr_data) == ("out", "err")
+
+
+def test_installed_versions(client):
+    assert client.get_installed_vyper_versions() == vvm.get_installed_vyper_versions()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets are not available on Windows")
+def test_unix_socket(tmp_path, foo_source, vyper_version):
+    socket_path = tmp_path.joinpath("vvm.sock")
+    server = _start(make_server(unix_socket=socket_path))
+    try:
+        result = VvmClient(unix_socket=socket_path).compile_source(
+            foo_source, vyper_version=vyper_version, output_format="bytecode"
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert result.startswith("0x")
+
+
+def test_priority_headers(foo_source, vyper_version):
+    server = _start(make_server(port=0, cache_size=0))
+    try:
+        client = VvmClient(port=server.server_address[1], priority="interactive", tenant="ide")
+        client.compile_source(foo_source, vyper_version=vyper_version)
+        stats = client.stats()
+        assert stats["admitted"] == {"0": 1}
+        assert stats["running"] == 0
+
+        with pytest.raises(ValueError):
+            VvmClient(port=server.server_address[1], priority="urgent").get_vyper_version()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.min_vyper("0.4.0")
+def test_compile_archive(client, tmp_path, foo_source, vyper_version, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tmp_path.joinpath("Foo.vy").write_text(foo_source)
+    archive = build_archive("Foo.vy")
+
+    assert client.compile_archive(archive) == compile_archive(archive)
+
+
+def test_content_type_required(client):
+    conn = http.client.HTTPConnection(client.host, client.port)
+    conn.request("POST", "/get_vyper_version", body="{}", headers={"Content-Type": "text/plain"})
+    response = conn.getresponse()
+    assert response.status == 415
+    assert "error" in json.loads(response.read())
+    conn.close()
+
+
+def test_vyper_binary_rejected(client, foo_source):
+    with pytest.raises(PermissionError):
+        client.call("compile_source", source=foo_source, vyper_binary="/bin/sh")
+
+
+def test_paths_rejected(client, foo_path, foo_source, vyper_version):
+    with pytest.raises(PermissionError):
+        client.compile_files([foo_path], vyper_version=vyper_version)
+    with pytest.raises(PermissionError):
+        client.compile_source(foo_source, base_path=foo_path.parent, vyper_version=vyper_version)
+
+
+def test_allow_paths(foo_path, foo_source, vyper_version):
+    server = _start(make_server(port=0, allow_paths=True))
+    try:
+        client = VvmClient(port=server.server_address[1])
+        result = client.compile_files([foo_path], vyper_version=vyper_version)
+        assert result == vvm.compile_files([foo_path], vyper_version=vyper_version)
+
+        # the output may depend on files under the base path, so it is not cached
+        client.compile_source(foo_source, base_path=foo_path.parent, vyper_version=vyper_version)
+        assert not server.vvm_cache._data
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_install_rejected(client):
+    with pytest.raises(PermissionError):
+        client.install_vyper("0.4.0")
+    with pytest.raises(PermissionError):
+        client.call("get_installed_vyper_versions", vvm_binary_path="/")
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_invalid_content_length(client, length):
+    conn = http.client.HTTPConnection(client.host, client.port)
+    conn.putrequest("POST", "/get_vyper_version")
+    conn.putheader("Content-Type", "application/json")
+    conn.putheader("Content-Length", length)
+    conn.endheaders()
+    response = conn.getresponse()
+    assert response.status == 400
+    assert json.loads(response.read())["error"]["type"] == "ValueError"
+    conn.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets are not available on Windows")
+def test_unix_socket_existing_file(tmp_path):
+    socket_path = tmp_path.joinpath("vvm.sock")
+    socket_path.write_text("data")
+    with pytest.raises(FileExistsError):
+        make_server(unix_socket=socket_path)
+    assert socket_path.read_text() == "data"
+
+    # a socket left behind by a previous server is replaced
+    socket_path.unlink()
+    make_server(unix_socket=socket_path).server_close()
+    make_server(unix_socket=socket_path).server_close()
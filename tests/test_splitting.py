@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+import vvm
+from vvm import main
+from vvm.exceptions import VyperError
+from vvm.scheduler import CompileScheduler
+from vvm.utils.splitting import split_standard_input
+
+UTIL_SOURCE = """
+@internal
+def bar() -> uint256:
+    return 1
+"""
+
+MATH_SOURCE = """
+from . import util
+
+@internal
+def double() -> uint256:
+    return util.bar() * 2
+"""
+
+FOO_SOURCE = """
+from .lib import util
+from .lib import math
+
+@external
+def foo() -> uint256:
+    return util.bar() + math.double()
+"""
+
+BAR_SOURCE = """
+import contracts.lib.util as u
+from ethereum.ercs import IERC20
+
+@external
+def bar() -> uint256:
+    return u.bar()
+"""
+
+SOURCES = {
+    "contracts/lib/util.vy": {"content": UTIL_SOURCE},
+    "contracts/lib/math.vy": {"content": MATH_SOURCE},
+    "contracts/Foo.vy": {"content": FOO_SOURCE},
+    "contracts/Bar.vy": {"content": BAR_SOURCE},
+}
+
+
+def _input(sources, selection):
+    return {"language": "Vyper", "sources": sources, "settings": {"outputSelection": selection}}
+
+
+def test_split_imports():
+    inputs = split_standard_input(_input(SOURCES, {"*": ["abi"]}))
+
+    assert [list(i["settings"]["outputSelection"]) for i in inputs] == [[i] for i in SOURCES]
+    assert [list(i["sources"]) for i in inputs] == [
+        ["contracts/lib/util.vy"],
+        ["contracts/lib/util.vy", "contracts/lib/math.vy"],
+        ["contracts/lib/util.vy", "contracts/lib/math.vy", "contracts/Foo.vy"],
+        ["contracts/lib/util.vy", "contracts/Bar.vy"],
+    ]
+
+
+def test_split_selection():
+    selection = {"contracts/Foo.vy": ["abi"], "contracts/Bar.vy": ["ast"]}
+    inputs = split_standard_input(_input(SOURCES, selection))
+    assert [i["settings"]["outputSelection"] for i in inputs] == [
+        {"contracts/Foo.vy": ["abi"]},
+        {"contracts/Bar.vy": ["ast"]},
+    ]
+
+    # nothing to split
+    input_data = _input(SOURCES, {"contracts/Foo.vy": ["abi"]})
+    assert split_standard_input(input_data) == [input_data]
+
+
+def test_split_unresolved_import():
+    sources = dict(SOURCES)
+    sources["contracts/Baz.vy"] = {"content": "import missing.module as m\n"}
+    inputs = split_standard_input(_input(sources, {"*": ["abi"]}))
+    assert list(inputs[-1]["sources"]) == list(sources)
+
+
+def test_compile_parallel(input_json, foo_source, vyper_version):
+    input_json["sources"] = {
+        "contracts/Foo.vy": {"content": foo_source},
+        "contracts/Bar.vy": {"content": foo_source.replace("foo", "bar")},
+    }
+    input_json["settings"]["outputSelection"] = {"*": ["*"]}
+    expected = vvm.compile_standard(input_json)
+
+    assert json.dumps(vvm.compile_standard(input_json, max_workers=2)) == json.dumps(expected)
+
+
+@pytest.mark.min_vyper("0.4.0")
+def test_compile_parallel_imports(vyper_version):
+    input_data = _input(SOURCES, {"*": ["*"]})
+    expected = vvm.compile_standard(input_data)
+
+    # source ids in ASTs and source maps match the serial compile
+    assert json.dumps(vvm.compile_standard(input_data, max_workers=4)) == json.dumps(expected)
+
+
+@pytest.mark.min_vyper("0.4.0")
+@pytest.mark.parametrize(
+    "selection",
+    [
+        ["*"],
+        ["evm.bytecode.object", "evm.bytecode.sourceMap"],
+        ["evm.deployedBytecode.sourceMap", "ast"],
+        ["ast"],
+    ],
+)
+def test_compile_parallel_selection(vyper_version, selection, monkeypatch):
+    # `contracts/Foo.vy` loads both libraries before `contracts/Bar.vy` is compiled
+    sources = {"contracts/lib/util.vy": SOURCES["contracts/lib/util.vy"]}
+    sources.update({k: v for k, v in SOURCES.items() if k != "contracts/lib/util.vy"})
+    input_data = _input(sources, {"contracts/Foo.vy": selection, "contracts/Bar.vy": selection})
+    expected = vvm.compile_standard(input_data)
+
+    compiled = []
+    compile_json = main._compile_standard_json
+    monkeypatch.setattr(
+        main, "_compile_standard_json", lambda *args: compiled.append(1) or compile_json(*args)
+    )
+    assert json.dumps(vvm.compile_standard(input_data, max_workers=2)) == json.dumps(expected)
+    # the outputs were merged, rather than compiled again as a single input
+    assert len(compiled) == 2
+
+
+def test_no_split_in_scheduler_slot(input_json, foo_source, vyper_version, monkeypatch):
+    input_json["sources"] = {
+        "contracts/Foo.vy": {"content": foo_source},
+        "contracts/Bar.vy": {"content": foo_source.replace("foo", "bar")},
+    }
+    expected = vvm.compile_standard(input_json)
+    monkeypatch.setattr(main, "split_standard_input", pytest.fail)
+    with CompileScheduler(1).slot():
+        assert vvm.compile_standard(input_json, max_workers=2) == expected
+
+
+def test_compile_parallel_errors(input_json, foo_source, vyper_version):
+    input_json["sources"] = {
+        "contracts/Foo.vy": {"content": foo_source},
+        "contracts/Bar.vy": {"content": foo_source + "\nx: = 1\n"},
+    }
+    with pytest.raises(VyperError) as serial:
+        vvm.compile_standard(input_json)
+    with pytest.raises(VyperError) as parallel:
+        vvm.compile_standard(input_json, max_workers=2)
+    assert parallel.value.error_dict == serial.value.error_dict
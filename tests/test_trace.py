@@ -0,0 +1,99 @@
+import json
+
+import vvm
+from vvm import trace
+from vvm.__main__ import main
+from vvm.trace import TraceRecorder, read_trace, replay
+
+
+def test_record_compile_source(tmp_path, foo_source, vyper_version):
+    path = tmp_path.joinpath("trace.gz")
+    with TraceRecorder(path).record():
+        vvm.compile_source(foo_source)
+        vvm.compile_source(foo_source)
+    vvm.compile_source(foo_source)
+
+    calls = list(read_trace(path))
+    assert len(calls) == 2
+    assert calls[0].compiler_version == str(vyper_version)
+    assert calls[0].args[-2:] == ["-f", "combined_json"]
+    assert list(calls[0].files.values()) == [foo_source]
+    assert calls[0].return_code == 0
+    assert calls[0].duration > 0
+
+
+def test_record_compile_standard(tmp_path, input_json, foo_source, vyper_version):
+    input_json["sources"] = {"contracts/Foo.vy": {"content": foo_source}}
+    path = tmp_path.joinpath("trace.gz")
+    with TraceRecorder(path).record():
+        vvm.compile_standard(input_json)
+        vvm.compile_standard(input_json)
+
+    calls = list(read_trace(path))
+    assert calls[0].stdin == calls[1].stdin
+    assert json.loads(calls[0].stdin) == input_json
+    # each stdin is only stored once
+    assert sum(1 for i in trace.gzip.open(path, "rt") if '"blob"' in i) == 1
+
+
+def test_read_while_recording(tmp_path, foo_source, vyper_version):
+    path = tmp_path.joinpath("trace.gz")
+    recorder = TraceRecorder(path)
+    with recorder.record():
+        vvm.compile_source(foo_source)
+        assert len(list(read_trace(path))) == 1
+        vvm.compile_source(foo_source)
+
+        # a call that was only partly written, e.g. after a crash, is ignored
+        size = path.stat().st_size
+        with path.open("ab") as fp:
+            fp.write(trace.gzip.compress(json.dumps({"call": {}}).encode() * 10)[:30])
+        assert len(list(read_trace(path))) == 2
+        with path.open("r+b") as fp:
+            fp.truncate(size)
+
+
+def test_record_environment(tmp_path, monkeypatch, foo_source, vyper_version):
+    path = tmp_path.joinpath("trace.gz")
+    monkeypatch.setenv("VVM_TRACE_PATH", str(path))
+    vvm.compile_source(foo_source)
+    monkeypatch.delenv("VVM_TRACE_PATH")
+    trace._environment_recorder.close()
+
+    assert len(list(read_trace(path))) == 1
+
+
+def test_replay(tmp_path, foo_source, vyper_version):
+    path = tmp_path.joinpath("trace.gz")
+    with TraceRecorder(path).record():
+        vvm.compile_source(foo_source)
+        try:
+            vvm.compile_source(foo_source.replace("return 13", "return x"))
+        except vvm.exceptions.VyperError:
+            pass
+
+    results = replay(path, concurrency=2)
+    assert [i.number for i in results] == [0, 1]
+    assert results[0].output_match
+    assert results[0].return_code == 0
+    assert results[1].return_code == results[1].original_return_code != 0
+    assert all(i.duration > 0 for i in results)
+    assert trace.summarize(results)["output_changed"] == 0
+
+
+def test_replay_other_version(tmp_path, foo_source, vyper_version, latest_version):
+    path = tmp_path.joinpath("trace.gz")
+    with TraceRecorder(path).record():
+        vvm.compile_source(foo_source)
+
+    (result,) = replay(path, vyper_version=latest_version)
+    assert result.output_match is (vyper_version == latest_version)
+
+
+def test_replay_cli(tmp_path, capsys, foo_source, vyper_version):
+    path = tmp_path.joinpath("trace.gz")
+    with TraceRecorder(path).record():
+        vvm.compile_source(foo_source)
+
+    main(["replay", str(path), "--vyper-version", str(vyper_version)])
+    assert "1 call(s)" in capsys.readouterr().out
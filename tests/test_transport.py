@@ -0,0 +1,76 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import vvm
+from vvm import exceptions, transport
+from vvm.exceptions import VyperError
+from vvm.install import get_executable
+
+
+@pytest.fixture
+def standard_input(input_json, foo_source):
+    input_json["sources"]["contracts/Foo.vy"] = {"content": foo_source}
+    return input_json
+
+
+@pytest.mark.parametrize("method", ["shm", "file"])
+def test_process_pool(standard_input, vyper_version, method):
+    vyper_binary = get_executable(vyper_version)
+    with ProcessPoolExecutor(1) as executor:
+        future = executor.submit(
+            transport.compile_standard_shared,
+            standard_input,
+            vyper_binary=vyper_binary,
+            transport=method,
+        )
+        output = future.result()
+
+    assert output.transport == method
+    with output:
+        assert output.load() == vvm.compile_standard(standard_input, vyper_binary=vyper_binary)
+    if method == "file":
+        assert not Path(output.name).exists()
+
+
+def test_pickle_size(standard_input):
+    output = transport.compile_standard_shared(standard_input)
+    try:
+        assert len(pickle.dumps(output)) < output.size
+        with output.view() as view:
+            assert view.readonly
+            assert bytes(view) == output.read()
+    finally:
+        output.release()
+
+
+def test_release_on_collect(standard_input):
+    output = transport.compile_standard_shared(standard_input, transport="file")
+    copy = pickle.loads(pickle.dumps(output))
+    assert copy.read() == output.read()
+    del copy
+    assert not Path(output.name).exists()
+
+
+def test_spill_directory(standard_input, tmp_path, monkeypatch):
+    monkeypatch.setattr(exceptions, "SPILL_DIRECTORY", str(tmp_path))
+    output = transport.compile_standard_shared(standard_input, transport="file")
+    assert Path(output.name).parent == tmp_path
+    output.release()
+    assert not list(tmp_path.iterdir())
+
+
+def test_error_on_load(standard_input):
+    standard_input["sources"]["contracts/Foo.vy"]["content"] += "\nfoo bar"
+    output = transport.compile_standard_shared(standard_input)
+    with output:
+        with pytest.raises(VyperError) as exc:
+            output.load()
+    assert exc.value.error_dict
+
+
+def test_invalid_transport(standard_input):
+    with pytest.raises(ValueError):
+        transport.compile_standard_shared(standard_input, transport="pipe")
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+from packaging.version import Version
+
+import vvm
+from vvm import verify
+from vvm.verify import VerificationResult, _match, split_metadata, verify_bytecode
+
+# `{"vyper": [0, 3, 7]}` followed by its length, as appended by vyper 0.3.7
+METADATA_037 = bytes.fromhex("a165767970657283000307000b")
+METADATA_038 = bytes.fromhex("a165767970657283000308000b")
+
+
+@pytest.fixture
+def immutable_source(vyper_version):
+    decorator = "deploy" if vyper_version >= Version("0.4.0a") else "external"
+    yield f"""
+#pragma version {vyper_version}
+X: immutable(uint256)
+
+@{decorator}
+def __init__(x: uint256):
+    X = x
+
+@external
+def foo() -> uint256:
+    return X
+"""
+
+
+def test_split_metadata():
+    assert split_metadata(b"\x60\x00" + METADATA_037) == (b"\x60\x00", {"vyper": [0, 3, 7]})
+    assert split_metadata("0x6000") == (b"\x60\x00", None)
+    assert split_metadata(b"\x60\x00\x00\x05") == (b"\x60\x00\x00\x05", None)
+    assert split_metadata(b"") == (b"", None)
+
+
+@pytest.mark.min_vyper("0.3.10")
+def test_split_metadata_deployment(foo_source, vyper_version):
+    bytecode = vvm.compile_source(foo_source)["<stdin>"]["bytecode"]
+    _, metadata = split_metadata(bytecode)
+    assert metadata[-1] == {"vyper": list(vyper_version.release)}
+
+
+def test_match_metadata_differs():
+    runtime = b"\x60\x00" + METADATA_037
+    assert _match(runtime, runtime, runtime) == (True, b"")
+    assert _match(b"\x60\x00" + METADATA_038, runtime, runtime) == (False, b"")
+    assert _match(b"\x60\x01" + METADATA_038, runtime, runtime) is None
+
+
+def test_verify(foo_source, vyper_version):
+    if Version("0.4.0b1") <= vyper_version <= Version("0.4.0b5"):
+        pytest.skip("vyper 0.4.0b1 to 0.4.0b5 have a bug with combined_json")
+    output = vvm.compile_source(foo_source, evm_version="paris")["<stdin>"]
+
+    result = verify_bytecode(foo_source, output["bytecode_runtime"])
+
+    assert result.version == vyper_version
+    assert result.metadata_match
+    assert result.immutables == b""
+    assert result.output["bytecode_runtime"] == output["bytecode_runtime"]
+
+
+@pytest.mark.min_vyper("0.3.10")
+def test_verify_immutables(immutable_source, vyper_version):
+    output = vvm.compile_source(immutable_source)["<stdin>"]
+    value = (42).to_bytes(32, "big")
+
+    result = verify_bytecode(
+        immutable_source, output["bytecode_runtime"] + value.hex(), evm_versions=[None]
+    )
+    assert result.version == vyper_version
+    assert result.immutables == value
+
+    assert verify_bytecode(immutable_source, output["bytecode_runtime"] + "00") is None
+
+
+def test_no_match(foo_source, vyper_version):
+    assert verify_bytecode(foo_source, b"\x00" * 32, evm_versions=[None]) is None
+
+
+def test_first_exact_match_in_search_order(monkeypatch):
+    def verify_one(source, target, version, evm_version):
+        # candidates later in the search order finish first
+        time.sleep(0.05 * (3 - int(evm_version)))
+        return VerificationResult(version, evm_version, evm_version != "0", b"", {})
+
+    monkeypatch.setattr(verify, "_verify_one", verify_one)
+    result = verify_bytecode(
+        "", b"", versions=["0.3.10"], evm_versions=["0", "1", "2", "3"], max_workers=4
+    )
+    assert result.evm_version == "1"
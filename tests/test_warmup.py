@@ -0,0 +1,35 @@
+import vvm
+from vvm import wrapper
+from vvm.history import CompileHistory
+from vvm.trace import TraceRecorder
+
+
+def test_warm_up(vyper_version, monkeypatch):
+    monkeypatch.setattr(wrapper, "_version_cache", {})
+    future = vvm.warm_up([vyper_version])
+
+    assert future.result(timeout=60) == [vyper_version]
+    assert str(vvm.install.get_executable(vyper_version)) in wrapper._version_cache
+
+
+def test_warm_up_from_source_tree(tmp_path, foo_source, vyper_version):
+    tmp_path.joinpath("contracts").mkdir()
+    tmp_path.joinpath("contracts/Foo.vy").write_text(foo_source)
+    tmp_path.joinpath("Bar.vy").write_text("# pragma version 2024.0.1")
+
+    result = vvm.warm_up(source_tree=tmp_path, compile_empty=False, wait=True).result()
+    assert result == [vyper_version]
+
+
+def test_warm_up_not_installed():
+    assert vvm.warm_up(["0.0.1"], wait=True).result() == []
+
+
+def test_warm_up_is_not_recorded(tmp_path, vyper_version):
+    history = CompileHistory(tmp_path.joinpath("history.db"))
+    with history.record(), TraceRecorder(tmp_path.joinpath("trace.gz")).record():
+        assert vvm.warm_up([vyper_version], wait=True).result() == [vyper_version]
+
+    assert history.entries() == []
+    assert not tmp_path.joinpath("trace.gz").exists()
+    history.close()
@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from vvm import scheduler, wrapper
+from vvm.exceptions import VyperError, VyperResourceError, VyperTimeoutError
+from vvm.scheduler import AdaptiveScheduler
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses shell scripts")
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    status = Path(f"/proc/{pid}/status")
+    # killed processes may linger as zombies if nothing reaps them
+    return not status.exists() or "zombie" not in status.read_text()
+
+
+@pytest.fixture
+def fake_vyper(tmp_path):
+    # creates a fake `vyper` executable that runs the given shell commands
+    def _make(body):
+        path = tmp_path.joinpath("vyper")
+        path.write_text(
+            "#!/bin/sh\n"
+            'if [ "$1" = "--version" ]; then echo "0.3.10+commit.9136169"; exit 0; fi\n'
+            f"{body}\n"
+        )
+        path.chmod(0o755)
+        return path
+
+    return _make
+
+
+def test_timeout_kills_process_group(fake_vyper, tmp_path):
+    pid_file = tmp_path.joinpath("pid")
+    vyper_binary = fake_vyper(f"echo partial >&2\nsleep 30 &\necho $! > {pid_file}\nwait")
+
+    start = time.monotonic()
+    with pytest.raises(VyperTimeoutError) as excinfo:
+        wrapper.vyper_wrapper(vyper_binary=vyper_binary, timeout=1)
+
+    assert time.monotonic() - start < 10
+    assert excinfo.value.stderr_data == "partial\n"
+    # the grandchild process was killed along with the compiler
+    time.sleep(0.1)
+    assert not _is_running(int(pid_file.read_text()))
+
+
+def test_cpu_time_limit(fake_vyper):
+    vyper_binary = fake_vyper("while :; do :; done")
+
+    with pytest.raises(VyperResourceError):
+        wrapper.vyper_wrapper(vyper_binary=vyper_binary, cpu_time_limit=1, timeout=30)
+
+
+def test_memory_limit(fake_vyper):
+    vyper_binary = fake_vyper(f"{sys.executable} -c 'bytearray(2**34)'")
+
+    with pytest.raises(VyperResourceError) as excinfo:
+        wrapper.vyper_wrapper(vyper_binary=vyper_binary, memory_limit=2**31)
+    assert "MemoryError" in excinfo.value.stderr_data
+
+
+def test_limits_without_prlimit(fake_vyper, monkeypatch):
+    # limits are applied by an exec wrapper where `resource.prlimit` is unavailable
+    monkeypatch.delattr(wrapper.resource, "prlimit")
+    vyper_binary = fake_vyper(f"{sys.executable} -c 'bytearray(2**34)'")
+
+    with pytest.raises(VyperResourceError) as excinfo:
+        wrapper.vyper_wrapper(vyper_binary=vyper_binary, memory_limit=2**31)
+    assert excinfo.value.command[0] == vyper_binary
+    stdoutdata, *_ = wrapper.vyper_wrapper(vyper_binary=fake_vyper("echo ok"), cpu_time_limit=5)
+    assert stdoutdata == "ok\n"
+
+
+@pytest.fixture
+def adaptive_scheduler():
+    sched = AdaptiveScheduler(4, max_retries=1)
+    sched.concurrency = 4
+    scheduler.set_scheduler(sched)
+    yield sched
+    scheduler.set_scheduler(None)
+
+
+def test_retry_killed(fake_vyper, tmp_path, adaptive_scheduler):
+    marker = tmp_path.joinpath("killed")
+    vyper_binary = fake_vyper(f"if [ ! -e {marker} ]; then touch {marker}; kill -9 $$; fi\necho ok")
+    stdoutdata, *_ = wrapper.vyper_wrapper(vyper_binary=vyper_binary)
+
+    assert stdoutdata.strip() == "ok"
+    assert adaptive_scheduler.kills == 1
+    assert adaptive_scheduler.concurrency == 2
+
+
+def test_retry_limit(fake_vyper, adaptive_scheduler):
+    vyper_binary = fake_vyper("kill -9 $$")
+    with pytest.raises(VyperError) as exc:
+        wrapper.vyper_wrapper(vyper_binary=vyper_binary)
+
+    assert exc.value.return_code == -9
+    assert adaptive_scheduler.kills == 2
+    assert adaptive_scheduler.stats().running == 0
+
+
+def test_no_retry_without_adaptive_scheduler(fake_vyper, tmp_path):
+    marker = tmp_path.joinpath("killed")
+    vyper_binary = fake_vyper(f"if [ ! -e {marker} ]; then touch {marker}; kill -9 $$; fi\necho ok")
+    with pytest.raises(VyperError):
+        wrapper.vyper_wrapper(vyper_binary=vyper_binary)
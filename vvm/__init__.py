@@ -1,9 +1,13 @@
+from vvm.contract import CompiledContract
 from vvm.install import (
     get_installable_vyper_versions,
     get_installed_vyper_versions,
     get_vvm_install_folder,
     install_vyper,
+    prune,
     set_vyper_version,
+    using_version,
 )
 from vvm.main import compile_files, compile_source, compile_standard, get_vyper_version
 from vvm.utils.versioning import detect_vyper_version_from_source
+from vvm.warmup import warm_up
@@ -0,0 +1,204 @@
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import List, Optional
+
+from vvm import planner, scheduler, server, trace
+from vvm.history import CompileHistory
+
+
+def _serve(args: argparse.Namespace) -> None:
+    server.serve(
+        host=args.host,
+        port=args.port,
+        unix_socket=args.unix_socket,
+        max_workers=args.workers,
+        cache_size=args.cache_size,
+        allow_paths=args.allow_paths,
+        allow_install=args.allow_install,
+    )
+
+
+def _history(args: argparse.Namespace) -> None:
+    history = CompileHistory(args.database)
+    regressions = history.compare(
+        args.base,
+        args.head,
+        by=args.by,
+        time_threshold=args.time_threshold,
+        size_threshold=args.size_threshold,
+    )
+    history.close()
+    if not regressions:
+        print(f"No regressions between {args.base} and {args.head}")
+        return
+
+    print(f"{len(regressions)} regression(s) between {args.base} and {args.head}:")
+    for i in regressions:
+        if i.metric == "duration":
+            print(
+                f"  {i.contract}: compile time {i.before:.3f}s -> {i.after:.3f}s (+{i.change:.0%})"
+            )
+        else:
+            print(f"  {i.contract}: bytecode size {i.before:.0f} -> {i.after:.0f} bytes")
+    sys.exit(1)
+
+
+def _replay(args: argparse.Namespace) -> None:
+    results = trace.replay(
+        args.trace,
+        vyper_binary=args.vyper_binary,
+        vyper_version=args.vyper_version,
+        concurrency=args.concurrency,
+    )
+    for i in results:
+        notes = []
+        if i.return_code != i.original_return_code:
+            notes.append(f"exit code {i.original_return_code} -> {i.return_code}")
+        if not i.output_match:
+            notes.append("output changed")
+        print(
+            f"  #{i.number}: {i.original_duration:.3f}s -> {i.duration:.3f}s ({i.change:+.0%})"
+            f"{'  ' + ', '.join(notes) if notes else ''}"
+        )
+
+    summary = trace.summarize(results)
+    print(
+        f"{summary['calls']} call(s): {summary['original_duration']:.3f}s -> "
+        f"{summary['duration']:.3f}s, {summary['output_changed']} with changed output, "
+        f"{summary['return_code_changed']} with changed exit code"
+    )
+
+
+def _build(args: argparse.Namespace) -> None:
+    history = CompileHistory(args.history) if args.history else None
+    plan = planner.plan_build(
+        args.files,
+        vyper_version=args.vyper_version,
+        evm_version=args.evm_version,
+        search_paths=args.search_paths,
+        max_workers=args.workers,
+        history=history,
+    )
+    print(plan.format())
+    if args.dry_run:
+        return
+
+    previous = scheduler.get_scheduler()
+    if args.adaptive:
+        # the plan's workers are an upper bound, compiles are admitted by available memory
+        scheduler.set_scheduler(scheduler.AdaptiveScheduler(len(plan.workers)))
+
+    start = time.perf_counter()
+    try:
+        if history is not None:
+            with history.record(args.build):
+                output = planner.execute_plan(plan)
+            history.close()
+        else:
+            output = planner.execute_plan(plan)
+    finally:
+        scheduler.set_scheduler(previous)
+    print(f"Compiled {len(output)} file(s) in {time.perf_counter() - start:.2f}s")
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(output, fp)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="vvm", description="Vyper version management tool")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable debug logging")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run a local compile server")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    serve_parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    serve_parser.add_argument("--unix-socket", help="Listen on a Unix socket instead of TCP")
+    serve_parser.add_argument(
+        "--workers", type=int, help="Maximum number of concurrent compiles (default: CPU count)"
+    )
+    serve_parser.add_argument(
+        "--cache-size", type=int, default=256, help="Number of compiler outputs to cache"
+    )
+    serve_parser.add_argument(
+        "--allow-paths",
+        action="store_true",
+        help="Accept file paths from clients, e.g. for compile_files",
+    )
+    serve_parser.add_argument(
+        "--allow-install",
+        action="store_true",
+        help="Allow clients to install vyper versions on the server",
+    )
+    serve_parser.set_defaults(func=_serve)
+
+    history_parser = subparsers.add_parser(
+        "history", help="Report compile time and bytecode size regressions"
+    )
+    history_parser.add_argument("database", help="Path of the compile history database")
+    history_parser.add_argument("base", help="Build label (or compiler version) to compare to")
+    history_parser.add_argument("head", help="Build label (or compiler version) to check")
+    history_parser.add_argument(
+        "--by", choices=("build", "compiler_version"), default="build", help="What to compare"
+    )
+    history_parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=0.1,
+        help="Minimum relative increase in compile time to report (default: 0.1)",
+    )
+    history_parser.add_argument(
+        "--size-threshold",
+        type=int,
+        default=0,
+        help="Minimum increase in bytecode size, in bytes, to report (default: 0)",
+    )
+    history_parser.set_defaults(func=_history)
+
+    replay_parser = subparsers.add_parser(
+        "replay", help="Run the vyper calls of a trace file again and compare timings"
+    )
+    replay_parser.add_argument("trace", help="Path of the trace file")
+    replay_parser.add_argument("--vyper-version", help="Installed vyper version to replay with")
+    replay_parser.add_argument("--vyper-binary", help="vyper binary to replay with")
+    replay_parser.add_argument(
+        "--concurrency", type=int, default=1, help="Number of calls to run at once (default: 1)"
+    )
+    replay_parser.set_defaults(func=_replay)
+
+    build_parser = subparsers.add_parser(
+        "build", help="Compile many files in parallel, slowest first"
+    )
+    build_parser.add_argument("files", nargs="+", help="Vyper source files to compile")
+    build_parser.add_argument("--vyper-version", help="vyper version to compile all files with")
+    build_parser.add_argument("--evm-version", help="EVM version to compile for")
+    build_parser.add_argument(
+        "--search-paths", nargs="*", help="Additional import search paths (vyper 0.4)"
+    )
+    build_parser.add_argument(
+        "--workers", type=int, help="Number of concurrent compiles (default: CPU count)"
+    )
+    build_parser.add_argument(
+        "--history", help="Compile history database used for estimates and updated by the build"
+    )
+    build_parser.add_argument("--build", help="Build label for compiles recorded to the history")
+    build_parser.add_argument("--output", help="Write the compiler output to a JSON file")
+    build_parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Adjust concurrency to available memory and retry compiles killed for lack of it",
+    )
+    build_parser.add_argument(
+        "--dry-run", action="store_true", help="Only print the plan, without compiling"
+    )
+    build_parser.set_defaults(func=_build)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
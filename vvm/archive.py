@@ -0,0 +1,243 @@
+import base64
+import binascii
+import hashlib
+import io
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+from packaging.version import Version
+
+from vvm import main, wrapper
+from vvm.exceptions import UnknownOption
+from vvm.install import get_executable
+from vvm.utils.convert import to_vyper_version
+
+# first version that can write and compile archives
+MIN_ARCHIVE_VERSION = Version("0.4.0")
+
+# timestamp given to every member of a normalized archive
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def _check_version(vyper_binary: Union[str, Path]) -> None:
+    version = wrapper._get_vyper_version(vyper_binary)
+    if version < MIN_ARCHIVE_VERSION:
+        raise UnknownOption(f"Vyper {version} does not support archives")
+
+
+def _to_bytes(archive: Union[bytes, str, Path]) -> bytes:
+    # accepts a zip file, the base64 encoded zip file, or the path of either.
+    # a string is a path if it names an existing file, and base64 otherwise
+    if isinstance(archive, str) and os.path.isfile(archive):
+        archive = Path(archive)
+    if isinstance(archive, Path):
+        archive = archive.read_bytes()
+    if isinstance(archive, str):
+        archive = archive.encode()
+    if archive.startswith(b"PK"):
+        return archive
+    try:
+        return base64.b64decode(archive, validate=True)
+    except binascii.Error:
+        raise ValueError("Archive is neither a zip file nor base64 encoded") from None
+
+
+def normalize_archive(archive: Union[bytes, str, Path]) -> bytes:
+    """
+    Rewrite an archive so that identical contents give identical bytes.
+
+    `vyper` stores the time of the build with each member, so archives of the
+    same sources differ from build to build. The normalized archive uses a
+    fixed timestamp and compression, and keeps the order of the members.
+
+    Arguments
+    ---------
+    archive : bytes | str | Path
+        Archive as a zip file, base64 encoded zip file, or the path of either.
+        A string is read as a path if it names an existing file.
+
+    Returns
+    -------
+    bytes
+        Normalized zip file.
+    """
+    output = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(_to_bytes(archive))) as source:
+        with zipfile.ZipFile(output, "w") as target:
+            for name in source.namelist():
+                info = zipfile.ZipInfo(name, _ZIP_DATE_TIME)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                target.writestr(info, source.read(name))
+    return output.getvalue()
+
+
+def archive_hash(archive: Union[bytes, str, Path]) -> str:
+    """
+    Return a hash of the files in an archive, for use as a cache key.
+
+    The hash covers the name and content of every member, including the
+    compiler version and settings in the manifest, but not timestamps or
+    compression, so rebuilding an archive from the same sources gives the
+    same hash. `archive` is given as for `normalize_archive`.
+    """
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(io.BytesIO(_to_bytes(archive))) as zf:
+        for name in sorted(zf.namelist()):
+            content = zf.read(name)
+            for data in (name.encode(), content):
+                digest.update(len(data).to_bytes(8, "big"))
+                digest.update(data)
+    return digest.hexdigest()
+
+
+def get_archive_version(archive: Union[bytes, str, Path]) -> Version:
+    """
+    Return the `vyper` version that built an archive.
+    """
+    with zipfile.ZipFile(io.BytesIO(_to_bytes(archive))) as zf:
+        version_str = zf.read("MANIFEST/compiler_version").decode().strip()
+    return to_vyper_version(version_str.lstrip("v").split("+")[0])
+
+
+def _get_target(archive: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        return zf.read("MANIFEST/compilation_targets").decode().strip()
+
+
+def build_archive(
+    source_file: Union[Path, str],
+    search_paths: Optional[List[Union[Path, str]]] = None,
+    evm_version: str = None,
+    vyper_binary: Union[str, Path] = None,
+    vyper_version: Union[str, Version, None] = None,
+    timeout: float = None,
+) -> bytes:
+    """
+    Build a self-contained archive of a Vyper contract and its imports.
+
+    The archive holds the contract, every module it imports, and the compiler
+    version and settings. It can be compiled with `compile_archive` on another
+    machine, without access to the original files. Requires Vyper 0.4.0 or
+    later.
+
+    Arguments
+    ---------
+    source_file : Path | str
+        Path of the contract. Files are stored in the archive by their path
+        relative to the current working directory, which should be the project
+        root so that the archive does not depend on where the project is.
+    search_paths : List[str | Path], optional
+        Additional search paths for imports.
+    evm_version : str, optional
+        EVM version, stored in the archive.
+    vyper_binary : str | Path, optional
+        Path of the `vyper` binary to use. If not given, the currently active
+        version is used (as set by `vvm.set_vyper_version`)
+    vyper_version : Version, optional
+        `vyper` version to use. If not given, the currently active version is used.
+        Ignored if `vyper_binary` is also given.
+    timeout : float, optional
+        Wall-clock time limit for the compiler, in seconds.
+
+    Returns
+    -------
+    bytes
+        Normalized zip file (see `normalize_archive`).
+    """
+    if vyper_binary is None:
+        vyper_binary = get_executable(vyper_version)
+    _check_version(vyper_binary)
+
+    output = main._compile(
+        vyper_binary=vyper_binary,
+        vyper_version=None,
+        output_format="archive",
+        source_files=[source_file],
+        base_path=None,
+        search_paths=search_paths,
+        evm_version=evm_version,
+        timeout=timeout,
+        base64=True,
+    )
+    return normalize_archive(output.strip())
+
+
+def compile_archive(
+    archive: Union[bytes, str, Path],
+    output_format: str = None,
+    vyper_binary: Union[str, Path] = None,
+    vyper_version: Union[str, Version, None] = None,
+    timeout: float = None,
+    cpu_time_limit: int = None,
+    memory_limit: int = None,
+) -> Any:
+    """
+    Compile a contract from an archive built with `build_archive` or `vyper -f archive`.
+
+    The compile does not read any other files, so its output depends only on
+    the archive and the compiler. If a remote cache is set (see
+    `vvm.remote_cache`), the output is read from and uploaded to the cache,
+    keyed by `archive_hash`.
+
+    Arguments
+    ---------
+    archive : bytes | str | Path
+        Archive as a zip file, base64 encoded zip file, or the path of either.
+        A string is read as a path if it names an existing file.
+    output_format : str, optional
+        Output format of the compiler. See `vyper --help` for more information.
+    vyper_binary : str | Path, optional
+        Path of the `vyper` binary to use.
+    vyper_version : Version, optional
+        `vyper` version to use. Ignored if `vyper_binary` is also given. If
+        neither is given, the version that built the archive is used.
+    timeout : float, optional
+        Wall-clock time limit for the compiler, in seconds. Raises `VyperTimeoutError`
+        if exceeded.
+    cpu_time_limit : int, optional
+        CPU time limit for the compiler, in seconds. Not available on Windows.
+    memory_limit : int, optional
+        Address space limit for the compiler, in bytes. Not available on Windows.
+
+    Returns
+    -------
+    Any
+        Compiler output (depends on `output_format`). For `combined_json` output
+        the contract is keyed by its path within the archive.
+    """
+    data = _to_bytes(archive)
+    if vyper_binary is None:
+        vyper_binary = get_executable(vyper_version or get_archive_version(data))
+    _check_version(vyper_binary)
+
+    digest = archive_hash(data)
+    options = {"output_format": output_format}
+    cache_key, cached = main._get_cached("compile_archive", vyper_binary, digest, options)
+    if cached is not None:
+        return cached
+
+    # written base64 encoded, so that the file can be recorded by `vvm.trace`
+    with tempfile.NamedTemporaryFile(suffix=".zip", prefix="vyper-") as archive_file:
+        archive_file.write(base64.b64encode(data))
+        archive_file.flush()
+
+        compiler_data = main._compile(
+            vyper_binary=vyper_binary,
+            vyper_version=None,
+            output_format=output_format,
+            source_files=[archive_file.name],
+            base_path=None,
+            timeout=timeout,
+            cpu_time_limit=cpu_time_limit,
+            memory_limit=memory_limit,
+            source_name=f"<archive:{digest[:12]}>",
+        )
+
+    if output_format in ("combined_json", None):
+        compiler_data.pop("version", None)
+        compiler_data = {_get_target(data): list(compiler_data.values())[0]}
+    main._set_cached(cache_key, compiler_data)
+    return compiler_data
@@ -0,0 +1,238 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from packaging.version import Version
+
+from vvm import wrapper
+from vvm.exceptions import VyperError
+from vvm.install import get_executable
+
+_Request = Tuple[str, str, Future]
+
+_STOP = object()
+
+
+class CompileBatcher:
+    """
+    Merge concurrent compile requests into a single standard JSON invocation.
+
+    Requests submitted from any thread are collected for up to `max_delay`
+    seconds (or until `max_batch_size` requests are pending) and compiled with
+    one call to `vyper --standard-json`. Output and errors are then split back
+    to the individual callers.
+
+    All sources in a batch must be self-contained, and are compiled with the
+    same compiler binary and settings.
+
+    Arguments
+    ---------
+    vyper_binary : str | Path, optional
+        Path of the `vyper` binary to use. If not given, the currently active
+        version is used (as set by `vvm.set_vyper_version`)
+    vyper_version: Version, optional
+        `vyper` version to use. If not given, the currently active version is used.
+        Ignored if `vyper_binary` is also given.
+    evm_version: str, optional
+        Select the desired EVM version. Valid options depend on the `vyper` version.
+    output_selection : List, optional
+        Standard JSON outputs to generate for each contract. Defaults to all outputs.
+    max_batch_size : int, optional
+        Maximum number of sources to compile in a single invocation.
+    max_delay : float, optional
+        Maximum time, in seconds, to wait for more requests before compiling.
+    """
+
+    def __init__(
+        self,
+        vyper_binary: Union[str, Path] = None,
+        vyper_version: Union[str, Version, None] = None,
+        evm_version: str = None,
+        output_selection: Optional[List[str]] = None,
+        max_batch_size: int = 32,
+        max_delay: float = 0.01,
+    ) -> None:
+        if vyper_binary is None:
+            vyper_binary = get_executable(vyper_version)
+        self.vyper_binary = Path(vyper_binary)
+        self.evm_version = evm_version
+        self.output_selection = output_selection or ["*"]
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __enter__(self) -> "CompileBatcher":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def submit(self, source: str, path: str = "contract.vy") -> Future:
+        """
+        Queue a source for compilation.
+
+        Arguments
+        ---------
+        source : str
+            Vyper contract to be compiled.
+        path : str, optional
+            Path of the source, used to name the contract in the output.
+
+        Returns
+        -------
+        Future
+            Resolves to the standard JSON output for this source only, or raises
+            `VyperError` if the source fails to compile.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("CompileBatcher has been closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._queue.put((source, path, future))
+        return future
+
+    def compile_source(self, source: str, path: str = "contract.vy") -> Dict:
+        """
+        Compile a source as part of the next batch and wait for the result.
+
+        Arguments
+        ---------
+        source : str
+            Vyper contract to be compiled.
+        path : str, optional
+            Path of the source, used to name the contract in the output.
+
+        Returns
+        -------
+        Dict
+            Standard JSON output for this source only.
+        """
+        return self.submit(source, path).result()
+
+    def close(self) -> None:
+        """
+        Compile any pending requests and stop the background thread.
+        """
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._compile_batch(batch)
+            if stop:
+                return
+
+    def _compile_batch(self, batch: List[_Request]) -> None:
+        pending = batch
+        while pending:
+            try:
+                pending = self._compile_once(pending)
+            except Exception as exc:
+                for _, _, future in pending:
+                    future.set_exception(exc)
+                return
+
+    def _compile_once(self, batch: List[_Request]) -> List[_Request]:
+        # compiles a batch, resolving futures for every request with a result or
+        # a known error. returns the requests that still need to be compiled.
+        keys = {f"{i}/{path}": (i, path) for i, (_, path, _) in enumerate(batch)}
+        input_data: Dict = {
+            "language": "Vyper",
+            "sources": {key: {"content": batch[i][0]} for key, (i, _) in keys.items()},
+            "settings": {"outputSelection": {"*": {"*": self.output_selection}}},
+        }
+        if self.evm_version is not None:
+            input_data["settings"]["evmVersion"] = self.evm_version
+
+        stdoutdata, stderrdata, command, proc = wrapper.vyper_wrapper(
+            vyper_binary=self.vyper_binary, stdin=json.dumps(input_data), standard_json=True
+        )
+        compiler_output = json.loads(stdoutdata)
+
+        errors: Dict[int, List] = {}
+        unattributed = []
+        for error in compiler_output.get("errors", []):
+            key = error.get("sourceLocation", {}).get("file")
+            if key in keys:
+                index, path = keys[key]
+                error = dict(error, sourceLocation=dict(error["sourceLocation"], file=path))
+                errors.setdefault(index, []).append(error)
+            elif error["severity"] == "error":
+                unattributed.append(error)
+
+        failed = {i for i, errs in errors.items() if any(e["severity"] == "error" for e in errs)}
+        if unattributed and len(batch) > 1:
+            # cannot tell which source caused the failure, compile them one by one
+            for request in batch:
+                self._compile_batch([request])
+            return []
+        if unattributed:
+            failed.add(0)
+            errors.setdefault(0, []).extend(unattributed)
+
+        if failed:
+            for index in failed:
+                error_list = errors[index]
+                message = "\n".join(
+                    error.get("formattedMessage") or error["message"]
+                    for error in error_list
+                    if error["severity"] == "error"
+                )
+                batch[index][2].set_exception(
+                    VyperError(
+                        message,
+                        command=command,
+                        return_code=proc.returncode,
+                        stdin_data=batch[index][0],
+                        stdout_data=stdoutdata,
+                        stderr_data=stderrdata,
+                        error_dict=error_list,
+                    )
+                )
+            # `vyper` stops at the first failing source, recompile the others
+            return [request for i, request in enumerate(batch) if i not in failed]
+
+        for key, (index, path) in keys.items():
+            result: Dict = {
+                "compiler": compiler_output.get("compiler"),
+                "contracts": {path: compiler_output.get("contracts", {}).get(key, {})},
+                "sources": {path: compiler_output.get("sources", {}).get(key, {})},
+            }
+            if index in errors:
+                result["errors"] = errors[index]
+            batch[index][2].set_result(result)
+        return []
@@ -0,0 +1,261 @@
+import base64
+import builtins
+import http.client
+import json
+import socket
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from packaging.version import Version
+
+from vvm import archive as _archive
+from vvm import exceptions
+from vvm.exceptions import VyperError
+from vvm.server import DEFAULT_PORT
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self._socket_path)
+        self.sock = sock
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (Path, Version)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_to_json(i) for i in value]
+    return value
+
+
+def _decode_exception(data: Dict) -> Exception:
+    exc_type = getattr(exceptions, data["type"], None) or getattr(builtins, data["type"], None)
+    if isinstance(exc_type, type) and issubclass(exc_type, VyperError):
+        return exc_type(
+            data["message"],
+            command=data["command"],
+            return_code=data["return_code"],
+            stdin_data=data["stdin_data"],
+            stdout_data=data["stdout_data"],
+            stderr_data=data["stderr_data"],
+            error_dict=data["error_dict"],
+        )
+    if isinstance(exc_type, type) and issubclass(exc_type, Exception):
+        return exc_type(data["message"])
+    return RuntimeError(f"{data['type']}: {data['message']}")
+
+
+class VvmClient:
+    """
+    Client for a `vvm` compile server.
+
+    Methods mirror the functions of the same name in `vvm`. Errors raised on
+    the server are raised again in the client, using the same exception type
+    where possible.
+
+    Arguments
+    ---------
+    host : str, optional
+        Address of the server. Defaults to localhost.
+    port : int, optional
+        Port of the server.
+    unix_socket : Path | str, optional
+        Connect to a server listening on this Unix domain socket instead.
+    timeout : float, optional
+        Timeout for each request, in seconds.
+    priority : int | str, optional
+        Priority class of requests made by this client, e.g. `"interactive"` or
+        `"batch"`. See `vvm.scheduler`.
+    tenant : str, optional
+        Name of the user or service making requests, for fair sharing.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        unix_socket: Union[Path, str] = None,
+        timeout: Optional[float] = None,
+        priority: Union[int, str, None] = None,
+        tenant: Optional[str] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.unix_socket = None if unix_socket is None else str(unix_socket)
+        self.timeout = timeout
+        self.priority = priority
+        self.tenant = tenant
+
+    def __repr__(self) -> str:
+        address = self.unix_socket or f"{self.host}:{self.port}"
+        return f"<VvmClient '{address}'>"
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.unix_socket is not None:
+            return _UnixHTTPConnection(self.unix_socket, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def call(self, method: str, **kwargs: Any) -> Any:
+        """
+        Call a method on the server.
+
+        Arguments
+        ---------
+        method : str
+            Name of the method to call.
+        **kwargs : Any
+            Keyword arguments for the method. Arguments that are `None` are omitted.
+
+        Returns
+        -------
+        Any
+            Result of the call.
+        """
+        data = self._request(method, kwargs)
+        if "error" in data:
+            raise _decode_exception(data["error"])
+        return data["result"]
+
+    def _request(self, method: str, kwargs: Dict) -> Dict:
+        # sends a request and returns the decoded response. only raises on
+        # transport errors, errors from the server are included in the response.
+        body = json.dumps({k: _to_json(v) for k, v in kwargs.items() if v is not None})
+        headers = {"Content-Type": "application/json"}
+        if self.priority is not None:
+            headers["X-Vvm-Priority"] = str(self.priority)
+        if self.tenant is not None:
+            headers["X-Vvm-Tenant"] = self.tenant
+        conn = self._connect()
+        try:
+            conn.request("POST", f"/{method}", body=body, headers=headers)
+            response = conn.getresponse()
+            return json.loads(response.read())
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        """
+        Return the queue depth and wait times of the server's scheduler.
+        See `vvm.scheduler.SchedulerStats`.
+        """
+        conn = self._connect()
+        try:
+            conn.request("GET", "/stats")
+            return json.loads(conn.getresponse().read())["result"]
+        finally:
+            conn.close()
+
+    def compile_source(
+        self,
+        source: str,
+        base_path: Union[Path, str] = None,
+        evm_version: str = None,
+        vyper_version: Union[str, Version, None] = None,
+        output_format: str = None,
+    ) -> Any:
+        """
+        Compile a Vyper contract on the server. See `vvm.compile_source`.
+
+        `base_path` is only accepted by servers started with `allow_paths`.
+        """
+        return self.call(
+            "compile_source",
+            source=source,
+            base_path=base_path,
+            evm_version=evm_version,
+            vyper_version=vyper_version,
+            output_format=output_format,
+        )
+
+    def compile_files(
+        self,
+        source_files: Union[List, Path, str],
+        base_path: Optional[Union[Path, str]] = None,
+        evm_version: str = None,
+        vyper_version: Union[str, Version, None] = None,
+        output_format: str = None,
+        search_paths: Optional[List[Union[Path, str]]] = None,
+    ) -> Any:
+        """
+        Compile one or more Vyper source files on the server. See `vvm.compile_files`.
+
+        Paths are resolved on the server, which is expected to share a filesystem
+        with the client. Only available on servers started with `allow_paths`.
+        """
+        return self.call(
+            "compile_files",
+            source_files=source_files,
+            base_path=base_path,
+            evm_version=evm_version,
+            vyper_version=vyper_version,
+            output_format=output_format,
+            search_paths=search_paths,
+        )
+
+    def compile_standard(
+        self,
+        input_data: Dict,
+        base_path: str = None,
+        vyper_version: Version = None,
+        output_fields: Optional[List[str]] = None,
+    ) -> Dict:
+        """
+        Compile Vyper contracts using the JSON-input-output interface on the server.
+        See `vvm.compile_standard`. `base_path` is only accepted by servers
+        started with `allow_paths`.
+        """
+        return self.call(
+            "compile_standard",
+            input_data=input_data,
+            base_path=base_path,
+            vyper_version=vyper_version,
+            output_fields=output_fields,
+        )
+
+    def compile_archive(
+        self,
+        archive: Union[bytes, str, Path],
+        output_format: str = None,
+        vyper_version: Union[str, Version, None] = None,
+    ) -> Any:
+        """
+        Compile a contract from an archive on the server. See `vvm.archive.compile_archive`.
+
+        The archive is given as for `vvm.archive.compile_archive`, and is read by
+        the client, so the server does not need access to the archive or the
+        sources.
+        """
+        data = _archive._to_bytes(archive)
+        return self.call(
+            "compile_archive",
+            archive=base64.b64encode(data).decode(),
+            output_format=output_format,
+            vyper_version=vyper_version,
+        )
+
+    def install_vyper(self, version: Union[str, Version] = "latest") -> Version:
+        """
+        Install a version of `vyper` on the server. See `vvm.install_vyper`.
+
+        Only available if the server was started with `allow_install`.
+        """
+        return Version(self.call("install_vyper", version=version))
+
+    def get_installed_vyper_versions(self) -> List[Version]:
+        """
+        Return a list of `vyper` versions installed on the server.
+        """
+        return [Version(i) for i in self.call("get_installed_vyper_versions")]
+
+    def get_vyper_version(self) -> Version:
+        """
+        Get the version of the active `vyper` binary on the server.
+        """
+        return Version(self.call("get_vyper_version"))
@@ -0,0 +1,248 @@
+from typing import Any, Dict, List, Tuple, Union
+
+_Code = Union[str, bytes]
+
+# standard JSON outputs read by `CompiledContract.from_standard_json`, for use as
+# the `output_fields` argument of `vvm.compile_standard`
+STANDARD_JSON_FIELDS = [
+    "abi",
+    "evm.bytecode.object",
+    "evm.deployedBytecode.object",
+    "evm.methodIdentifiers",
+]
+
+
+def _decode_hex(value: _Code) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if value.startswith("0x"):
+        value = value[2:]
+    return bytes.fromhex(value)
+
+
+def _to_hex(value: _Code) -> str:
+    if isinstance(value, bytes):
+        return f"0x{value.hex()}"
+    if value.startswith("0x"):
+        return value
+    return f"0x{value}"
+
+
+class CompiledContract:
+    """
+    Compact, typed view of a single compiled contract.
+
+    Bytecode is kept as the hex string returned by `vyper` and only decoded
+    to `bytes` the first time it is accessed. The decoded value is cached.
+
+    Attributes
+    ----------
+    name : str
+        Contract name (standard JSON) or source path (combined JSON).
+    abi : List
+        Contract ABI.
+    metadata : Any
+        Contract metadata, if it was requested from the compiler.
+    method_identifiers : Dict
+        Mapping of function signatures to their 4 byte selector.
+    extra : Dict
+        Any remaining fields of the compiler output for this contract.
+    """
+
+    __slots__ = (
+        "name",
+        "abi",
+        "metadata",
+        "method_identifiers",
+        "extra",
+        "_bytecode",
+        "_bytecode_runtime",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        abi: List = None,
+        bytecode: _Code = "",
+        bytecode_runtime: _Code = "",
+        metadata: Any = None,
+        method_identifiers: Dict = None,
+        extra: Dict = None,
+    ) -> None:
+        self.name = name
+        self.abi = abi or []
+        self.metadata = metadata
+        self.method_identifiers = method_identifiers or {}
+        self.extra = extra or {}
+        self._bytecode = bytecode
+        self._bytecode_runtime = bytecode_runtime
+
+    def __repr__(self) -> str:
+        return f"<CompiledContract '{self.name}'>"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CompiledContract):
+            return NotImplemented
+        return (
+            self.name == other.name
+            and self.abi == other.abi
+            and self.bytecode == other.bytecode
+            and self.bytecode_runtime == other.bytecode_runtime
+            and self.metadata == other.metadata
+            and self.method_identifiers == other.method_identifiers
+            and self.extra == other.extra
+        )
+
+    @property
+    def bytecode(self) -> bytes:
+        """Deployment bytecode."""
+        if not isinstance(self._bytecode, bytes):
+            self._bytecode = _decode_hex(self._bytecode)
+        return self._bytecode
+
+    @property
+    def bytecode_runtime(self) -> bytes:
+        """Runtime (deployed) bytecode."""
+        if not isinstance(self._bytecode_runtime, bytes):
+            self._bytecode_runtime = _decode_hex(self._bytecode_runtime)
+        return self._bytecode_runtime
+
+    @property
+    def bytecode_hex(self) -> str:
+        """Deployment bytecode as a `0x`-prefixed hex string."""
+        return _to_hex(self._bytecode)
+
+    @property
+    def bytecode_runtime_hex(self) -> str:
+        """Runtime bytecode as a `0x`-prefixed hex string."""
+        return _to_hex(self._bytecode_runtime)
+
+    def __getstate__(self) -> Tuple:
+        # a flat tuple pickles much smaller than a `__dict__`, and bytecode is
+        # stored in whichever form (hex or bytes) it currently has
+        return (
+            self.name,
+            self.abi,
+            self._bytecode,
+            self._bytecode_runtime,
+            self.metadata,
+            self.method_identifiers,
+            self.extra,
+        )
+
+    def __setstate__(self, state: Tuple) -> None:
+        (
+            self.name,
+            self.abi,
+            self._bytecode,
+            self._bytecode_runtime,
+            self.metadata,
+            self.method_identifiers,
+            self.extra,
+        ) = state
+
+    @classmethod
+    def from_combined_json(cls, name: str, data: Dict) -> "CompiledContract":
+        """
+        Create a `CompiledContract` from a single entry of `combined_json` output.
+
+        Arguments
+        ---------
+        name : str
+            Name or path of the contract.
+        data : Dict
+            Compiler output for the contract.
+
+        Returns
+        -------
+        CompiledContract
+            Typed compiler output.
+        """
+        extra = data.copy()
+        return cls(
+            name,
+            abi=extra.pop("abi", None),
+            bytecode=extra.pop("bytecode", ""),
+            bytecode_runtime=extra.pop("bytecode_runtime", ""),
+            metadata=extra.pop("metadata", None),
+            method_identifiers=extra.pop("method_identifiers", None),
+            extra=extra,
+        )
+
+    @classmethod
+    def from_standard_json(cls, name: str, data: Dict) -> "CompiledContract":
+        """
+        Create a `CompiledContract` from a single contract of standard JSON output.
+
+        Arguments
+        ---------
+        name : str
+            Name of the contract.
+        data : Dict
+            Compiler output for the contract, i.e. `output["contracts"][path][name]`.
+
+        Returns
+        -------
+        CompiledContract
+            Typed compiler output.
+        """
+        extra = data.copy()
+        evm = extra.pop("evm", {}).copy()
+        bytecode = evm.pop("bytecode", {}).get("object", "")
+        bytecode_runtime = evm.pop("deployedBytecode", {}).get("object", "")
+        method_identifiers = evm.pop("methodIdentifiers", None)
+        if evm:
+            extra["evm"] = evm
+        return cls(
+            name,
+            abi=extra.pop("abi", None),
+            bytecode=bytecode,
+            bytecode_runtime=bytecode_runtime,
+            metadata=extra.pop("metadata", None),
+            method_identifiers=method_identifiers,
+            extra=extra,
+        )
+
+
+def from_combined_json(compiler_output: Dict) -> Dict[str, CompiledContract]:
+    """
+    Convert the output of `compile_source` or `compile_files` to typed results.
+
+    Arguments
+    ---------
+    compiler_output : Dict
+        Compiler output using the `combined_json` format.
+
+    Returns
+    -------
+    Dict
+        Mapping of source paths to `CompiledContract` objects.
+    """
+    return {
+        name: CompiledContract.from_combined_json(name, data)
+        for name, data in compiler_output.items()
+        if name != "version"
+    }
+
+
+def from_standard_json(compiler_output: Dict) -> Dict[str, Dict[str, CompiledContract]]:
+    """
+    Convert the output of `compile_standard` to typed results.
+
+    Arguments
+    ---------
+    compiler_output : Dict
+        Compiler JSON output.
+
+    Returns
+    -------
+    Dict
+        Mapping of source paths to contract names to `CompiledContract` objects.
+    """
+    return {
+        path: {
+            name: CompiledContract.from_standard_json(name, data)
+            for name, data in contracts.items()
+        }
+        for path, contracts in compiler_output.get("contracts", {}).items()
+    }
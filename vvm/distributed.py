@@ -0,0 +1,224 @@
+import http.client
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from packaging.version import Version
+
+from vvm.client import VvmClient, _decode_exception
+from vvm.exceptions import VyperNotInstalled, WorkerError
+from vvm.install import LOGGER
+from vvm.utils.convert import to_vyper_version
+
+# transport errors, that indicate a problem with the worker rather than the job
+_WORKER_ERRORS = (OSError, ValueError, http.client.HTTPException)
+
+_Job = Tuple[str, Dict[str, Any]]
+
+
+class _Worker:
+    def __init__(self, client: VvmClient, slots: int) -> None:
+        self.client = client
+        self.slots = slots
+        self.active = 0
+        self.alive = True
+        self.versions: Set[Version] = set()
+
+    def __repr__(self) -> str:
+        return f"<_Worker {self.client!r} active={self.active} alive={self.alive}>"
+
+
+class DistributedExecutor:
+    """
+    Run compile jobs on a pool of remote `vvm` workers.
+
+    Each worker is a `vvm` compile server (started with `vvm serve`). Jobs are
+    sent to the least loaded worker that has the requested `vyper` version
+    installed. If a worker cannot be reached the job is retried on another
+    worker, and the failed worker is no longer used. Jobs that cannot be run
+    because the workers have failed raise `WorkerError`.
+
+    Only `compile_source` and `compile_standard` are portable between hosts, as
+    `compile_files` reads paths on the worker.
+
+    Arguments
+    ---------
+    workers : List
+        `VvmClient` objects, or `"host:port"` strings, for each worker.
+    slots : int, optional
+        Maximum number of concurrent jobs sent to each worker.
+    max_retries : int, optional
+        Number of times a job is retried on another worker when a worker fails.
+    """
+
+    def __init__(
+        self,
+        workers: Iterable[Union[VvmClient, str]],
+        slots: int = 4,
+        max_retries: int = 2,
+    ) -> None:
+        self.max_retries = max_retries
+        self._workers = [_Worker(_to_client(i), slots) for i in workers]
+        if not self._workers:
+            raise ValueError("At least one worker is required")
+        self._condition = threading.Condition()
+        self._last_error: Optional[BaseException] = None
+        self._executor = ThreadPoolExecutor(slots * len(self._workers))
+        self.refresh()
+
+    def __enter__(self) -> "DistributedExecutor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    @property
+    def workers(self) -> List[VvmClient]:
+        """Clients for all workers that are currently reachable."""
+        return [i.client for i in self._workers if i.alive]
+
+    def refresh(self) -> None:
+        """
+        Update the version inventory of each worker.
+
+        Workers that cannot be reached are marked as failed; workers that respond
+        again are used again.
+        """
+        for worker in self._workers:
+            try:
+                versions = set(worker.client.get_installed_vyper_versions())
+            except _WORKER_ERRORS as exc:
+                LOGGER.warning(f"vvm worker {worker.client!r} is unavailable: {exc}")
+                with self._condition:
+                    worker.alive = False
+                    self._last_error = exc
+                continue
+            with self._condition:
+                worker.versions = versions
+                worker.alive = True
+                self._condition.notify_all()
+
+    def installed_versions(self) -> List[Version]:
+        """Return all `vyper` versions installed on at least one worker."""
+        with self._condition:
+            versions = set().union(*(i.versions for i in self._workers if i.alive))
+        return sorted(versions, reverse=True)
+
+    def submit(self, method: str, **kwargs: Any) -> Future:
+        """
+        Run a compile function on a worker.
+
+        Arguments
+        ---------
+        method : str
+            Name of the function to call, e.g. `"compile_source"`.
+        **kwargs : Any
+            Keyword arguments for the function.
+
+        Returns
+        -------
+        Future
+            Resolves to the result of the function.
+        """
+        return self._executor.submit(self._run, method, kwargs)
+
+    def compile_source(self, source: str, **kwargs: Any) -> Future:
+        """Compile a Vyper contract on a worker. See `vvm.compile_source`."""
+        return self.submit("compile_source", source=source, **kwargs)
+
+    def compile_standard(self, input_data: Dict, **kwargs: Any) -> Future:
+        """Compile using the JSON-input-output interface on a worker. See `vvm.compile_standard`."""
+        return self.submit("compile_standard", input_data=input_data, **kwargs)
+
+    def map(self, jobs: Iterable[_Job]) -> Iterator[Tuple[_Job, Future]]:
+        """
+        Run many jobs and stream back the results as they complete.
+
+        Arguments
+        ---------
+        jobs : Iterable
+            `(method, kwargs)` tuples.
+
+        Yields
+        ------
+        Tuple
+            `(job, future)` for each job, in order of completion. The future is done.
+        """
+        futures = {self.submit(method, **kwargs): (method, kwargs) for method, kwargs in jobs}
+        for future in as_completed(futures):
+            yield futures[future], future
+
+    def _acquire(self, version: Optional[Version], exclude: Set[int]) -> _Worker:
+        with self._condition:
+            while True:
+                candidates = [
+                    i
+                    for i in self._workers
+                    if i.alive
+                    and id(i) not in exclude
+                    and (version is None or version in i.versions)
+                ]
+                if not candidates:
+                    # failed workers with an unknown inventory may have had the version
+                    failed = [
+                        i
+                        for i in self._workers
+                        if (not i.alive or id(i) in exclude)
+                        and (version is None or version in i.versions or not i.versions)
+                    ]
+                    if failed and self._last_error is not None:
+                        raise WorkerError(
+                            "All vvm workers that could run the job have failed, "
+                            f"last error: {self._last_error}"
+                        ) from self._last_error
+                    raise VyperNotInstalled(
+                        f"No available vvm worker has vyper {version} installed"
+                    )
+                free = [i for i in candidates if i.active < i.slots]
+                if free:
+                    worker = min(free, key=lambda i: i.active / i.slots)
+                    worker.active += 1
+                    return worker
+                self._condition.wait()
+
+    def _release(self, worker: _Worker, error: Optional[BaseException] = None) -> None:
+        with self._condition:
+            worker.active -= 1
+            if error is not None:
+                worker.alive = False
+                self._last_error = error
+            self._condition.notify_all()
+
+    def _run(self, method: str, kwargs: Dict) -> Any:
+        version = kwargs.get("vyper_version")
+        version = None if version is None else to_vyper_version(version)
+        tried: Set[int] = set()
+
+        while True:
+            worker = self._acquire(version, tried)
+            try:
+                response = worker.client._request(method, kwargs)
+            except _WORKER_ERRORS as exc:
+                self._release(worker, error=exc)
+                tried.add(id(worker))
+                LOGGER.warning(f"vvm worker {worker.client!r} failed: {exc}")
+                if len(tried) > self.max_retries:
+                    raise WorkerError(
+                        f"Job failed on {len(tried)} vvm workers, last error: {exc}"
+                    ) from exc
+                continue
+            self._release(worker)
+
+            if "error" in response:
+                raise _decode_exception(response["error"])
+            return response["result"]
+
+
+def _to_client(worker: Union[VvmClient, str]) -> VvmClient:
+    if isinstance(worker, VvmClient):
+        return worker
+    host, _, port = worker.rpartition(":")
+    return VvmClient(host, int(port))
@@ -1,4 +1,18 @@
-from typing import Dict, List
+import json
+import os
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from vvm.utils import diagnostics
+from vvm.utils.diagnostics import Diagnostic
+
+# `VyperError` output longer than this, in characters, is spilled to disk
+MAX_DATA_LENGTH = 2**16
+
+# directory for spill files. if `None`, the system temporary directory is used
+SPILL_DIRECTORY: Optional[str] = None
 
 # Exceptions
 
@@ -20,6 +34,15 @@ class UnknownValue(Exception):
 
 
 class VyperError(Exception):
+    """
+    Raised when `vyper` fails to compile.
+
+    `stdin_data`, `stdout_data` and `stderr_data` longer than `MAX_DATA_LENGTH`
+    characters are written to a temporary spill file, and only a truncated copy
+    is kept in memory. The full values are read back from the file when the
+    attributes are accessed.
+    """
+
     message = "An error occurred during execution"
 
     def __init__(
@@ -30,28 +53,150 @@ class VyperError(Exception):
         stdin_data: str = None,
         stdout_data: str = None,
         stderr_data: str = None,
-        error_dict: Dict = None,
+        error_dict: Union[Dict, List] = None,
+        diagnostics: List[Diagnostic] = None,
     ) -> None:
         if message is not None:
             self.message = message
         self.command = command or []
         self.return_code = return_code
-        self.stdin_data = stdin_data
-        self.stderr_data = stderr_data
-        self.stdout_data = stdout_data
         self.error_dict = error_dict
+        self._diagnostics = diagnostics
+        self._data: Dict[str, Optional[str]] = {}
+        self._spill_path: Optional[Path] = None
+        self._store(stdin_data=stdin_data, stdout_data=stdout_data, stderr_data=stderr_data)
 
     def __str__(self) -> str:
+        # uses the truncated output, so that formatting never reads the spill file
         return (
             f"{self.message}"
             f"\n> command: `{' '.join(str(i) for i in self.command)}`"
             f"\n> return code: `{self.return_code}`"
             "\n> stdout:"
-            f"\n{self.stdout_data}"
+            f"\n{self._data['stdout_data']}"
             "\n> stderr:"
-            f"\n{self.stderr_data}"
+            f"\n{self._data['stderr_data']}"
         ).strip()
 
+    def __reduce__(self) -> Tuple:
+        kwargs = {
+            "message": self.message,
+            "command": self.command,
+            "return_code": self.return_code,
+            "stdin_data": self.stdin_data,
+            "stdout_data": self.stdout_data,
+            "stderr_data": self.stderr_data,
+            "error_dict": self.error_dict,
+            "diagnostics": self._diagnostics,
+        }
+        return _restore_error, (type(self), kwargs)
+
+    @property
+    def diagnostics(self) -> List[Diagnostic]:
+        """
+        Errors and warnings reported by the compiler, parsed from the standard
+        JSON output or from `stderr`.
+        """
+        if self._diagnostics is None:
+            if isinstance(self.error_dict, list):
+                self._diagnostics = diagnostics.from_standard_json(self.error_dict)
+            else:
+                self._diagnostics = diagnostics.from_stderr(self.stderr_data or "")
+        return self._diagnostics
+
+    @property
+    def stdin_data(self) -> Optional[str]:
+        return self._load("stdin_data")
+
+    @stdin_data.setter
+    def stdin_data(self, value: Optional[str]) -> None:
+        self._store(stdin_data=value)
+
+    @property
+    def stdout_data(self) -> Optional[str]:
+        return self._load("stdout_data")
+
+    @stdout_data.setter
+    def stdout_data(self, value: Optional[str]) -> None:
+        self._store(stdout_data=value)
+
+    @property
+    def stderr_data(self) -> Optional[str]:
+        return self._load("stderr_data")
+
+    @stderr_data.setter
+    def stderr_data(self, value: Optional[str]) -> None:
+        self._store(stderr_data=value)
+
+    def _store(self, **data: Optional[str]) -> None:
+        spill: Dict[str, str] = {
+            k: v for k, v in data.items() if v is not None and len(v) > MAX_DATA_LENGTH
+        }
+        if spill or self._spill_path is not None:
+            spilled = self._read_spill_file()
+            for key in data:
+                spilled.pop(key, None)
+            spilled.update(spill)
+            self._write_spill_file(spilled)
+        for key, value in data.items():
+            self._data[key] = _truncate(spill[key]) if key in spill else value
+
+    def _load(self, key: str) -> Optional[str]:
+        if self._spill_path is not None:
+            spilled = self._read_spill_file()
+            if key in spilled:
+                return spilled[key]
+        return self._data[key]
+
+    def _read_spill_file(self) -> Dict[str, str]:
+        if self._spill_path is None:
+            return {}
+        try:
+            return json.loads(self._spill_path.read_text(encoding="utf8"))
+        except (OSError, ValueError):
+            # the file was removed, fall back to the truncated output
+            return {}
+
+    def _write_spill_file(self, spilled: Dict[str, str]) -> None:
+        try:
+            if self._spill_path is None:
+                fd, path = tempfile.mkstemp(
+                    prefix="vvm-error-", suffix=".json", dir=SPILL_DIRECTORY
+                )
+                os.close(fd)
+                self._spill_path = Path(path)
+                weakref.finalize(self, _unlink, self._spill_path)
+            self._spill_path.write_text(json.dumps(spilled), encoding="utf8")
+        except OSError:
+            # only the truncated output is kept
+            pass
+
+
+def _truncate(value: str) -> str:
+    half = MAX_DATA_LENGTH // 2
+    return (
+        f"{value[:half]}\n... [{len(value) - 2 * half} characters truncated] ...\n{value[-half:]}"
+    )
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+def _restore_error(cls: type, kwargs: Dict) -> VyperError:
+    return cls(**kwargs)
+
+
+class VyperTimeoutError(VyperError):
+    message = "Compilation did not finish within the time limit"
+
+
+class VyperResourceError(VyperError):
+    message = "Compilation exceeded a resource limit"
+
 
 class VyperInstallationError(Exception):
     pass
@@ -61,6 +206,13 @@ class VyperNotInstalled(Exception):
     pass
 
 
+class WorkerError(Exception):
+    """
+    Raised by `DistributedExecutor` when no worker can run a job because the
+    workers have failed. The last worker failure is chained as `__cause__`.
+    """
+
+
 # Warnings
 
 
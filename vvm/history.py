@@ -0,0 +1,252 @@
+import json
+import sqlite3
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from packaging.version import Version
+
+from vvm import wrapper
+from vvm.utils.convert import hex_size
+from vvm.utils.hooks import HookRegistry
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS compiles (
+    id INTEGER PRIMARY KEY,
+    build TEXT,
+    timestamp REAL NOT NULL,
+    contract TEXT NOT NULL,
+    compiler_version TEXT NOT NULL,
+    flags TEXT NOT NULL,
+    duration REAL NOT NULL,
+    output_size INTEGER NOT NULL,
+    bytecode_size INTEGER,
+    batch_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS compiles_build ON compiles (build);
+CREATE INDEX IF NOT EXISTS compiles_version ON compiles (compiler_version);
+"""
+
+_recorders: HookRegistry["CompileHistory"] = HookRegistry()
+
+
+class HistoryEntry(NamedTuple):
+    """
+    A single recorded compile of one contract.
+    """
+
+    build: Optional[str]
+    timestamp: float
+    contract: str
+    compiler_version: str
+    flags: Dict
+    duration: float
+    output_size: int
+    bytecode_size: Optional[int]
+    batch_size: int
+
+
+class Regression(NamedTuple):
+    """
+    A contract that got slower to compile or larger between two builds.
+    """
+
+    contract: str
+    metric: str
+    before: float
+    after: float
+
+    @property
+    def change(self) -> float:
+        """Relative change, e.g. `0.25` for a 25% increase."""
+        return (self.after - self.before) / self.before if self.before else float("inf")
+
+
+class CompileHistory:
+    """
+    SQLite database of compile durations and output sizes.
+
+    Use `record` to store every compile performed via `vvm.compile_source`,
+    `vvm.compile_files` and `vvm.compile_standard`, and `compare` to find
+    regressions between two builds or compiler versions.
+
+    Arguments
+    ---------
+    path : Path | str
+        Location of the database file. Created if it does not exist.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self.build: Optional[str] = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def __repr__(self) -> str:
+        return f"<CompileHistory '{self.path}'>"
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def record(self, build: Optional[str] = None) -> Iterator["CompileHistory"]:
+        """
+        Record all compiles performed within the context.
+
+        Arguments
+        ---------
+        build : str, optional
+            Label for the recorded compiles, e.g. a commit hash or CI build number.
+        """
+        self.build = build
+        with _recorders.register(self):
+            yield self
+
+    def add(self, entries: List[HistoryEntry]) -> None:
+        """
+        Store compile records in the database.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO compiles (build, timestamp, contract, compiler_version, flags,"
+                " duration, output_size, bytecode_size, batch_size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (*i[:4], json.dumps(i.flags, sort_keys=True, default=str), *i[5:])
+                    for i in entries
+                ],
+            )
+
+    def entries(
+        self, build: Optional[str] = None, compiler_version: Union[str, Version, None] = None
+    ) -> List[HistoryEntry]:
+        """
+        Return recorded compiles, optionally filtered by build or compiler version.
+        """
+        query = (
+            "SELECT build, timestamp, contract, compiler_version, flags, duration,"
+            " output_size, bytecode_size, batch_size FROM compiles WHERE 1=1"
+        )
+        params: List = []
+        if build is not None:
+            query += " AND build = ?"
+            params.append(build)
+        if compiler_version is not None:
+            query += " AND compiler_version = ?"
+            params.append(str(compiler_version))
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        return [HistoryEntry._make((*i[:4], json.loads(i[4]), *i[5:])) for i in rows]
+
+    def compare(
+        self,
+        base: str,
+        head: str,
+        by: str = "build",
+        time_threshold: float = 0.1,
+        size_threshold: int = 0,
+    ) -> List[Regression]:
+        """
+        Find contracts that compile slower or produce larger bytecode in `head`
+        than in `base`.
+
+        Arguments
+        ---------
+        base : str
+            Build label (or compiler version) to compare against.
+        head : str
+            Build label (or compiler version) to check for regressions.
+        by : str, optional
+            Either `"build"` or `"compiler_version"`.
+        time_threshold : float, optional
+            Minimum relative increase of the median compile time that is reported.
+        size_threshold : int, optional
+            Minimum increase of the bytecode size, in bytes, that is reported.
+
+        Returns
+        -------
+        List
+            `Regression` objects, with the largest relative change first.
+        """
+        if by not in ("build", "compiler_version"):
+            raise ValueError("'by' must be 'build' or 'compiler_version'")
+
+        before = _summarize(self.entries(**{by: base}))
+        after = _summarize(self.entries(**{by: head}))
+
+        regressions = []
+        for contract in sorted(before.keys() & after.keys()):
+            (duration_a, size_a), (duration_b, size_b) = before[contract], after[contract]
+            if duration_b > duration_a * (1 + time_threshold):
+                regressions.append(Regression(contract, "duration", duration_a, duration_b))
+            if size_a is not None and size_b is not None and size_b - size_a > size_threshold:
+                regressions.append(Regression(contract, "bytecode_size", size_a, size_b))
+        return sorted(regressions, key=lambda i: i.change, reverse=True)
+
+
+def _summarize(entries: List[HistoryEntry]) -> Dict[str, Tuple[float, Optional[int]]]:
+    # median duration and most recent bytecode size for each contract
+    durations: Dict[str, List[float]] = {}
+    sizes: Dict[str, Optional[int]] = {}
+    for entry in entries:
+        durations.setdefault(entry.contract, []).append(entry.duration)
+        sizes[entry.contract] = entry.bytecode_size
+    return {k: (statistics.median(v), sizes[k]) for k, v in durations.items()}
+
+
+def _record(
+    vyper_binary: Union[Path, str],
+    flags: Dict,
+    duration: float,
+    output: Any,
+    output_size: int,
+    source_name: Optional[str] = None,
+) -> None:
+    # called by `vvm.main` after every successful compile
+    recorders = _recorders.active()
+    if not recorders:
+        return
+
+    contracts: Dict[str, Optional[int]] = {}
+    if isinstance(output, dict) and "contracts" in output:
+        # standard json
+        for path, data in output["contracts"].items():
+            for name, contract in data.items():
+                bytecode = contract.get("evm", {}).get("bytecode", {}).get("object")
+                contracts[f"{path}:{name}"] = hex_size(bytecode)
+    elif isinstance(output, dict) and flags.get("f") == "combined_json":
+        for path, data in output.items():
+            if path != "version":
+                contracts[source_name or path] = hex_size(data.get("bytecode"))
+    else:
+        source_files = flags.get("source_files") or []
+        if isinstance(source_files, (str, Path)):
+            source_files = [source_files]
+        for path in source_files:
+            contracts[source_name or str(path)] = None
+
+    timestamp = time.time()
+    compiler_version = wrapper._get_vyper_version(vyper_binary)
+    flags = {k: v for k, v in flags.items() if k != "source_files"}
+    for recorder in recorders:
+        recorder.add(
+            [
+                HistoryEntry(
+                    recorder.build,
+                    timestamp,
+                    contract,
+                    str(compiler_version),
+                    flags,
+                    duration,
+                    output_size,
+                    size,
+                    len(contracts),
+                )
+                for contract, size in contracts.items()
+            ]
+        )
@@ -0,0 +1,323 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from packaging.version import Version
+
+from vvm import wrapper
+from vvm.utils.hooks import HookRegistry
+from vvm.utils.keccak import keccak256
+
+# each distinct signature is stored once, and linked to the artifacts that implement it
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY,
+    contract TEXT NOT NULL,
+    compiler_version TEXT NOT NULL,
+    UNIQUE (contract, compiler_version)
+);
+CREATE TABLE IF NOT EXISTS signatures (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    selector BLOB NOT NULL,
+    UNIQUE (signature, kind)
+);
+CREATE INDEX IF NOT EXISTS signatures_selector ON signatures (selector);
+CREATE TABLE IF NOT EXISTS implements (
+    signature INTEGER NOT NULL,
+    artifact INTEGER NOT NULL,
+    PRIMARY KEY (signature, artifact)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS implements_artifact ON implements (artifact);
+"""
+
+_QUERY = (
+    "SELECT a.contract, a.compiler_version, s.kind, s.signature, s.selector"
+    " FROM signatures s JOIN implements i ON i.signature = s.id"
+    " JOIN artifacts a ON a.id = i.artifact"
+)
+
+_recorders: HookRegistry["ArtifactIndex"] = HookRegistry()
+
+
+class IndexMatch(NamedTuple):
+    """
+    A function or event of an indexed contract.
+    """
+
+    contract: str
+    compiler_version: str
+    kind: str
+    signature: str
+    selector: str
+
+
+def _canonical_type(param: Dict) -> str:
+    type_ = param["type"]
+    if type_.startswith("tuple"):
+        components = ",".join(_canonical_type(i) for i in param.get("components", []))
+        return f"({components}){type_[5:]}"
+    return type_
+
+
+def abi_signature(item: Dict) -> str:
+    """
+    Return the canonical signature of an ABI function or event, e.g.
+    `transfer(address,uint256)`.
+    """
+    return f"{item['name']}({','.join(_canonical_type(i) for i in item.get('inputs', []))})"
+
+
+def get_abi_selectors(
+    abi: List[Dict], method_identifiers: Optional[Dict] = None
+) -> List[Tuple[str, str, bytes]]:
+    """
+    Return the `(kind, signature, selector)` of each function and event in an ABI.
+
+    Functions have a 4 byte selector and events a 32 byte topic. Selectors in
+    `method_identifiers` are used as given, and add functions that are not in
+    the ABI.
+    """
+    found: Dict[Tuple[str, str], bytes] = {}
+    for item in abi:
+        kind = item.get("type", "function")
+        if kind in ("function", "event") and "name" in item:
+            signature = abi_signature(item)
+            digest = keccak256(signature.encode())
+            found[(kind, signature)] = digest if kind == "event" else digest[:4]
+    for signature, selector in (method_identifiers or {}).items():
+        found[("function", signature)] = _to_selector(selector, 4)
+    return [(kind, signature, selector) for (kind, signature), selector in found.items()]
+
+
+def _to_selector(value: Union[str, bytes, int], length: int) -> bytes:
+    if isinstance(value, int):
+        return value.to_bytes(length, "big")
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if len(value) != length:
+        raise ValueError(f"Expected a {length} byte value, got {len(value)} bytes")
+    return value
+
+
+def _iter_contracts(output: Any, source_name: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+    # yields `(contract, data)` for the contracts of a combined or standard JSON output
+    if not isinstance(output, dict):
+        return
+    if "contracts" in output:
+        for path, data in output["contracts"].items():
+            for name, contract in data.items():
+                yield f"{path}:{name}", contract
+        return
+    for path, data in output.items():
+        if path != "version" and isinstance(data, dict):
+            yield source_name or path, data
+
+
+def _method_identifiers(data: Dict) -> Optional[Dict]:
+    if "method_identifiers" in data:
+        return data["method_identifiers"]
+    return data.get("evm", {}).get("methodIdentifiers")
+
+
+class ArtifactIndex:
+    """
+    SQLite index of the functions and events implemented by compiled contracts.
+
+    Maps function selectors, event topics and signatures to the contracts and
+    compiler versions that implement them, so that they can be looked up
+    without scanning every compiler output. Use `add_output` to index outputs
+    as they are produced, or `record` to index every compile performed via
+    `vvm.compile_source`, `vvm.compile_files` and `vvm.compile_standard`.
+
+    Arguments
+    ---------
+    path : Path | str
+        Location of the database file. Created if it does not exist.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def __repr__(self) -> str:
+        return f"<ArtifactIndex '{self.path}'>"
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def record(self) -> Iterator["ArtifactIndex"]:
+        """
+        Index the output of all compiles performed within the context.
+        """
+        with _recorders.register(self):
+            yield self
+
+    def add(
+        self,
+        contract: str,
+        compiler_version: Union[str, Version],
+        abi: List[Dict],
+        method_identifiers: Optional[Dict] = None,
+    ) -> None:
+        """
+        Index a contract, replacing any previous entry for the same contract
+        and compiler version.
+        """
+        selectors = get_abi_selectors(abi, method_identifiers)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO artifacts (contract, compiler_version) VALUES (?, ?)",
+                (contract, str(compiler_version)),
+            )
+            (artifact,) = self._conn.execute(
+                "SELECT id FROM artifacts WHERE contract = ? AND compiler_version = ?",
+                (contract, str(compiler_version)),
+            ).fetchone()
+            self._conn.execute("DELETE FROM implements WHERE artifact = ?", (artifact,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO signatures (kind, signature, selector) VALUES (?, ?, ?)",
+                selectors,
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO implements (signature, artifact)"
+                " SELECT id, ? FROM signatures WHERE signature = ? AND kind = ?",
+                [(artifact, signature, kind) for kind, signature, _ in selectors],
+            )
+
+    def add_output(
+        self, output: Any, compiler_version: Union[str, Version], source_name: Optional[str] = None
+    ) -> List[str]:
+        """
+        Index the contracts of a combined JSON or standard JSON compiler output.
+
+        Standard JSON contracts are indexed as `path:name`. Contracts without
+        an ABI in the output are skipped.
+
+        Arguments
+        ---------
+        output : Any
+            Output of `vvm.compile_source`, `vvm.compile_files` or `vvm.compile_standard`.
+        compiler_version : str | Version
+            `vyper` version that produced the output.
+        source_name : str, optional
+            Name to index a single contract of a combined JSON output under,
+            e.g. for the output of `compile_source`.
+
+        Returns
+        -------
+        List
+            Names of the indexed contracts.
+        """
+        added = []
+        for contract, data in _iter_contracts(output, source_name):
+            if "abi" in data or _method_identifiers(data):
+                self.add(contract, compiler_version, data.get("abi", []), _method_identifiers(data))
+                added.append(contract)
+        return added
+
+    def remove(self, contract: str, compiler_version: Union[str, Version, None] = None) -> None:
+        """
+        Remove a contract from the index, for one or all compiler versions.
+        """
+        query = "SELECT id FROM artifacts WHERE contract = ?"
+        params: List = [contract]
+        if compiler_version is not None:
+            query += " AND compiler_version = ?"
+            params.append(str(compiler_version))
+        with self._lock, self._conn:
+            ids = [(i,) for (i,) in self._conn.execute(query, params).fetchall()]
+            self._conn.executemany("DELETE FROM implements WHERE artifact = ?", ids)
+            self._conn.executemany("DELETE FROM artifacts WHERE id = ?", ids)
+
+    def _find(self, where: str, params: Iterable) -> List[IndexMatch]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"{_QUERY} WHERE {where} ORDER BY a.contract, a.compiler_version, s.signature",
+                tuple(params),
+            ).fetchall()
+        return [
+            IndexMatch(contract, version, kind, signature, f"0x{selector.hex()}")
+            for contract, version, kind, signature, selector in rows
+        ]
+
+    def find_selector(self, selector: Union[str, bytes, int]) -> List[IndexMatch]:
+        """
+        Return the functions with a 4 byte selector, e.g. `"0xa9059cbb"`.
+        """
+        return self._find("s.selector = ? AND s.kind = 'function'", [_to_selector(selector, 4)])
+
+    def find_topic(self, topic: Union[str, bytes, int]) -> List[IndexMatch]:
+        """
+        Return the events with a 32 byte topic.
+        """
+        return self._find("s.selector = ? AND s.kind = 'event'", [_to_selector(topic, 32)])
+
+    def find_signature(self, signature: str) -> List[IndexMatch]:
+        """
+        Return the functions and events with a canonical signature, e.g.
+        `"Transfer(address,address,uint256)"`.
+        """
+        return self._find("s.signature = ?", [signature.replace(" ", "")])
+
+    def find_interface(self, interface: List[Union[Dict, str]]) -> List[Tuple[str, str]]:
+        """
+        Return the contracts that implement every function and event of an interface.
+
+        Arguments
+        ---------
+        interface : List
+            ABI of the interface, or canonical function signatures.
+
+        Returns
+        -------
+        List
+            `(contract, compiler_version)` of each matching contract.
+        """
+        required: List[Tuple[str, str]] = []
+        for item in interface:
+            if isinstance(item, str):
+                required.append(("function", item.replace(" ", "")))
+            else:
+                required.extend((kind, sig) for kind, sig, _ in get_abi_selectors([item]))
+        required = list(dict.fromkeys(required))
+        if not required:
+            return []
+        conditions = " OR ".join(["(s.kind = ? AND s.signature = ?)"] * len(required))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.contract, a.compiler_version FROM signatures s"
+                " JOIN implements i ON i.signature = s.id JOIN artifacts a ON a.id = i.artifact"
+                f" WHERE {conditions} GROUP BY a.id HAVING COUNT(*) = ?"
+                " ORDER BY a.contract, a.compiler_version",
+                [i for pair in required for i in pair] + [len(required)],
+            ).fetchall()
+        return [(contract, version) for contract, version in rows]
+
+    def contracts(self) -> List[Tuple[str, str]]:
+        """
+        Return the `(contract, compiler_version)` of every indexed contract.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT contract, compiler_version FROM artifacts"
+                " ORDER BY contract, compiler_version"
+            ).fetchall()
+        return [(contract, version) for contract, version in rows]
+
+
+def _record(vyper_binary: Union[Path, str], output: Any, source_name: Optional[str] = None) -> None:
+    # called by `vvm.main` after every successful compile
+    indexes = _recorders.active()
+    if not indexes:
+        return
+    compiler_version = wrapper._get_vyper_version(vyper_binary)
+    for index in indexes:
+        index.add_output(output, compiler_version, source_name)
@@ -2,12 +2,17 @@ import logging
 import os
 import stat
 import sys
+import threading
+import time
 import warnings
 from base64 import b64encode
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Set, Union
 
 from packaging.version import Version
+from requests.exceptions import RequestException
 
 from vvm import wrapper
 from vvm.exceptions import (
@@ -18,7 +23,7 @@ from vvm.exceptions import (
     VyperNotInstalled,
 )
 from vvm.utils.convert import to_vyper_version
-from vvm.utils.lock import get_process_lock
+from vvm.utils.lock import binary_not_in_use, get_process_lock
 
 try:
     from tqdm import tqdm
@@ -42,12 +47,26 @@ except ImportError:
 
 GITHUB_RELEASES = "https://api.github.com/repos/vyperlang/vyper/releases?per_page=100"
 
+# (connect, read) timeout in seconds for all HTTP requests
+REQUEST_TIMEOUT = (10, 60)
+# number of times an interrupted download is resumed, and the initial delay between attempts
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_BACKOFF = 1.0
+DOWNLOAD_CHUNK_SIZE = 2**16
+
 LOGGER = logging.getLogger("vvm")
 
 VVM_BINARY_PATH_VARIABLE = "VVM_BINARY_PATH"
+VVM_SHARED_BINARY_PATHS_VARIABLE = "VVM_SHARED_BINARY_PATHS"
 
 _default_vyper_binary = None
+_active_vyper_binary: "ContextVar[Optional[Path]]" = ContextVar("vyper_binary", default=None)
 _installable_vyper_versions: Optional[List[Version]] = None
+_installable_lock = threading.Lock()
+
+# minimum number of seconds between updates of the last-use time of a binary
+_LAST_USE_RESOLUTION = 60
+_last_use: Dict[str, float] = {}
 
 
 def _get_os_name() -> str:
@@ -86,6 +105,50 @@ def get_vvm_install_folder(vvm_binary_path: Union[Path, str] = None) -> Path:
         return path
 
 
+def get_vvm_shared_folders() -> List[Path]:
+    """
+    Return read-only directories that are searched for `vyper` binaries before
+    the install folder.
+
+    Shared folders are set with the `VVM_SHARED_BINARY_PATHS` environment variable,
+    as a list of paths separated by `os.pathsep`. They allow many users or containers
+    on one machine to use the same binaries, for example from a directory baked into
+    an image. `vvm` never writes to a shared folder.
+
+    Returns
+    -------
+    List
+        Existing shared folders, in the order they are searched.
+    """
+    paths = os.getenv(VVM_SHARED_BINARY_PATHS_VARIABLE, "").split(os.pathsep)
+    return [Path(i) for i in paths if i and Path(i).is_dir()]
+
+
+def get_vvm_install_folders(vvm_binary_path: Union[Path, str] = None) -> List[Path]:
+    """
+    Return all directories that are searched for `vyper` binaries.
+
+    Arguments
+    ---------
+    vvm_binary_path : Path | str, optional
+        User-defined path, used to override the default installation directory.
+
+    Returns
+    -------
+    List
+        Shared folders followed by the writable install folder.
+    """
+    return get_vvm_shared_folders() + [get_vvm_install_folder(vvm_binary_path)]
+
+
+def _find_binary(version: Version, vvm_binary_path: Union[Path, str, None]) -> Optional[Path]:
+    for folder in get_vvm_install_folders(vvm_binary_path):
+        path = _get_binary_path(folder, version)
+        if path.exists():
+            return path
+    return None
+
+
 def get_executable(
     version: Union[str, Version] = None, vvm_binary_path: Union[Path, str] = None
 ) -> Path:
@@ -96,7 +159,8 @@ def get_executable(
     ---------
     version : str | Version, optional
         Installed `vyper` version to get the path of. If not given, returns the
-        path of the active version.
+        path of the active version for the current context (see `using_version`),
+        or the version set by `set_vyper_version`.
     vvm_binary_path : Path | str, optional
         User-defined path, used to override the default installation directory.
 
@@ -106,26 +170,43 @@ def get_executable(
         `vyper` executable.
     """
     if not version:
+        active_binary = _active_vyper_binary.get()
+        if active_binary is not None:
+            _touch(active_binary)
+            return active_binary
         if not _default_vyper_binary:
             raise VyperNotInstalled(
                 "Vyper is not installed. Call vvm.get_available_vyper_versions()"
                 " to view for available versions and vvm.install_vyper() to install."
             )
+        _touch(_default_vyper_binary)
         return _default_vyper_binary
 
     version = to_vyper_version(version)
-    vyper_bin = get_vvm_install_folder(vvm_binary_path).joinpath(f"vyper-{version}")
-    if _get_os_name() == "windows":
-        vyper_bin = vyper_bin.with_name(f"{vyper_bin.name}.exe")
-
-    if not vyper_bin.exists():
+    vyper_bin = _find_binary(version, vvm_binary_path)
+    if vyper_bin is None:
         raise VyperNotInstalled(
             f"vyper {version} has not been installed."
             f" Use vvm.install_vyper('{version}') to install."
         )
+    _touch(vyper_bin)
     return vyper_bin
 
 
+def _touch(vyper_bin: Path) -> None:
+    # record the last-use time of a binary as its modification time. updates
+    # are throttled so that repeated calls do not each cost a syscall.
+    now = time.time()
+    key = str(vyper_bin)
+    if now - _last_use.get(key, 0) < _LAST_USE_RESOLUTION:
+        return
+    _last_use[key] = now
+    try:
+        os.utime(vyper_bin)
+    except OSError:
+        pass
+
+
 def set_vyper_version(
     version: Union[str, Version], silent: bool = False, vvm_binary_path: Union[Path, str] = None
 ) -> None:
@@ -149,6 +230,40 @@ def set_vyper_version(
         LOGGER.info(f"Using vyper version {version}")
 
 
+@contextmanager
+def using_version(
+    version: Union[str, Version], vvm_binary_path: Union[Path, str] = None
+) -> Iterator[Path]:
+    """
+    Set the active `vyper` version for the current thread or asyncio task.
+
+    Within the context, compiles that do not specify a version use the given
+    version. Unlike `set_vyper_version`, this does not affect other threads or
+    tasks, so differently versioned compiles may run concurrently.
+
+    Note that threads started inside the context (e.g. by a thread pool) do not
+    inherit the active version, unless they are run with `contextvars.copy_context`.
+
+    Arguments
+    ---------
+    version : str | Version
+        Installed `vyper` version to use.
+    vvm_binary_path : Path | str, optional
+        User-defined path, used to override the default installation directory.
+
+    Yields
+    ------
+    Path
+        `vyper` executable.
+    """
+    vyper_binary = get_executable(version, vvm_binary_path)
+    token = _active_vyper_binary.set(vyper_binary)
+    try:
+        yield vyper_binary
+    finally:
+        _active_vyper_binary.reset(token)
+
+
 def _get_headers(headers: Optional[Dict]) -> Dict:
     if headers is None and os.getenv("GITHUB_TOKEN") is not None:
         auth = b64encode(os.environ["GITHUB_TOKEN"].encode()).decode()
@@ -158,7 +273,7 @@ def _get_headers(headers: Optional[Dict]) -> Dict:
 
 
 def _get_releases(headers: Optional[Dict]) -> Dict:
-    data = SESSION.get(GITHUB_RELEASES, headers=headers)
+    data = SESSION.get(GITHUB_RELEASES, headers=headers, timeout=REQUEST_TIMEOUT)
     if data.status_code != 200:
         msg = (
             f"Status {data.status_code} when getting Vyper versions from Github:"
@@ -189,26 +304,28 @@ def get_installable_vyper_versions(headers: Dict = None) -> List[Version]:
         List of Versions objects of installable `vyper` versions.
     """
     global _installable_vyper_versions
-    if _installable_vyper_versions is not None:
-        return _installable_vyper_versions
+    with _installable_lock:
+        if _installable_vyper_versions is not None:
+            return _installable_vyper_versions
 
-    version_list = []
+        version_list = []
 
-    headers = _get_headers(headers)
+        headers = _get_headers(headers)
 
-    for release in _get_releases(headers):
-        version = Version(release["tag_name"])
-        asset = next((i for i in release["assets"] if _get_os_name() in i["name"]), False)
-        if asset:
-            version_list.append(version)
+        for release in _get_releases(headers):
+            version = Version(release["tag_name"])
+            asset = next((i for i in release["assets"] if _get_os_name() in i["name"]), False)
+            if asset:
+                version_list.append(version)
 
-    _installable_vyper_versions = sorted(version_list, reverse=True)
-    return _installable_vyper_versions
+        _installable_vyper_versions = sorted(version_list, reverse=True)
+        return _installable_vyper_versions
 
 
 def get_installed_vyper_versions(vvm_binary_path: Union[Path, str] = None) -> List[Version]:
     """
-    Return a list of currently installed `vyper` versions.
+    Return a list of currently installed `vyper` versions, including those in
+    shared folders.
 
     Arguments
     ---------
@@ -220,12 +337,13 @@ def get_installed_vyper_versions(vvm_binary_path: Union[Path, str] = None) -> Li
     List
         List of Version objects of installed `vyper` versions.
     """
-    install_path = get_vvm_install_folder(vvm_binary_path)
-    if _get_os_name() == "windows":
-        version_list = [i.stem[6:] for i in install_path.glob("vyper-*")]
-    else:
-        version_list = [i.name[6:] for i in install_path.glob("vyper-*")]
-    return sorted([Version(i) for i in version_list], reverse=True)
+    version_list: Set[str] = set()
+    for install_path in get_vvm_install_folders(vvm_binary_path):
+        if _get_os_name() == "windows":
+            version_list.update(i.stem[6:] for i in install_path.glob("vyper-*"))
+        else:
+            version_list.update(i.name[6:] for i in install_path.glob("vyper-*"))
+    return sorted({Version(i) for i in version_list}, reverse=True)
 
 
 # TODO: maybe rename this function to `ensure_installed`
@@ -269,9 +387,10 @@ def install_vyper(
     process_lock = get_process_lock(str(version))
 
     with process_lock:
-        if _check_for_installed_version(version, vvm_binary_path):
-            path = get_vvm_install_folder(vvm_binary_path).joinpath(f"vyper-{version}")
+        path = _find_binary(version, vvm_binary_path)
+        if path is not None:
             LOGGER.info(f"vyper {version} already installed at: {path}")
+            _link_to_install_folder(path, version, vvm_binary_path)
             return version
 
         headers = _get_headers(headers)
@@ -287,9 +406,7 @@ def install_vyper(
             install_path = install_path.with_name(f"{install_path.name}.exe")
 
         url = asset["browser_download_url"]
-        content = _download_vyper(url, headers, show_progress)
-        with open(install_path, "wb") as fp:
-            fp.write(content)
+        _download_vyper(url, headers, show_progress, install_path)
 
         if os_name != "windows":
             install_path.chmod(install_path.stat().st_mode | stat.S_IEXEC)
@@ -300,38 +417,195 @@ def install_vyper(
     return version
 
 
+def prune(
+    max_bytes: Optional[int] = None,
+    keep: int = 0,
+    vvm_binary_path: Union[Path, str] = None,
+    dry_run: bool = False,
+) -> List[Version]:
+    """
+    Remove the least recently used `vyper` binaries from the install folder.
+
+    The last-use time of a binary is updated by `get_executable`. The active
+    versions (see `set_vyper_version` and `using_version`), versions that are
+    currently being installed and binaries that are running a compile in any
+    process are never removed. Binaries hardlinked from a shared folder are
+    neither counted towards the size of the install folder nor removed.
+
+    Arguments
+    ---------
+    max_bytes : int, optional
+        Remove binaries until the total size of the install folder is at most
+        this many bytes. If not given, all binaries except those protected by
+        `keep` are removed.
+    keep : int, optional
+        Number of most recently used versions that are always kept.
+    vvm_binary_path : Path | str, optional
+        User-defined path, used to override the default installation directory.
+    dry_run : bool, optional
+        If True, only return the versions that would be removed.
+
+    Returns
+    -------
+    List
+        Versions that were removed, least recently used first.
+    """
+    install_path = get_vvm_install_folder(vvm_binary_path)
+    installed = []
+    for version in get_installed_vyper_versions(vvm_binary_path):
+        path = _get_binary_path(install_path, version)
+        if not path.exists():
+            # binaries in shared folders are never removed
+            continue
+        st = path.stat()
+        if st.st_nlink > 1:
+            # hardlinked from a shared folder, removing it frees no space
+            continue
+        installed.append((st.st_mtime, st.st_size, version, path))
+
+    # most recently used first
+    installed.sort(key=lambda i: i[0], reverse=True)
+    total_size = sum(i[1] for i in installed)
+    active = {Path(i).absolute() for i in (_default_vyper_binary, _active_vyper_binary.get()) if i}
+
+    removed = []
+    for _, size, version, path in reversed(installed[keep:]):
+        if max_bytes is not None and total_size <= max_bytes:
+            break
+        if path.absolute() in active:
+            continue
+
+        process_lock = get_process_lock(str(version))
+        if not process_lock.acquire(False):
+            # this version is being installed
+            continue
+        try:
+            with binary_not_in_use(path) as unused:
+                if not unused:
+                    continue
+                if not dry_run:
+                    path.unlink()
+                    wrapper._version_cache.pop(str(path), None)
+                    LOGGER.info(f"Removed vyper {version} from {install_path}")
+        except OSError as exc:
+            LOGGER.warning(f"Could not remove vyper {version}: {exc}")
+            continue
+        finally:
+            process_lock.release()
+
+        total_size -= size
+        removed.append(version)
+
+    return removed
+
+
+def _get_binary_path(install_path: Path, version: Version) -> Path:
+    path = install_path.joinpath(f"vyper-{version}")
+    if _get_os_name() == "windows":
+        path = path.with_name(f"{path.name}.exe")
+    return path
+
+
 def _check_for_installed_version(
     version: Version, vvm_binary_path: Union[Path, str] = None
 ) -> bool:
-    path = get_vvm_install_folder(vvm_binary_path).joinpath(f"vyper-{version}")
-    return path.exists()
+    return _find_binary(version, vvm_binary_path) is not None
+
+
+def _link_to_install_folder(
+    path: Path, version: Version, vvm_binary_path: Union[Path, str, None]
+) -> None:
+    # hardlink a binary from a shared folder into the install folder, so that it
+    # stays available if the shared folder changes. this uses no extra disk space,
+    # and is skipped when the folders are on different filesystems.
+    target = _get_binary_path(get_vvm_install_folder(vvm_binary_path), version)
+    if target.exists():
+        return
+    try:
+        os.link(path, target)
+    except OSError as exc:
+        LOGGER.debug(f"Could not link {path} to {target}: {exc}")
+
+
+class _RetryableDownloadError(Exception):
+    pass
 
 
-def _download_vyper(url: str, headers: Dict, show_progress: bool) -> bytes:
+def _download_vyper(url: str, headers: Dict, show_progress: bool, path: Path) -> None:
+    # download to a partial file next to `path`. on connection errors and server
+    # errors the download is retried with exponential backoff, resuming from the
+    # end of the partial file with a Range request.
+    partial_path = path.with_name(f".{path.name}.part")
     LOGGER.info(f"Downloading from {url}")
-    response = SESSION.get(url, headers=headers, stream=show_progress)
-    if response.status_code == 404:
-        raise DownloadError(
-            "404 error when attempting to download from {} - are you sure this"
-            " version of vyper is available?".format(url)
-        )
-    if response.status_code != 200:
-        raise DownloadError(
-            f"Received status code {response.status_code} when attempting to download from {url}"
-        )
-    if not show_progress:
-        return response.content
 
-    total_size = int(response.headers.get("content-length", 0))
-    progress_bar = tqdm(total=total_size, unit="iB", unit_scale=True)
-    content = bytes()
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        if attempt:
+            delay = DOWNLOAD_BACKOFF * 2 ** (attempt - 1)
+            LOGGER.info(f"Retrying download in {delay:.1f}s (attempt {attempt + 1})")
+            time.sleep(delay)
+        try:
+            _download_partial(url, headers, show_progress, partial_path)
+        except _RetryableDownloadError as exc:
+            if attempt == DOWNLOAD_RETRIES:
+                raise DownloadError(f"Failed to download from {url}: {exc}") from exc
+            LOGGER.warning(f"Download from {url} interrupted: {exc}")
+            continue
+        partial_path.replace(path)
+        return
+
+
+def _download_partial(url: str, headers: Dict, show_progress: bool, partial_path: Path) -> None:
+    offset = partial_path.stat().st_size if partial_path.exists() else 0
+    if offset:
+        headers = dict(headers, Range=f"bytes={offset}-")
 
-    for data in response.iter_content(None, decode_unicode=True):
-        progress_bar.update(len(data))
-        content += data
-    progress_bar.close()
+    try:
+        response = SESSION.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
+    except RequestException as exc:
+        raise _RetryableDownloadError(str(exc)) from exc
+
+    with response:
+        if response.status_code == 404:
+            raise DownloadError(
+                "404 error when attempting to download from {} - are you sure this"
+                " version of vyper is available?".format(url)
+            )
+        if response.status_code == 416:
+            # the partial file is invalid, start over
+            partial_path.unlink()
+            raise _RetryableDownloadError("Requested range not satisfiable")
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableDownloadError(f"Received status code {response.status_code}")
+        if response.status_code not in (200, 206):
+            raise DownloadError(
+                f"Received status code {response.status_code} when attempting"
+                f" to download from {url}"
+            )
+        if response.status_code == 200:
+            # the server ignored the Range header
+            offset = 0
 
-    return content
+        content_length = response.headers.get("content-length")
+        expected_size = None if content_length is None else offset + int(content_length)
+        progress_bar = None
+        if show_progress:
+            progress_bar = tqdm(total=expected_size, initial=offset, unit="iB", unit_scale=True)
+
+        try:
+            with partial_path.open("ab" if offset else "wb") as fp:
+                for data in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    fp.write(data)
+                    if progress_bar is not None:
+                        progress_bar.update(len(data))
+        except RequestException as exc:
+            raise _RetryableDownloadError(str(exc)) from exc
+        finally:
+            if progress_bar is not None:
+                progress_bar.close()
+
+    size = partial_path.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise _RetryableDownloadError(f"Received {size} of {expected_size} bytes")
 
 
 def _validate_installation(version: Version, vvm_binary_path: Union[Path, str, None]) -> None:
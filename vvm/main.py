@@ -1,13 +1,18 @@
+import contextvars
 import json
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from packaging.version import Version
 
-from vvm import wrapper
+from vvm import history, index, remote_cache, scheduler, wrapper
 from vvm.exceptions import VyperError
-from vvm.install import get_executable
+from vvm.install import LOGGER, get_executable
+from vvm.utils.selection import narrow_output_selection
+from vvm.utils.splitting import merge_standard_output, split_standard_input
 
 
 def get_vyper_version() -> Version:
@@ -30,6 +35,10 @@ def compile_source(
     vyper_binary: Union[str, Path] = None,
     vyper_version: Union[str, Version, None] = None,
     output_format: str = None,
+    timeout: float = None,
+    cpu_time_limit: int = None,
+    memory_limit: int = None,
+    contract_name: str = None,
 ) -> Any:
     """
     Compile a Vyper contract.
@@ -37,6 +46,9 @@ def compile_source(
     Compilation is handled via the `--combined-json` flag. Depending on the vyper
     version used, some keyword arguments may not be available.
 
+    If a remote cache is set (see `vvm.remote_cache`), the output is read from
+    and uploaded to the cache, unless `base_path` is given.
+
     Arguments
     ---------
     source: str
@@ -54,6 +66,17 @@ def compile_source(
         Ignored if `vyper_binary` is also given.
     output_format: str, optional
         Output format of the compiler. See `vyper --help` for more information.
+    timeout : float, optional
+        Wall-clock time limit for the compiler, in seconds. Raises `VyperTimeoutError`
+        if exceeded.
+    cpu_time_limit : int, optional
+        CPU time limit for the compiler, in seconds. Not available on Windows.
+    memory_limit : int, optional
+        Address space limit for the compiler, in bytes. Not available on Windows.
+    contract_name : str, optional
+        Name the contract is recorded under by `vvm.history` and `vvm.index`.
+        Defaults to `<stdin>`, so sources compiled without a name replace each
+        other in an `ArtifactIndex`.
 
     Returns
     -------
@@ -61,6 +84,16 @@ def compile_source(
         Compiler output (depends on `output_format`).
         For JSON output the return type is a dictionary, otherwise it is a string.
     """
+    if vyper_binary is None:
+        vyper_binary = get_executable(vyper_version)
+
+    cache_key = None
+    if base_path is None:
+        # with a base path, the output may depend on imported files
+        options = {"evm_version": evm_version, "output_format": output_format}
+        cache_key, cached = _get_cached("compile_source", vyper_binary, source, options)
+        if cached is not None:
+            return cached
 
     with tempfile.NamedTemporaryFile(suffix=".vy", prefix="vyper-") as source_file:
         source_file.write(source.encode())
@@ -73,6 +106,10 @@ def compile_source(
             base_path=base_path,
             evm_version=evm_version,
             output_format=output_format,
+            timeout=timeout,
+            cpu_time_limit=cpu_time_limit,
+            memory_limit=memory_limit,
+            source_name=contract_name or "<stdin>",
         )
 
     if output_format in ("combined_json", None):
@@ -80,10 +117,29 @@ def compile_source(
         # the `list(compiler_data.values())[0]` on the next line, so remove it.
         # Assumes the source file is not named `version` (without extension)
         compiler_data.pop("version", None)
-        return {"<stdin>": list(compiler_data.values())[0]}
+        compiler_data = {"<stdin>": list(compiler_data.values())[0]}
+    _set_cached(cache_key, compiler_data)
     return compiler_data
 
 
+def _get_cached(
+    method: str, vyper_binary: Union[str, Path], data: Any, options: Dict
+) -> Tuple[Optional[str], Any]:
+    # returns the remote cache key and the cached output, if there is a remote cache
+    cache = remote_cache.get_remote_cache()
+    if cache is None:
+        return None, None
+    version = wrapper._get_vyper_version(vyper_binary)
+    key = remote_cache.cache_key(method, version, data, options)
+    return key, cache.get(key)
+
+
+def _set_cached(key: Optional[str], output: Any) -> None:
+    cache = remote_cache.get_remote_cache()
+    if key is not None and cache is not None:
+        cache.put(key, output)
+
+
 def compile_files(
     source_files: Union[List, Path, str],
     base_path: Optional[Union[Path, str]] = None,
@@ -92,6 +148,9 @@ def compile_files(
     vyper_version: Union[str, Version, None] = None,
     output_format: str = None,
     search_paths: Optional[List[Union[Path, str]]] = None,
+    timeout: float = None,
+    cpu_time_limit: int = None,
+    memory_limit: int = None,
 ) -> Any:
     """
     Compile one or more Vyper source files.
@@ -119,6 +178,13 @@ def compile_files(
     search_paths: List[str | Path], optional
         Additional search paths. Only applicable for Vyper 0.4. Cannot use with
         `base_path` argument.
+    timeout : float, optional
+        Wall-clock time limit for the compiler, in seconds. Raises `VyperTimeoutError`
+        if exceeded.
+    cpu_time_limit : int, optional
+        CPU time limit for the compiler, in seconds. Not available on Windows.
+    memory_limit : int, optional
+        Address space limit for the compiler, in bytes. Not available on Windows.
 
     Returns
     -------
@@ -134,6 +200,9 @@ def compile_files(
         evm_version=evm_version,
         output_format=output_format,
         search_paths=search_paths,
+        timeout=timeout,
+        cpu_time_limit=cpu_time_limit,
+        memory_limit=memory_limit,
     )
 
 
@@ -143,6 +212,7 @@ def _compile(
     vyper_version: Union[str, Version, None],
     output_format: Optional[str],
     search_paths: Optional[List[Union[Path, str]]] = None,
+    source_name: Optional[str] = None,
     **kwargs: Any,
 ) -> Any:
     if vyper_binary is None:
@@ -154,13 +224,22 @@ def _compile(
         raise ValueError("Cannot specify both 'base_path' and 'search_paths'.")
 
     paths = search_paths if base_path is None else [base_path]
+    start = time.perf_counter()
     stdoutdata, stderrdata, command, proc = wrapper.vyper_wrapper(
         vyper_binary=vyper_binary, f=output_format, paths=paths, **kwargs
     )
+    duration = time.perf_counter() - start
 
+    output = stdoutdata
     if output_format in ("combined_json", "standard_json", "metadata"):
-        return json.loads(stdoutdata)
-    return stdoutdata
+        output = json.loads(stdoutdata)
+
+    flags = {"f": output_format, "paths": paths, "source_files": kwargs.get("source_files")}
+    if kwargs.get("evm_version") is not None:
+        flags["evm_version"] = kwargs["evm_version"]
+    history._record(vyper_binary, flags, duration, output, len(stdoutdata), source_name)
+    index._record(vyper_binary, output, source_name)
+    return output
 
 
 def compile_standard(
@@ -168,12 +247,20 @@ def compile_standard(
     base_path: str = None,
     vyper_binary: Union[str, Path] = None,
     vyper_version: Version = None,
+    timeout: float = None,
+    cpu_time_limit: int = None,
+    memory_limit: int = None,
+    output_fields: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
 ) -> Dict:
     """
     Compile Vyper contracts using the JSON-input-output interface.
 
     See the Vyper documentation for details on the expected JSON input and output formats.
 
+    If a remote cache is set (see `vvm.remote_cache`), the output is read from
+    and uploaded to the cache, unless `base_path` is given.
+
     Arguments
     ---------
     input_data : Dict
@@ -187,38 +274,146 @@ def compile_standard(
     vyper_version: Version, optional
         `vyper` version to use. If not given, the currently active version is used.
         Ignored if `vyper_binary` is also given.
+    timeout : float, optional
+        Wall-clock time limit for the compiler, in seconds. Raises `VyperTimeoutError`
+        if exceeded.
+    cpu_time_limit : int, optional
+        CPU time limit for the compiler, in seconds. Not available on Windows.
+    memory_limit : int, optional
+        Address space limit for the compiler, in bytes. Not available on Windows.
+    output_fields : List, optional
+        Outputs that are actually used, e.g. `["abi", "evm.bytecode.object"]`.
+        `settings.outputSelection` is narrowed to these fields before compiling,
+        so that the compiler does not generate unused outputs. `input_data` is
+        not modified. Raises `ValueError` if none of these outputs are selected.
+    max_workers : int, optional
+        If given, the input is split into one input per selected source, with
+        the sources that it imports, and up to `max_workers` of these are
+        compiled concurrently. The outputs are merged into the same output,
+        including source ids, as a single compile. If any compile fails, or
+        the source ids cannot be derived from the outputs, the input is
+        compiled again without splitting. Limits apply to each compile
+        separately. Ignored when called within a `CompileScheduler.slot`.
 
     Returns
     -------
     Dict
         Compiler JSON output.
     """
+    if output_fields is not None:
+        input_data = _narrow_input(input_data, output_fields)
 
     if vyper_binary is None:
         vyper_binary = get_executable(vyper_version)
 
-    stdoutdata, stderrdata, command, proc = wrapper.vyper_wrapper(
-        vyper_binary=vyper_binary, stdin=json.dumps(input_data), standard_json=True, p=base_path
-    )
+    cache_key = None
+    if base_path is None:
+        cache_key, cached = _get_cached("compile_standard", vyper_binary, input_data, {})
+        if cached is not None:
+            return cached
 
-    compiler_output = json.loads(stdoutdata)
-    if "errors" in compiler_output:
-        has_errors = any(error["severity"] == "error" for error in compiler_output["errors"])
-        if has_errors:
-            error_message = "\n".join(
-                tuple(
-                    error.get("formattedMessage") or error["message"]
-                    for error in compiler_output["errors"]
-                    if error["severity"] == "error"
+    kwargs = {
+        "p": base_path,
+        "timeout": timeout,
+        "cpu_time_limit": cpu_time_limit,
+        "memory_limit": memory_limit,
+    }
+    start = time.perf_counter()
+    inputs = [input_data]
+    # a caller that holds a scheduler slot, e.g. a compile server request, runs a
+    # single `vyper` process, so that the slot limits the number of processes
+    if max_workers is not None and not scheduler._admitted.get():
+        version = wrapper._get_vyper_version(vyper_binary)
+        inputs = split_standard_input(input_data, source_ids=version >= Version("0.4.0"))
+
+    compiler_output = None
+    if len(inputs) > 1:
+        with ThreadPoolExecutor(max_workers) as executor:
+            # each job runs in a copy of the caller's context, to keep the scheduler
+            # job. the caller is not admitted, so each job is admitted separately.
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, _compile_standard_json, vyper_binary, i, kwargs
                 )
-            )
-            raise VyperError(
-                error_message,
-                command=command,
-                return_code=proc.returncode,
-                stdin_data=json.dumps(input_data),
-                stdout_data=stdoutdata,
-                stderr_data=stderrdata,
-                error_dict=compiler_output["errors"],
-            )
+                for i in inputs
+            ]
+            results = [i.result() for i in futures]
+        if not any(_has_errors(i[0]) for i in results):
+            try:
+                compiler_output = merge_standard_output(input_data, [i[0] for i in results])
+                output_length = sum(len(i[1][3]) for i in results)
+                result = results[0][1]
+            except ValueError as exc:
+                LOGGER.debug(f"Cannot merge split compiler output: {exc}")
+    if compiler_output is None:
+        # errors, and outputs that cannot be merged, are reported by a single compile,
+        # so that they match the output of a compile without `max_workers`
+        compiler_output, result = _compile_standard_json(vyper_binary, input_data, kwargs)
+        output_length = len(result[3])
+    duration = time.perf_counter() - start
+
+    _check_errors(compiler_output, *result)
+
+    flags = {"standard_json": True, "settings": input_data.get("settings", {})}
+    history._record(vyper_binary, flags, duration, compiler_output, output_length)
+    index._record(vyper_binary, compiler_output)
+    _set_cached(cache_key, compiler_output)
     return compiler_output
+
+
+def _narrow_input(input_data: Dict, output_fields: List[str]) -> Dict:
+    # returns a copy of `input_data` with the output selection narrowed to `output_fields`
+    settings = input_data.get("settings", {})
+    original = settings.get("outputSelection", {})
+    if not original:
+        return input_data
+    output_selection = narrow_output_selection(original, output_fields)
+    if not output_selection:
+        raise ValueError(
+            f"None of the output fields {output_fields} are selected in settings.outputSelection"
+        )
+    return dict(input_data, settings=dict(settings, outputSelection=output_selection))
+
+
+def _has_errors(compiler_output: Dict) -> bool:
+    return any(error["severity"] == "error" for error in compiler_output.get("errors", []))
+
+
+def _check_errors(
+    compiler_output: Dict,
+    command: List,
+    return_code: int,
+    stdin: Optional[str],
+    stdoutdata: str,
+    stderrdata: str,
+) -> None:
+    # raises `VyperError` if a standard JSON output contains errors
+    if not _has_errors(compiler_output):
+        return
+    error_message = "\n".join(
+        tuple(
+            error.get("formattedMessage") or error["message"]
+            for error in compiler_output["errors"]
+            if error["severity"] == "error"
+        )
+    )
+    raise VyperError(
+        error_message,
+        command=command,
+        return_code=return_code,
+        stdin_data=stdin,
+        stdout_data=stdoutdata,
+        stderr_data=stderrdata,
+        error_dict=compiler_output["errors"],
+    )
+
+
+def _compile_standard_json(
+    vyper_binary: Union[str, Path], input_data: Dict, kwargs: Dict
+) -> Tuple[Dict, Tuple[List, int, str, str, str]]:
+    # returns the compiler output, and the details needed to raise `VyperError`
+    stdin = json.dumps(input_data)
+    stdoutdata, stderrdata, command, proc = wrapper.vyper_wrapper(
+        vyper_binary=vyper_binary, stdin=stdin, standard_json=True, **kwargs
+    )
+    return json.loads(stdoutdata), (command, proc.returncode, stdin, stdoutdata, stderrdata)
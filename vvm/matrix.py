@@ -0,0 +1,93 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, List, NamedTuple, Optional, Union
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+
+from vvm.install import get_executable, get_installed_vyper_versions
+from vvm.main import compile_source
+from vvm.utils.convert import hex_size, to_vyper_version
+from vvm.utils.versioning import detect_version_specifier_set
+
+
+class MatrixResult(NamedTuple):
+    """
+    Result of compiling a source with one compiler version and EVM version.
+    """
+
+    version: Version
+    evm_version: Optional[str]
+    success: bool
+    compile_time: float
+    bytecode_size: Optional[int] = None
+    bytecode_runtime_size: Optional[int] = None
+    output: Any = None
+    error: Optional[Exception] = None
+
+
+def _compile_one(source: str, version: Version, evm_version: Optional[str]) -> MatrixResult:
+    start = time.perf_counter()
+    try:
+        vyper_binary = get_executable(version)
+        output = compile_source(source, evm_version=evm_version, vyper_binary=vyper_binary)
+    except Exception as exc:
+        return MatrixResult(version, evm_version, False, time.perf_counter() - start, error=exc)
+
+    compile_time = time.perf_counter() - start
+    data = output["<stdin>"]
+    return MatrixResult(
+        version,
+        evm_version,
+        True,
+        compile_time,
+        bytecode_size=hex_size(data["bytecode"]),
+        bytecode_runtime_size=hex_size(data["bytecode_runtime"]),
+        output=output,
+    )
+
+
+def compile_version_matrix(
+    source: str,
+    versions: Union[SpecifierSet, Iterable[Union[str, Version]], None] = None,
+    evm_versions: Optional[Iterable[Optional[str]]] = None,
+    max_workers: Optional[int] = None,
+) -> List[MatrixResult]:
+    """
+    Compile one source with many installed `vyper` versions in parallel.
+
+    Each compile uses an explicit binary path, so the active version set via
+    `vvm.set_vyper_version` is neither used nor modified.
+
+    Arguments
+    ---------
+    source : str
+        Vyper contract to be compiled.
+    versions : SpecifierSet | List, optional
+        Versions to compile with. A `SpecifierSet` selects all matching installed
+        versions. If not given, the specifier from the pragma of `source` is used,
+        or all installed versions if the source has no pragma.
+    evm_versions : List, optional
+        EVM versions to compile each version with. A value of `None` uses the
+        compiler default. Defaults to only the compiler default.
+    max_workers : int, optional
+        Maximum number of concurrent compiles. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    List
+        `MatrixResult` for every combination of version and EVM version, ordered
+        from the newest version to the oldest. Compiler errors are captured in
+        the result instead of being raised.
+    """
+    if versions is None:
+        versions = detect_version_specifier_set(source) or SpecifierSet()
+    if isinstance(versions, SpecifierSet):
+        version_list = list(versions.filter(get_installed_vyper_versions(), prereleases=True))
+    else:
+        version_list = sorted((to_vyper_version(i) for i in versions), reverse=True)
+
+    jobs = [(v, e) for v in version_list for e in (evm_versions or [None])]
+    with ThreadPoolExecutor(max_workers) as executor:
+        futures = [executor.submit(_compile_one, source, v, e) for v, e in jobs]
+        return [i.result() for i in futures]
@@ -0,0 +1,315 @@
+import heapq
+import os
+import posixpath
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from packaging.version import Version
+
+from vvm import remote_cache
+from vvm.exceptions import VyperError
+from vvm.history import CompileHistory
+from vvm.install import get_executable
+from vvm.main import compile_files, get_vyper_version
+from vvm.utils.convert import to_vyper_version
+from vvm.utils.splitting import BUILTIN_MODULES, get_imported_modules
+from vvm.utils.versioning import detect_vyper_version_from_source
+
+# estimated time to start a `vyper` process, in seconds. grouping files into one
+# invocation saves this for every file after the first.
+STARTUP_COST = 0.3
+
+# estimated compile time per byte of source, used for files without history
+SECONDS_PER_BYTE = 2.5e-4
+
+
+class PlannedJob(NamedTuple):
+    """
+    A single `vyper` invocation in a `BuildPlan`.
+    """
+
+    vyper_version: Version
+    source_files: List[str]
+    estimate: float
+
+
+class BuildPlan(NamedTuple):
+    """
+    Assignment of compile jobs to workers, made by `plan_build`.
+    """
+
+    workers: List[List[PlannedJob]]
+    cached: List[str]
+    versions: Dict[str, Version]
+    estimates: Dict[str, float]
+    makespan: float
+    serial_duration: float
+    options: Dict
+
+    @property
+    def jobs(self) -> List[PlannedJob]:
+        """All jobs, longest first."""
+        jobs = [job for worker in self.workers for job in worker]
+        return sorted(jobs, key=lambda i: i.estimate, reverse=True)
+
+    def format(self) -> str:
+        """
+        Return a human readable description of the plan.
+        """
+        files = len(self.estimates)
+        lines = [f"Plan for {files} file(s) on {len(self.workers)} worker(s):"]
+        for i, worker in enumerate(self.workers, start=1):
+            lines.append(f"  worker {i}: {sum(job.estimate for job in worker):.2f}s")
+            for job in worker:
+                lines.append(
+                    f"    {str(job.vyper_version):<10} {job.estimate:>7.2f}s  "
+                    f"{', '.join(job.source_files)}"
+                )
+        lines.append(f"Expected cache hits: {len(self.cached)} file(s)")
+        lines.append(
+            f"Predicted makespan: {self.makespan:.2f}s (serial: {self.serial_duration:.2f}s)"
+        )
+        return "\n".join(lines)
+
+
+def _history_estimates(history: CompileHistory) -> Dict[Tuple[str, str], float]:
+    # median duration of compiling each (contract, compiler version) on its own. a
+    # compile of several files is split evenly, after the process start.
+    durations: Dict[Tuple[str, str], List[float]] = {}
+    for entry in history.entries():
+        key = (entry.contract, entry.compiler_version)
+        work = max(entry.duration - STARTUP_COST, 0.0) / max(entry.batch_size, 1)
+        durations.setdefault(key, []).append(STARTUP_COST + work)
+    return {k: statistics.median(v) for k, v in durations.items()}
+
+
+def _estimate(
+    path: str,
+    version: Version,
+    size: int,
+    known: Dict[Tuple[str, str], float],
+    seconds_per_byte: float,
+) -> float:
+    if (path, str(version)) in known:
+        return known[(path, str(version))]
+    other_versions = [v for (contract, _), v in known.items() if contract == path]
+    if other_versions:
+        return statistics.median(other_versions)
+    return STARTUP_COST + size * seconds_per_byte
+
+
+def _calibrate(
+    sizes: Dict[str, int], versions: Dict[str, Version], known: Dict[Tuple[str, str], float]
+) -> float:
+    # fits the cost per byte to the files that have recorded durations
+    rates = [
+        (known[(path, str(versions[path]))] - STARTUP_COST) / size
+        for path, size in sizes.items()
+        if size and (path, str(versions[path])) in known
+    ]
+    rates = [i for i in rates if i > 0]
+    return statistics.median(rates) if rates else SECONDS_PER_BYTE
+
+
+def _is_self_contained(source: str) -> bool:
+    # output only depends on the source if it imports nothing but builtin modules
+    return all(i[0].split(".")[0] in BUILTIN_MODULES for i in get_imported_modules(source))
+
+
+def _file_cache_key(version: Version, source: str, evm_version: Optional[str]) -> str:
+    return remote_cache.cache_key("compile_files", version, source, {"evm_version": evm_version})
+
+
+def _group(
+    jobs: List[Tuple[str, float]], version: Version, max_group_duration: float
+) -> List[PlannedJob]:
+    # packs short jobs of one version into invocations of up to `max_group_duration`.
+    # each file after the first in a group saves one process start.
+    planned: List[PlannedJob] = []
+    groups: List[Tuple[List[str], float]] = []
+    for path, estimate in sorted(jobs, key=lambda i: i[1], reverse=True):
+        if estimate >= max_group_duration:
+            planned.append(PlannedJob(version, [path], estimate))
+            continue
+        for i, (paths, total) in enumerate(groups):
+            if total + estimate - STARTUP_COST <= max_group_duration:
+                groups[i] = (paths + [path], total + estimate - STARTUP_COST)
+                break
+        else:
+            groups.append(([path], estimate))
+    planned.extend(PlannedJob(version, paths, total) for paths, total in groups)
+    return planned
+
+
+def plan_build(
+    source_files: List[Union[Path, str]],
+    vyper_version: Union[str, Version, None] = None,
+    evm_version: str = None,
+    search_paths: Optional[List[Union[Path, str]]] = None,
+    max_workers: Optional[int] = None,
+    history: Optional[CompileHistory] = None,
+    group: bool = True,
+) -> BuildPlan:
+    """
+    Plan the compilation of many Vyper source files.
+
+    The duration of each file is estimated from the compiles recorded in
+    `history`, or from the size of the file if it has no recorded compiles.
+    Short files that use the same compiler version are grouped into single
+    invocations, and the jobs are then assigned longest first, each to the
+    worker with the least work, so that slow contracts do not start last.
+
+    Files that do not import other files are looked up in the remote cache
+    (see `vvm.remote_cache`), and expected cache hits are not compiled.
+
+    Arguments
+    ---------
+    source_files : List
+        Paths of the Vyper source files to compile.
+    vyper_version : str | Version, optional
+        `vyper` version to compile all files with. If not given, each file uses
+        the latest installed version that satisfies its version pragma, or the
+        active version if it has no pragma.
+    evm_version : str, optional
+        Select the desired EVM version. Valid options depend on the `vyper` version.
+    search_paths : List[str | Path], optional
+        Additional search paths. Only applicable for Vyper 0.4.
+    max_workers : int, optional
+        Number of concurrent compiles. Defaults to the number of CPUs.
+    history : CompileHistory, optional
+        Database of recorded compiles, used to estimate durations.
+    group : bool, optional
+        If False, every file is compiled in its own invocation.
+
+    Returns
+    -------
+    BuildPlan
+        The jobs of each worker, expected cache hits and the predicted makespan.
+        Use `BuildPlan.format` for a dry run, and `execute_plan` to compile.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    # normalized the same way as the keys of the compiler output
+    paths = list(dict.fromkeys(posixpath.normpath(Path(i).as_posix()) for i in source_files))
+
+    sources = {path: Path(path).read_text(encoding="utf8") for path in paths}
+    default_version = to_vyper_version(vyper_version) if vyper_version is not None else None
+    versions: Dict[str, Version] = {}
+    for path, source in sources.items():
+        version = default_version or detect_vyper_version_from_source(
+            source, check_installable=False
+        )
+        versions[path] = version or get_vyper_version()
+
+    cached = []
+    cache = remote_cache.get_remote_cache()
+    if cache is not None:
+        for path, source in sources.items():
+            key = _file_cache_key(versions[path], source, evm_version)
+            if _is_self_contained(source) and cache.contains(key):
+                cached.append(path)
+
+    known = _history_estimates(history) if history is not None else {}
+    sizes = {path: len(source.encode()) for path, source in sources.items()}
+    rate = _calibrate(sizes, versions, known)
+    estimates = {path: _estimate(path, versions[path], sizes[path], known, rate) for path in paths}
+
+    by_version: Dict[Version, List[Tuple[str, float]]] = {}
+    for path in paths:
+        if path not in cached:
+            by_version.setdefault(versions[path], []).append((path, estimates[path]))
+
+    serial_duration = sum(estimates[path] for path in paths if path not in cached)
+    jobs: List[PlannedJob] = []
+    for version, version_jobs in by_version.items():
+        if group:
+            # enough groups remain to keep every worker busy
+            max_group_duration = max(serial_duration / (workers * 2), 2 * STARTUP_COST)
+            jobs.extend(_group(version_jobs, version, max_group_duration))
+        else:
+            jobs.extend(PlannedJob(version, [path], estimate) for path, estimate in version_jobs)
+
+    # longest processing time first, each job to the least loaded worker
+    assigned: List[List[PlannedJob]] = [[] for _ in range(workers)]
+    heap = [(0.0, i) for i in range(workers)]
+    for job in sorted(jobs, key=lambda i: (-i.estimate, i.source_files)):
+        load, i = heapq.heappop(heap)
+        assigned[i].append(job)
+        heapq.heappush(heap, (load + job.estimate, i))
+    makespan = max((load for load, _ in heap), default=0.0)
+
+    options = {"evm_version": evm_version, "search_paths": search_paths}
+    return BuildPlan(
+        [i for i in assigned if i], cached, versions, estimates, makespan, serial_duration, options
+    )
+
+
+def _split_output(source_files: List[str], output: Dict) -> Dict[str, Any]:
+    entries = {k: v for k, v in output.items() if k != "version"}
+    if len(source_files) == 1 and len(entries) == 1:
+        return {source_files[0]: next(iter(entries.values()))}
+    return {path: entries[path] for path in source_files}
+
+
+def _run_job(job: PlannedJob, options: Dict) -> Dict[str, Any]:
+    vyper_binary = get_executable(job.vyper_version)
+    try:
+        output = compile_files(job.source_files, vyper_binary=vyper_binary, **options)
+    except VyperError:
+        if len(job.source_files) == 1:
+            raise
+        # compile the files of a failed group one by one, to report the failing file
+        results: Dict[str, Any] = {}
+        for path in job.source_files:
+            results.update(_run_job(PlannedJob(job.vyper_version, [path], 0.0), options))
+        return results
+    return _split_output(job.source_files, output)
+
+
+def execute_plan(plan: BuildPlan) -> Dict[str, Any]:
+    """
+    Compile the files of a plan made with `plan_build`.
+
+    Jobs are started longest first, on as many threads as the plan has
+    workers. Expected cache hits are read from the remote cache, and the
+    output of files that do not import other files is uploaded to it.
+
+    Arguments
+    ---------
+    plan : BuildPlan
+        Plan to execute.
+
+    Returns
+    -------
+    Dict
+        Combined JSON output of each file, keyed by path.
+    """
+    cache = remote_cache.get_remote_cache()
+    sources = {path: Path(path).read_text(encoding="utf8") for path in plan.estimates}
+    keys = {
+        path: _file_cache_key(plan.versions[path], source, plan.options["evm_version"])
+        for path, source in sources.items()
+        if _is_self_contained(source)
+    }
+
+    results: Dict[str, Any] = {}
+    jobs = plan.jobs
+    for path in plan.cached:
+        output = cache.get(keys[path]) if cache is not None else None
+        if output is None:
+            jobs.append(PlannedJob(plan.versions[path], [path], plan.estimates[path]))
+        else:
+            results[path] = output
+
+    with ThreadPoolExecutor(max(len(plan.workers), 1)) as executor:
+        futures = [executor.submit(_run_job, job, plan.options) for job in jobs]
+        for future in futures:
+            outputs = future.result()
+            results.update(outputs)
+            if cache is not None:
+                for path, output in outputs.items():
+                    if path in keys:
+                        cache.put(keys[path], output)
+
+    return {path: results[path] for path in plan.estimates}
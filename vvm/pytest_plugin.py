@@ -0,0 +1,253 @@
+"""
+pytest plugin for testing against multiple `vyper` versions.
+
+The plugin is opt-in. Enable it with `-p vvm.pytest_plugin`, or by adding
+`pytest_plugins = ["vvm.pytest_plugin"]` to a `conftest.py`. Tests that use the
+`vyper_version` fixture are run once for every target version. By default the
+target versions are those already installed. Versions that must be installed
+are installed in parallel, once per test session, and shared between
+`pytest-xdist` workers.
+"""
+
+# annotations are not evaluated, as `pytest.Parser` and friends require pytest >= 7
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+from packaging.version import Version
+from requests import ConnectionError
+
+from vvm import wrapper
+from vvm.install import (
+    get_executable,
+    get_installable_vyper_versions,
+    get_installed_vyper_versions,
+    install_vyper,
+    using_version,
+)
+from vvm.main import compile_source, compile_standard
+from vvm.utils.lock import get_process_lock
+
+# stored as attributes of the config, as `pytest.Stash` requires pytest >= 7
+_VERSIONS_ATTR = "_vvm_versions"
+_SESSION_DIR_ATTR = "_vvm_session_dir"
+
+
+class CompileCache:
+    """
+    Compiler output shared by all tests in a session.
+
+    Output is kept in memory and, when running with `pytest-xdist`, written to a
+    directory shared with the other workers. Failed compiles are not cached.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._cache: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def compile_source(self, source: str, **kwargs: Any) -> Any:
+        """
+        Compile a Vyper contract, or return the cached output. See `vvm.compile_source`.
+        """
+        return self._compile("compile_source", compile_source, source, **kwargs)
+
+    def compile_standard(self, input_data: Dict, **kwargs: Any) -> Dict:
+        """
+        Compile using the JSON-input-output interface, or return the cached output.
+        See `vvm.compile_standard`.
+        """
+        return self._compile("compile_standard", compile_standard, input_data, **kwargs)
+
+    def _compile(self, name: str, fn: Any, data: Any, **kwargs: Any) -> Any:
+        vyper_version = kwargs.pop("vyper_version", None)
+        vyper_binary = kwargs.pop("vyper_binary", None) or get_executable(vyper_version)
+        version = wrapper._get_vyper_version(vyper_binary)
+        data_json = json.dumps([name, str(version), data, kwargs], sort_keys=True, default=str)
+        key = hashlib.sha256(data_json.encode()).hexdigest()
+
+        output = self._get(key)
+        if output is None:
+            output = json.dumps(fn(data, vyper_binary=vyper_binary, **kwargs))
+            self._set(key, output)
+        # decoded on every call, so that tests cannot modify the cached value
+        return json.loads(output)
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+        if self.path is not None:
+            try:
+                output = self.path.joinpath(f"{key}.json").read_text()
+            except OSError:
+                return None
+            with self._lock:
+                self._cache[key] = output
+            return output
+        return None
+
+    def _set(self, key: str, output: str) -> None:
+        with self._lock:
+            self._cache[key] = output
+        if self.path is not None:
+            # write then rename, so that other workers never read a partial file
+            temp_path = self.path.joinpath(f".{key}.{os.getpid()}.{threading.get_ident()}")
+            temp_path.write_text(output)
+            temp_path.replace(self.path.joinpath(f"{key}.json"))
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("vvm")
+    group.addoption(
+        "--no-install",
+        action="store_true",
+        help="Do not install the vyper versions given with --vyper-versions",
+    )
+    group.addoption(
+        "--vyper-versions",
+        action="store",
+        help="Only run tests against a specific version(s) of vyper",
+    )
+    group.addoption(
+        "--vyper-install-all",
+        action="store_true",
+        help="Install and run tests against every available vyper version",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", "min_vyper: minimum version of vyper to run test against")
+    config.addinivalue_line("markers", "max_vyper: maximum version of vyper to run test against")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node: Any) -> None:
+    # `pytest-xdist` hook, called on the controller for each worker
+    config = node.config
+    if getattr(config, _SESSION_DIR_ATTR, None) is None:
+        setattr(config, _SESSION_DIR_ATTR, Path(tempfile.mkdtemp(prefix="vvm-pytest-")))
+    node.workerinput["vvm_session_dir"] = str(getattr(config, _SESSION_DIR_ATTR))
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    session_dir = getattr(session.config, _SESSION_DIR_ATTR, None)
+    if session_dir is not None:
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+
+def _get_session_dir(config: pytest.Config) -> Optional[Path]:
+    # directory shared by all xdist workers, or `None` when not using xdist
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None or "vvm_session_dir" not in workerinput:
+        return None
+    return Path(workerinput["vvm_session_dir"])
+
+
+def _install_versions(versions: List[Version]) -> None:
+    missing = sorted(set(versions) - set(get_installed_vyper_versions()))
+    if missing:
+        with ThreadPoolExecutor(min(len(missing), 8)) as executor:
+            list(executor.map(install_vyper, missing))
+
+
+def _resolve_versions(config: pytest.Config) -> List[Version]:
+    if config.getoption("--vyper-versions"):
+        versions = [Version(i) for i in config.getoption("--vyper-versions").split(",")]
+    elif config.getoption("--vyper-install-all") and not config.getoption("--no-install"):
+        try:
+            versions = get_installable_vyper_versions()
+        except ConnectionError:
+            raise pytest.UsageError(
+                "ConnectionError while attempting to get vyper versions.\n"
+                "Remove the --vyper-install-all flag to only run tests against already "
+                "installed versions."
+            )
+    else:
+        return get_installed_vyper_versions()
+    if not config.getoption("--no-install"):
+        _install_versions(versions)
+    return versions
+
+
+def _get_versions(config: pytest.Config) -> List[Version]:
+    # resolved on first use, so that test suites that do not use the fixtures
+    # are not slowed down by the plugin
+    if getattr(config, _VERSIONS_ATTR, None) is None:
+        session_dir = _get_session_dir(config)
+        if session_dir is None:
+            setattr(config, _VERSIONS_ATTR, _resolve_versions(config))
+        else:
+            # the first worker resolves and installs, the others read the result.
+            # all workers must use the same list, or xdist fails on collection.
+            path = session_dir.joinpath("versions.json")
+            with get_process_lock(f"pytest-{session_dir.name}"):
+                if path.exists():
+                    versions = [Version(i) for i in json.loads(path.read_text())]
+                else:
+                    versions = _resolve_versions(config)
+                    path.write_text(json.dumps([str(i) for i in versions]))
+            setattr(config, _VERSIONS_ATTR, versions)
+    return getattr(config, _VERSIONS_ATTR)
+
+
+# auto-parametrize the vyper_version fixture with all target vyper versions
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "vyper_version" in metafunc.fixturenames:
+        versions = _get_versions(metafunc.config).copy()
+        for marker in metafunc.definition.iter_markers(name="min_vyper"):
+            versions = [i for i in versions if i >= Version(marker.args[0])]
+        for marker in metafunc.definition.iter_markers(name="max_vyper"):
+            versions = [i for i in versions if i <= Version(marker.args[0])]
+        metafunc.parametrize("vyper_version", versions, indirect=True)
+
+
+@pytest.fixture
+def vyper_version(request: pytest.FixtureRequest) -> Iterator[Version]:
+    """
+    Run a test against all vyper versions.
+
+    The version is active for the duration of the test, without changing the
+    version used by other threads (see `vvm.using_version`).
+    """
+    version = request.param
+    with using_version(version):
+        yield version
+
+
+@pytest.fixture
+def vyper_binary(vyper_version: Version) -> Path:
+    """
+    Path of the `vyper` binary for the version under test.
+    """
+    return get_executable(vyper_version)
+
+
+@pytest.fixture
+def latest_version(request: pytest.FixtureRequest) -> Version:
+    """
+    The newest of the target vyper versions.
+    """
+    return _get_versions(request.config)[0]
+
+
+@pytest.fixture(scope="session")
+def vyper_compile_cache(request: pytest.FixtureRequest) -> CompileCache:
+    """
+    Session-wide cache of compiler output, shared between xdist workers.
+    """
+    session_dir = _get_session_dir(request.config)
+    if session_dir is None:
+        return CompileCache()
+    path = session_dir.joinpath("compile")
+    path.mkdir(exist_ok=True)
+    return CompileCache(path)
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from packaging.version import Version
+
+from vvm.install import LOGGER
+
+VVM_REMOTE_CACHE_URL_VARIABLE = "VVM_REMOTE_CACHE_URL"
+VVM_REMOTE_CACHE_MODE_VARIABLE = "VVM_REMOTE_CACHE_MODE"
+
+# bumped when the layout of cached outputs changes
+CACHE_KEY_VERSION = "1"
+
+_remote_cache: Optional["RemoteCache"] = None
+_environment_cache: Optional["RemoteCache"] = None
+_lock = threading.Lock()
+
+
+class RemoteCache:
+    """
+    Compiler output cache on an HTTP server, shared between machines.
+
+    Outputs are stored as JSON files at `{url}/{key[:2]}/{key}.json`, read with
+    GET and written with PUT, so any file server that accepts uploads can be
+    used, and a plain static file server can serve a read-only cache. Network
+    errors are logged and treated as a cache miss; they never fail a compile.
+
+    Arguments
+    ---------
+    url : str
+        Base URL of the cache.
+    mode : str, optional
+        `"rw"` to read and upload outputs, or `"ro"` to only read.
+    max_upload_size : int, optional
+        Outputs larger than this many bytes are not uploaded.
+    timeout : float | Tuple, optional
+        Timeout for each request, in seconds, as used by `requests`.
+    headers : Dict, optional
+        Headers sent with every request, e.g. for authentication.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        mode: str = "rw",
+        max_upload_size: int = 16 * 2**20,
+        timeout: Union[float, Tuple[float, float]] = (2, 10),
+        headers: Optional[Dict] = None,
+    ) -> None:
+        if mode not in ("ro", "rw"):
+            raise ValueError("mode must be 'ro' or 'rw'")
+        self.url = url.rstrip("/")
+        self.mode = mode
+        self.max_upload_size = max_upload_size
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.uploads = 0
+        self.errors = 0
+        self._session = requests.Session()
+        self._session.headers.update(headers or {})
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<RemoteCache '{self.url}' mode={self.mode}>"
+
+    def _url(self, key: str) -> str:
+        return f"{self.url}/{key[:2]}/{key}.json"
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached output for `key`, or `None` on a cache miss.
+        """
+        try:
+            response = self._session.get(self._url(key), timeout=self.timeout)
+            if response.status_code == 404:
+                self._count("misses")
+                return None
+            response.raise_for_status()
+            output = response.json()
+        except (requests.RequestException, ValueError) as exc:
+            LOGGER.debug(f"Remote cache read failed for {key}: {exc}")
+            self._count("errors")
+            return None
+        self._count("hits")
+        return output
+
+    def contains(self, key: str) -> bool:
+        """
+        Return True if the cache has an output for `key`, without downloading it.
+        """
+        try:
+            response = self._session.head(self._url(key), timeout=self.timeout)
+        except requests.RequestException as exc:
+            LOGGER.debug(f"Remote cache read failed for {key}: {exc}")
+            self._count("errors")
+            return False
+        return response.status_code == 200
+
+    def put(self, key: str, output: Any) -> bool:
+        """
+        Upload an output to the cache.
+
+        Returns
+        -------
+        bool
+            True if the output was uploaded.
+        """
+        if self.mode != "rw":
+            return False
+        data = json.dumps(output, separators=(",", ":")).encode()
+        if len(data) > self.max_upload_size:
+            LOGGER.debug(f"Not uploading {key}: {len(data)} bytes exceeds the size limit")
+            return False
+        try:
+            response = self._session.put(
+                self._url(key),
+                data=data,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            LOGGER.debug(f"Remote cache upload failed for {key}: {exc}")
+            self._count("errors")
+            return False
+        self._count("uploads")
+        return True
+
+
+def cache_key(method: str, compiler_version: Version, data: Any, options: Dict) -> str:
+    """
+    Return the cache key for a compile.
+
+    Arguments
+    ---------
+    method : str
+        Name of the compile function.
+    compiler_version : Version
+        Version of `vyper` used.
+    data : Any
+        Source code or JSON input of the compile.
+    options : Dict
+        Other arguments that affect the output.
+    """
+    payload = json.dumps(
+        [CACHE_KEY_VERSION, method, str(compiler_version), data, options],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def set_remote_cache(cache: Optional[RemoteCache]) -> None:
+    """
+    Set the remote cache used by `compile_source` and `compile_standard`.
+
+    If no cache is set, one is created from the `VVM_REMOTE_CACHE_URL` and
+    `VVM_REMOTE_CACHE_MODE` environment variables, if they are set.
+
+    Arguments
+    ---------
+    cache : RemoteCache, optional
+        Cache to use, or `None` to only use the environment variables.
+    """
+    global _remote_cache
+    _remote_cache = cache
+
+
+def get_remote_cache() -> Optional[RemoteCache]:
+    """
+    Return the remote cache in use, or `None` if there is none.
+    """
+    global _environment_cache
+    if _remote_cache is not None:
+        return _remote_cache
+    url = os.getenv(VVM_REMOTE_CACHE_URL_VARIABLE)
+    if not url:
+        return None
+    mode = os.getenv(VVM_REMOTE_CACHE_MODE_VARIABLE, "rw")
+    with _lock:
+        cache = _environment_cache
+        if cache is None or (cache.url, cache.mode) != (url.rstrip("/"), mode):
+            cache = _environment_cache = RemoteCache(url, mode)
+    return cache
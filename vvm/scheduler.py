@@ -0,0 +1,400 @@
+import itertools
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# priority classes, lower values are admitted first
+INTERACTIVE = 0
+NORMAL = 1
+BATCH = 2
+
+PRIORITIES = {"interactive": INTERACTIVE, "normal": NORMAL, "batch": BATCH}
+
+# Linux memory statistics, read by `AdaptiveScheduler`
+MEMINFO_PATH = "/proc/meminfo"
+PRESSURE_PATH = "/proc/pressure/memory"
+
+LOGGER = logging.getLogger("vvm")
+
+_scheduler: Optional["CompileScheduler"] = None
+_job: ContextVar[Tuple[int, Optional[str]]] = ContextVar("vvm_job", default=(NORMAL, None))
+_admitted: ContextVar[bool] = ContextVar("vvm_admitted", default=False)
+
+
+class SchedulerStats(NamedTuple):
+    """
+    Queue depth and wait times of a `CompileScheduler`, by priority class.
+    """
+
+    running: int
+    max_concurrency: int
+    queued: Dict[int, int]
+    admitted: Dict[int, int]
+    mean_wait: Dict[int, float]
+    max_wait: Dict[int, float]
+
+
+class MemoryStatus(NamedTuple):
+    """
+    Memory availability of the machine, as read by `read_memory_status`.
+    """
+
+    available: int
+    total: int
+    pressure: Optional[float]
+
+
+class _Waiter:
+    __slots__ = ("priority", "tenant", "sequence", "enqueued", "admitted")
+
+    def __init__(self, priority: int, tenant: Optional[str], sequence: int) -> None:
+        self.priority = priority
+        self.tenant = tenant
+        self.sequence = sequence
+        self.enqueued = time.perf_counter()
+        self.admitted = False
+
+
+def to_priority(priority: Union[int, str]) -> int:
+    """
+    Convert a priority class name (`"interactive"`, `"normal"` or `"batch"`) to its value.
+    """
+    if isinstance(priority, str):
+        if priority.lower() not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'")
+        return PRIORITIES[priority.lower()]
+    return int(priority)
+
+
+def read_memory_status() -> Optional[MemoryStatus]:
+    """
+    Return the available and total memory, in bytes, and the memory pressure.
+
+    The pressure is the share of the last 10 seconds, in percent, in which
+    some tasks were stalled waiting for memory (Linux PSI). It is `None` if the
+    kernel does not provide PSI. Returns `None` on systems without `/proc/meminfo`.
+    """
+    try:
+        meminfo = Path(MEMINFO_PATH).read_text()
+    except OSError:
+        return None
+    values: Dict[str, int] = {}
+    for line in meminfo.splitlines():
+        key, _, value = line.partition(":")
+        if value.strip():
+            # values are given in kB
+            values[key] = int(value.split()[0]) * 1024
+    if "MemAvailable" not in values or "MemTotal" not in values:
+        return None
+
+    pressure = None
+    try:
+        for line in Path(PRESSURE_PATH).read_text().splitlines():
+            if line.startswith("some "):
+                fields = dict(i.split("=") for i in line.split()[1:])
+                pressure = float(fields["avg10"])
+    except (OSError, ValueError, KeyError):
+        pass
+    return MemoryStatus(values["MemAvailable"], values["MemTotal"], pressure)
+
+
+class CompileScheduler:
+    """
+    Admission control for `vyper` processes.
+
+    At most `max_concurrency` compiles run at once. Queued compiles are admitted
+    by priority class, so that an interactive compile never waits behind queued
+    batch work. Within a priority class, the tenant with the fewest running
+    compiles goes first, and each tenant's compiles are admitted in order.
+
+    Use `set_scheduler` to apply a scheduler to all compiles in the process, and
+    `job` to set the priority and tenant of compiles made within a context.
+
+    Arguments
+    ---------
+    max_concurrency : int, optional
+        Maximum number of concurrent compiles. Defaults to the number of CPUs.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None) -> None:
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self._condition = threading.Condition()
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._tenant_running: Dict[Optional[str], int] = {}
+        self._admitted: Dict[int, int] = {}
+        self._total_wait: Dict[int, float] = {}
+        self._max_wait: Dict[int, float] = {}
+        self._poll_interval: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return f"<CompileScheduler running={self._running} queued={len(self._queue)}>"
+
+    def acquire(self, priority: Union[int, str] = NORMAL, tenant: Optional[str] = None) -> None:
+        """
+        Block until a compile with the given priority and tenant may start.
+
+        Each call must be followed by a call to `release`.
+        """
+        with self._condition:
+            waiter = _Waiter(to_priority(priority), tenant, next(self._sequence))
+            self._queue.append(waiter)
+            self._dispatch()
+            try:
+                while not waiter.admitted:
+                    if not self._condition.wait(self._poll_interval):
+                        # the limit may have changed while waiting
+                        self._dispatch()
+            except BaseException:
+                if waiter.admitted:
+                    self._release(tenant)
+                else:
+                    self._queue.remove(waiter)
+                raise
+
+    def release(self, tenant: Optional[str] = None) -> None:
+        """
+        Mark a compile as finished, admitting the next queued compile.
+        """
+        with self._condition:
+            self._release(tenant)
+
+    @contextmanager
+    def slot(
+        self, priority: Union[int, str] = NORMAL, tenant: Optional[str] = None
+    ) -> Iterator[None]:
+        """
+        Run the body of the context as an admitted compile.
+        """
+        self.acquire(priority, tenant)
+        token = _admitted.set(True)
+        try:
+            yield
+        finally:
+            _admitted.reset(token)
+            self.release(tenant)
+
+    def stats(self) -> SchedulerStats:
+        """
+        Return the current queue depth and the wait times of admitted compiles.
+        """
+        with self._condition:
+            queued: Dict[int, int] = {}
+            for waiter in self._queue:
+                queued[waiter.priority] = queued.get(waiter.priority, 0) + 1
+            return SchedulerStats(
+                self._running,
+                self._limit(),
+                queued,
+                self._admitted.copy(),
+                {k: v / self._admitted[k] for k, v in self._total_wait.items()},
+                self._max_wait.copy(),
+            )
+
+    def _limit(self) -> int:
+        # number of compiles that may run at once. called with the lock held.
+        return self.max_concurrency
+
+    def _release(self, tenant: Optional[str]) -> None:
+        self._running -= 1
+        self._tenant_running[tenant] -= 1
+        if not self._tenant_running[tenant]:
+            del self._tenant_running[tenant]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        # admit queued compiles while there is capacity. called with the lock held.
+        admitted = False
+        while self._queue and self._running < self._limit():
+            waiter = min(
+                self._queue,
+                key=lambda i: (i.priority, self._tenant_running.get(i.tenant, 0), i.sequence),
+            )
+            self._queue.remove(waiter)
+            waiter.admitted = admitted = True
+            self._running += 1
+            self._tenant_running[waiter.tenant] = self._tenant_running.get(waiter.tenant, 0) + 1
+
+            wait = time.perf_counter() - waiter.enqueued
+            priority = waiter.priority
+            self._admitted[priority] = self._admitted.get(priority, 0) + 1
+            self._total_wait[priority] = self._total_wait.get(priority, 0.0) + wait
+            self._max_wait[priority] = max(self._max_wait.get(priority, 0.0), wait)
+        if admitted:
+            self._condition.notify_all()
+
+
+class AdaptiveScheduler(CompileScheduler):
+    """
+    `CompileScheduler` that adapts its concurrency to the memory of the machine.
+
+    Starting at `min_concurrency`, one more compile is allowed every `interval`
+    seconds while compiles are queued, more than twice the reserved memory is
+    available and there is no memory pressure. When available memory falls
+    below the reserve, or the memory pressure (Linux PSI) exceeds
+    `max_pressure`, the concurrency is halved.
+
+    `vyper` processes killed with SIGKILL, which is how the Linux OOM killer
+    ends them, also halve the concurrency and are run again, up to
+    `max_retries` times. Processes with a CPU time limit are not retried, as the
+    limit is enforced with SIGKILL as well.
+
+    Where memory statistics are not available, `max_concurrency` is used.
+
+    Arguments
+    ---------
+    max_concurrency : int, optional
+        Maximum number of concurrent compiles. Defaults to the number of CPUs.
+    min_concurrency : int, optional
+        Minimum number of concurrent compiles.
+    reserve : float, optional
+        Share of the total memory that should remain available.
+    max_pressure : float, optional
+        Memory pressure, in percent, above which the concurrency is reduced.
+    interval : float, optional
+        Minimum time between adjustments, in seconds.
+    max_retries : int, optional
+        Number of times a killed compile is run again.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+        reserve: float = 0.1,
+        max_pressure: float = 10.0,
+        interval: float = 0.5,
+        max_retries: int = 2,
+    ) -> None:
+        super().__init__(max_concurrency)
+        self.min_concurrency = max(min(min_concurrency, self.max_concurrency), 1)
+        self.concurrency = self.min_concurrency
+        self.reserve = reserve
+        self.max_pressure = max_pressure
+        self.interval = interval
+        self.max_retries = max_retries
+        self.kills = 0
+        self._next_check = 0.0
+        self._poll_interval = interval
+
+    def __repr__(self) -> str:
+        return (
+            f"<AdaptiveScheduler running={self._running} queued={len(self._queue)}"
+            f" concurrency={self.concurrency}>"
+        )
+
+    def _limit(self) -> int:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.interval
+            self._adjust(read_memory_status())
+        return self.concurrency
+
+    def _adjust(self, status: Optional[MemoryStatus]) -> None:
+        if status is None:
+            self.concurrency = self.max_concurrency
+            return
+        reserve = self.reserve * status.total
+        pressure = status.pressure is not None and status.pressure > self.max_pressure
+        if pressure or status.available < reserve:
+            self._reduce()
+        elif status.available > 2 * reserve and self._queue and self._running >= self.concurrency:
+            self.concurrency = min(self.concurrency + 1, self.max_concurrency)
+
+    def _reduce(self) -> None:
+        self.concurrency = max(self.concurrency // 2, self.min_concurrency)
+
+    def killed(self, attempt: int) -> bool:
+        """
+        Record that a compile was killed, and reduce the concurrency.
+
+        Arguments
+        ---------
+        attempt : int
+            Number of times the compile was already run again.
+
+        Returns
+        -------
+        bool
+            True if the compile should be run again.
+        """
+        with self._condition:
+            self.kills += 1
+            self._reduce()
+            # memory freed by the killed process is not a reason to grow again at once
+            self._next_check = time.monotonic() + self.interval * 4
+            return attempt < self.max_retries
+
+
+def set_scheduler(scheduler: Optional[CompileScheduler]) -> None:
+    """
+    Set the scheduler used for all `vyper` processes started by `vvm`.
+
+    Arguments
+    ---------
+    scheduler : CompileScheduler, optional
+        Scheduler to use, or `None` to run compiles without admission control.
+    """
+    global _scheduler
+    _scheduler = scheduler
+
+
+def get_scheduler() -> Optional[CompileScheduler]:
+    """
+    Return the scheduler set with `set_scheduler`.
+    """
+    return _scheduler
+
+
+@contextmanager
+def job(priority: Union[int, str] = NORMAL, tenant: Optional[str] = None) -> Iterator[None]:
+    """
+    Set the priority class and tenant of compiles made within the context.
+
+    Like `vvm.using_version`, the values apply to the current thread or asyncio task.
+
+    Arguments
+    ---------
+    priority : int | str, optional
+        `INTERACTIVE`, `NORMAL` or `BATCH`, or the lowercase name of the class.
+    tenant : str, optional
+        Name of the user or service making the compiles, for fair sharing.
+    """
+    token = _job.set((to_priority(priority), tenant))
+    try:
+        yield
+    finally:
+        _job.reset(token)
+
+
+@contextmanager
+def _admit() -> Iterator[None]:
+    # used by `vvm.wrapper` around each `vyper` process
+    scheduler = _scheduler
+    if scheduler is None or _admitted.get():
+        yield
+        return
+    with scheduler.slot(*_job.get()):
+        yield
+
+
+def _retry(return_code: int, cpu_time_limit: Optional[int], attempt: int) -> bool:
+    # used by `vvm.wrapper` after each `vyper` process, to run it again if it was
+    # killed by the OOM killer
+    scheduler = _scheduler
+    if not isinstance(scheduler, AdaptiveScheduler) or cpu_time_limit is not None:
+        return False
+    # there is no SIGKILL on Windows, where a killed process cannot be told apart
+    if not hasattr(signal, "SIGKILL") or return_code != -signal.SIGKILL:
+        return False
+    retry = scheduler.killed(attempt)
+    if retry:
+        LOGGER.warning(f"vyper was killed, retrying with a concurrency of {scheduler.concurrency}")
+    return retry
@@ -0,0 +1,365 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import socketserver
+import stat
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from vvm import archive as _archive
+from vvm import install, main
+from vvm.exceptions import VyperError
+from vvm.scheduler import NORMAL, CompileScheduler, to_priority
+
+LOGGER = logging.getLogger("vvm")
+
+DEFAULT_PORT = 8547
+
+
+def _compile_source(**kwargs: Any) -> Any:
+    return main.compile_source(**kwargs)
+
+
+def _compile_files(**kwargs: Any) -> Any:
+    return main.compile_files(**kwargs)
+
+
+def _compile_standard(**kwargs: Any) -> Any:
+    return main.compile_standard(**kwargs)
+
+
+def _compile_archive(archive: str, **kwargs: Any) -> Any:
+    # the archive is sent base64 encoded. it is decoded here, as a string
+    # given to `compile_archive` is read as a path if it names a file
+    return _archive.compile_archive(base64.b64decode(archive, validate=True), **kwargs)
+
+
+def _install_vyper(**kwargs: Any) -> str:
+    return str(install.install_vyper(**kwargs))
+
+
+def _get_installed_vyper_versions(**kwargs: Any) -> list:
+    return [str(i) for i in install.get_installed_vyper_versions(**kwargs)]
+
+
+def _get_vyper_version() -> str:
+    return str(main.get_vyper_version())
+
+
+# arguments that refer to the server's filesystem, only accepted with `allow_paths`
+PATH_ARGUMENTS = ("source_files", "base_path", "search_paths", "vvm_binary_path")
+
+# methods exposed by the server. the boolean marks results that may be cached,
+# i.e. those that depend only on the request arguments
+METHODS: Dict[str, Tuple[Callable, bool]] = {
+    "compile_source": (_compile_source, True),
+    "compile_files": (_compile_files, False),
+    "compile_standard": (_compile_standard, True),
+    "compile_archive": (_compile_archive, True),
+    "install_vyper": (_install_vyper, False),
+    "get_installed_vyper_versions": (_get_installed_vyper_versions, False),
+    "get_vyper_version": (_get_vyper_version, False),
+}
+
+
+def _check_arguments(kwargs: Any, allow_paths: bool) -> None:
+    if not isinstance(kwargs, dict):
+        raise TypeError("Arguments must be a JSON object")
+    # clients may only run the compilers installed by the server
+    if kwargs.get("vyper_binary") is not None:
+        raise PermissionError("The server does not accept 'vyper_binary'")
+    if not allow_paths:
+        for name in PATH_ARGUMENTS:
+            if kwargs.get(name) is not None:
+                raise PermissionError(f"The server does not accept '{name}'")
+
+
+def _encode_exception(exc: Exception) -> Dict:
+    data: Dict = {"type": type(exc).__name__, "message": str(exc)}
+    if isinstance(exc, VyperError):
+        data.update(
+            message=exc.message,
+            command=[str(i) for i in exc.command],
+            return_code=exc.return_code,
+            stdin_data=exc.stdin_data,
+            stdout_data=exc.stdout_data,
+            stderr_data=exc.stderr_data,
+            error_dict=exc.error_dict,
+        )
+    return data
+
+
+def _content_length(value: str) -> int:
+    try:
+        length = int(value)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise ValueError(f"Invalid Content-Length: {value!r}")
+    return length
+
+
+def _remove_socket(path: Path) -> None:
+    # remove a socket left behind by a previous server, but never any other file
+    try:
+        mode = path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    path.unlink()
+
+
+class _ResultCache:
+    # thread-safe LRU cache for compiler output, shared by all clients of a server
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: str, value: str) -> None:
+        if not self.max_size:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: Any
+
+    def address_string(self) -> str:
+        # unix sockets do not have a client address
+        return str(self.client_address[0]) if self.client_address else "local"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        LOGGER.debug(f"{self.address_string()} - {format % args}")
+
+    def do_POST(self) -> None:
+        method = self.path.strip("/")
+        if method not in METHODS:
+            self._send(
+                404, {"error": {"type": "ValueError", "message": f"Unknown method {method}"}}
+            )
+            return
+
+        # browsers cannot send a JSON request to another origin without a preflight,
+        # which the server does not answer, so web pages cannot call the server
+        if self.headers.get_content_type() != "application/json":
+            self._send(
+                415,
+                {
+                    "error": {
+                        "type": "ValueError",
+                        "message": "Content-Type must be application/json",
+                    }
+                },
+            )
+            return
+
+        try:
+            length = _content_length(self.headers.get("Content-Length", "0"))
+            priority = to_priority(self.headers.get("X-Vvm-Priority", NORMAL))
+        except ValueError as exc:
+            self._send(400, {"error": _encode_exception(exc)})
+            return
+        body = self.rfile.read(length)
+        tenant = self.headers.get("X-Vvm-Tenant")
+        status, response = self.server.vvm_handle(method, body, priority, tenant)
+        self._send(status, response)
+
+    def do_GET(self) -> None:
+        if self.path.strip("/") != "stats":
+            self._send(404, {"error": {"type": "ValueError", "message": "Not found"}})
+            return
+        self._send(200, {"result": self.server.vvm_scheduler.stats()._asdict()})
+
+    def _send(self, status: int, response: Union[Dict, str]) -> None:
+        if not isinstance(response, str):
+            response = json.dumps(response)
+        data = response.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _ServerMixin:
+    daemon_threads = True
+
+    def vvm_setup(
+        self,
+        max_workers: int,
+        cache_size: int,
+        allow_paths: bool = False,
+        allow_install: bool = False,
+    ) -> None:
+        self.vvm_scheduler = CompileScheduler(max_workers)
+        self.vvm_cache = _ResultCache(cache_size)
+        self.vvm_allow_paths = allow_paths
+        self.vvm_allow_install = allow_install
+
+    def vvm_handle(
+        self, method: str, body: bytes, priority: int = NORMAL, tenant: Optional[str] = None
+    ) -> Tuple[int, Union[Dict, str]]:
+        func, cacheable = METHODS[method]
+        if method == "install_vyper" and not self.vvm_allow_install:
+            exc = PermissionError("The server does not accept 'install_vyper'")
+            return 403, {"error": _encode_exception(exc)}
+        try:
+            kwargs = json.loads(body or b"{}")
+            _check_arguments(kwargs, self.vvm_allow_paths)
+        except PermissionError as exc:
+            return 403, {"error": _encode_exception(exc)}
+        except (TypeError, ValueError) as exc:
+            return 400, {"error": _encode_exception(exc)}
+
+        cache_key = None
+        # with a base path or search paths, the output may depend on imported files
+        if cacheable and kwargs.get("base_path") is None and kwargs.get("search_paths") is None:
+            cache_key = hashlib.sha256(method.encode() + b"\0" + body).hexdigest()
+            cached = self.vvm_cache.get(cache_key)
+            if cached is not None:
+                return 200, cached
+
+        try:
+            with self.vvm_scheduler.slot(priority, tenant):
+                result = func(**kwargs)
+        except Exception as exc:
+            status = 400 if isinstance(exc, (TypeError, ValueError)) else 500
+            return status, {"error": _encode_exception(exc)}
+
+        response = json.dumps({"result": result})
+        if cache_key is not None:
+            self.vvm_cache.set(cache_key, response)
+        return 200, response
+
+
+class VvmHTTPServer(_ServerMixin, ThreadingHTTPServer):
+    """
+    `vvm` compile server listening on a TCP address.
+    """
+
+
+if sys.platform != "win32":
+
+    class VvmUnixServer(_ServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """
+        `vvm` compile server listening on a Unix domain socket.
+        """
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    unix_socket: Union[Path, str] = None,
+    max_workers: int = None,
+    cache_size: int = 256,
+    allow_paths: bool = False,
+    allow_install: bool = False,
+) -> Union["VvmHTTPServer", "VvmUnixServer"]:
+    """
+    Create a `vvm` compile server.
+
+    The server exposes `compile_source`, `compile_files`, `compile_standard`,
+    `compile_archive`, `install_vyper`, `get_installed_vyper_versions` and
+    `get_vyper_version` via HTTP POST requests, with the keyword arguments of
+    each function given as a JSON object, and a `Content-Type` of
+    `application/json`. Use `vvm.client.VvmClient` to connect to the server.
+
+    Clients cannot choose the `vyper` binary, only an installed version.
+    Arguments that refer to files on the server (`source_files`, `base_path`,
+    `search_paths` and `vvm_binary_path`) are rejected unless `allow_paths` is
+    set, so by default `compile_files` is not available. `install_vyper` is
+    only available with `allow_install`.
+
+    Requests are admitted by a `vvm.scheduler.CompileScheduler`, using the
+    priority class and tenant given in the `X-Vvm-Priority` and `X-Vvm-Tenant`
+    headers. Scheduler statistics are available via `GET /stats`.
+
+    Arguments
+    ---------
+    host : str, optional
+        Address to listen on. Defaults to localhost.
+    port : int, optional
+        Port to listen on. Use 0 to pick a free port.
+    unix_socket : Path | str, optional
+        Listen on this Unix domain socket instead of a TCP port. A socket
+        left at this path by a previous server is replaced, any other file
+        raises `FileExistsError`.
+    max_workers : int, optional
+        Maximum number of requests that are handled concurrently. Defaults to
+        the number of CPUs.
+    cache_size : int, optional
+        Number of compiler outputs kept in the shared in-memory cache. Set to
+        0 to disable caching. Compiles with a base path or search paths are
+        not cached, as their output may depend on imported files.
+    allow_paths : bool, optional
+        Accept arguments that refer to files on the server. Only use this if
+        every process that can connect to the server may read those files.
+    allow_install : bool, optional
+        Allow clients to install new `vyper` versions on the server.
+
+    Returns
+    -------
+    VvmHTTPServer | VvmUnixServer
+        Server object. Call `serve_forever()` to begin handling requests.
+    """
+    server: Union["VvmHTTPServer", "VvmUnixServer"]
+    if unix_socket is not None:
+        unix_socket = Path(unix_socket)
+        _remove_socket(unix_socket)
+        server = VvmUnixServer(str(unix_socket), _RequestHandler)
+    else:
+        server = VvmHTTPServer((host, port), _RequestHandler)
+    server.vvm_setup(max_workers or os.cpu_count() or 1, cache_size, allow_paths, allow_install)
+    return server
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    unix_socket: Union[Path, str] = None,
+    max_workers: int = None,
+    cache_size: int = 256,
+    allow_paths: bool = False,
+    allow_install: bool = False,
+) -> None:
+    """
+    Run a `vvm` compile server until interrupted.
+
+    See `make_server` for a description of the arguments.
+    """
+    server = make_server(
+        host, port, unix_socket, max_workers, cache_size, allow_paths, allow_install
+    )
+    LOGGER.info(f"vvm server listening on {server.server_address!r}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if unix_socket is not None:
+            try:
+                _remove_socket(Path(unix_socket))
+            except FileExistsError:
+                # the socket was replaced by another file while the server was running
+                pass
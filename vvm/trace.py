@@ -0,0 +1,322 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, NamedTuple, Optional, Union
+
+from packaging.version import Version
+
+from vvm import install
+from vvm.utils.hooks import HookRegistry
+
+VVM_TRACE_PATH_VARIABLE = "VVM_TRACE_PATH"
+
+_recorders: HookRegistry["TraceRecorder"] = HookRegistry()
+_environment_lock = threading.Lock()
+_environment_recorder: Optional["TraceRecorder"] = None
+
+
+def _hash(data: Union[str, bytes]) -> str:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+class TraceCall(NamedTuple):
+    """
+    A single recorded `vyper` invocation.
+    """
+
+    compiler_version: str
+    args: List[str]
+    stdin: Optional[str]
+    files: Dict[str, str]
+    duration: float
+    return_code: int
+    output_hash: str
+
+
+class ReplayResult(NamedTuple):
+    """
+    Result of replaying a recorded `vyper` invocation.
+    """
+
+    number: int
+    args: List[str]
+    original_duration: float
+    duration: float
+    original_return_code: int
+    return_code: int
+    output_match: bool
+
+    @property
+    def change(self) -> float:
+        """Relative change in duration, e.g. `0.25` for 25% slower."""
+        if not self.original_duration:
+            return float("inf")
+        return (self.duration - self.original_duration) / self.original_duration
+
+
+class TraceRecorder:
+    """
+    Record `vyper` invocations to a trace file, for replay with `replay`.
+
+    Each call stores the arguments, stdin, the contents of the source files
+    given on the command line, the duration, exit code and a hash of the
+    output. The file is gzip compressed JSON lines, and each distinct stdin or
+    source file is stored only once. Every call is written and flushed as a
+    complete gzip member, so the file can be read while recording, and a crash
+    loses at most the call being written.
+
+    Recording can also be enabled for a whole process by setting the
+    `VVM_TRACE_PATH` environment variable.
+
+    Arguments
+    ---------
+    path : Path | str
+        Location of the trace file. New calls are appended to an existing file.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file: Optional[IO[bytes]] = None
+        self._blobs: set = set()
+
+    def __repr__(self) -> str:
+        return f"<TraceRecorder '{self.path}'>"
+
+    @contextmanager
+    def record(self) -> Iterator["TraceRecorder"]:
+        """
+        Record all `vyper` invocations made within the context.
+        """
+        try:
+            with _recorders.register(self):
+                yield self
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def add(self, call: TraceCall, blobs: Dict[str, str]) -> None:
+        """
+        Append a call to the trace file, along with any blobs (stdin and source
+        file contents, by hash) that it references.
+        """
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            lines = []
+            for blob_hash, data in blobs.items():
+                if blob_hash not in self._blobs:
+                    self._blobs.add(blob_hash)
+                    lines.append(json.dumps({"blob": blob_hash, "data": data}) + "\n")
+            lines.append(json.dumps({"call": call._asdict()}) + "\n")
+            # each call is a separate gzip member, which gzip reads as one stream
+            self._file.write(gzip.compress("".join(lines).encode("utf8")))
+            self._file.flush()
+
+
+def read_trace(path: Union[Path, str]) -> Iterator[TraceCall]:
+    """
+    Read the calls from a trace file.
+
+    A truncated call at the end of the file, e.g. one that is still being
+    written, is ignored.
+
+    Yields
+    ------
+    TraceCall
+        Recorded calls, in order. The `stdin` and `files` fields contain the
+        actual contents rather than hashes.
+    """
+    blobs: Dict[str, str] = {}
+    with gzip.open(path, "rt", encoding="utf8") as fp:
+        while True:
+            try:
+                line = fp.readline()
+            except EOFError:
+                # the last gzip member is incomplete
+                return
+            if not line:
+                return
+            record = json.loads(line)
+            if "blob" in record:
+                blobs[record["blob"]] = record["data"]
+                continue
+            call = record["call"]
+            if call["stdin"] is not None:
+                call["stdin"] = blobs[call["stdin"]]
+            call["files"] = {k: blobs[v] for k, v in call["files"].items()}
+            yield TraceCall(**call)
+
+
+def _get_recorders() -> List[TraceRecorder]:
+    global _environment_recorder
+    recorders = _recorders.active()
+    with _environment_lock:
+        path = os.getenv(VVM_TRACE_PATH_VARIABLE)
+        if path:
+            if _environment_recorder is None or _environment_recorder.path != Path(path):
+                if _environment_recorder is not None:
+                    _environment_recorder.close()
+                _environment_recorder = TraceRecorder(path)
+                atexit.register(_environment_recorder.close)
+            recorders.append(_environment_recorder)
+    return recorders
+
+
+def _record(
+    compiler_version: Version,
+    command: List,
+    stdin: Optional[str],
+    source_files: Union[List, Path, str, None],
+    duration: float,
+    return_code: int,
+    stdout: str,
+) -> None:
+    # called by `vvm.wrapper` after every `vyper` invocation
+    recorders = _get_recorders()
+    if not recorders:
+        return
+
+    blobs: Dict[str, str] = {}
+    stdin_hash = None
+    if stdin is not None:
+        stdin_hash = _hash(stdin)
+        blobs[stdin_hash] = stdin
+
+    if isinstance(source_files, (str, Path)):
+        source_files = [source_files]
+    files = {}
+    for path in source_files or []:
+        try:
+            content = Path(path).read_text(encoding="utf8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        content_hash = _hash(content)
+        blobs[content_hash] = content
+        files[Path(path).as_posix()] = content_hash
+
+    call = TraceCall(
+        str(compiler_version),
+        [str(i) for i in command[1:]],
+        stdin_hash,
+        files,
+        duration,
+        return_code,
+        _hash(stdout),
+    )
+    for recorder in recorders:
+        recorder.add(call, blobs)
+
+
+def _replay_call(
+    index: int, call: TraceCall, vyper_binary: Optional[Path], temp_dir: Path
+) -> ReplayResult:
+    if vyper_binary is None:
+        vyper_binary = install.get_executable(call.compiler_version)
+
+    # write the source files to a private directory, and point the arguments at them
+    call_dir = temp_dir.joinpath(str(index))
+    paths: Dict[str, str] = {}
+    for i, (path, content) in enumerate(call.files.items()):
+        new_path = call_dir.joinpath(str(i), Path(path).name)
+        new_path.parent.mkdir(parents=True)
+        new_path.write_text(content, encoding="utf8")
+        paths[path] = new_path.as_posix()
+    args = [paths.get(i, i) for i in call.args]
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [str(vyper_binary), *args],
+        input=call.stdin,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        encoding="utf8",
+    )
+    duration = time.perf_counter() - start
+
+    stdout = proc.stdout
+    for original, replaced in paths.items():
+        stdout = stdout.replace(replaced, original)
+    return ReplayResult(
+        index,
+        call.args,
+        call.duration,
+        duration,
+        call.return_code,
+        proc.returncode,
+        _hash(stdout) == call.output_hash,
+    )
+
+
+def replay(
+    path: Union[Path, str],
+    vyper_binary: Union[Path, str] = None,
+    vyper_version: Union[str, Version, None] = None,
+    concurrency: int = 1,
+) -> List[ReplayResult]:
+    """
+    Run the calls of a trace file again and compare their timings.
+
+    Arguments
+    ---------
+    path : Path | str
+        Trace file written by `TraceRecorder`.
+    vyper_binary : Path | str, optional
+        `vyper` binary to run every call with.
+    vyper_version : str | Version, optional
+        Installed `vyper` version to run every call with. Ignored if
+        `vyper_binary` is also given. If neither is given, each call is run with
+        the version it was recorded with.
+    concurrency : int, optional
+        Number of calls to run at the same time.
+
+    Returns
+    -------
+    List
+        `ReplayResult` for each call, in the order they were recorded.
+    """
+    if vyper_binary is None and vyper_version is not None:
+        vyper_binary = install.get_executable(vyper_version)
+    binary = None if vyper_binary is None else Path(vyper_binary)
+
+    calls = list(read_trace(path))
+    temp_dir = Path(tempfile.mkdtemp(prefix="vvm-replay-"))
+    try:
+        with ThreadPoolExecutor(concurrency) as executor:
+            futures = [
+                executor.submit(_replay_call, i, call, binary, temp_dir)
+                for i, call in enumerate(calls)
+            ]
+            return [i.result() for i in futures]
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def summarize(results: List[ReplayResult]) -> Dict[str, Any]:
+    """
+    Return the total durations and the number of changed results of a replay.
+    """
+    return {
+        "calls": len(results),
+        "original_duration": sum(i.original_duration for i in results),
+        "duration": sum(i.duration for i in results),
+        "return_code_changed": sum(i.return_code != i.original_return_code for i in results),
+        "output_changed": sum(not i.output_match for i in results),
+    }
@@ -0,0 +1,284 @@
+import json
+import mmap
+import os
+import tempfile
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from packaging.version import Version
+
+from vvm import exceptions, main, wrapper
+from vvm.install import get_executable
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # pragma: no cover
+    shared_memory = None  # type: ignore
+
+TRANSPORTS = ("auto", "shm", "file")
+
+
+def _create_shared_memory(data: bytes) -> str:
+    # the segment must outlive the worker, so it is not tracked by the worker's
+    # resource tracker, which would remove it when the worker exits
+    size = max(len(data), 1)
+    try:
+        shm = shared_memory.SharedMemory(create=True, size=size, track=False)  # type: ignore
+    except TypeError:
+        # `track` was added in Python 3.13
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        if os.name == "posix":
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+    shm.buf[: len(data)] = data  # type: ignore
+    name = shm.name
+    shm.close()
+    return name
+
+
+def _create_spill_file(data: bytes) -> str:
+    fd, path = tempfile.mkstemp(
+        prefix="vvm-output-", suffix=".json", dir=exceptions.SPILL_DIRECTORY
+    )
+    with os.fdopen(fd, "wb") as fp:
+        fp.write(data)
+    return path
+
+
+def _release(transport: str, name: str, resources: Dict) -> None:
+    # called by `SharedOutput.release`, or when the consumer's handle is garbage collected
+    view = resources.pop("view", None)
+    if view is not None:
+        view.release()
+    mapped = resources.pop("mmap", None)
+    if mapped is not None:
+        mapped.close()
+    shm = resources.pop("shm", None)
+    try:
+        if transport == "shm":
+            if shm is None:
+                shm = shared_memory.SharedMemory(name=name)
+            shm.close()
+            shm.unlink()
+        else:
+            os.unlink(name)
+    except (FileNotFoundError, BufferError):
+        pass
+
+
+class SharedOutput:
+    """
+    Raw `vyper` output held in shared memory or a spill file.
+
+    Returned by `compile_standard_shared`. The handle pickles to the name of
+    the segment or file, its size and the details needed to raise `VyperError`,
+    so returning it from a worker process sends a few hundred bytes instead of
+    the output. The output is only parsed when `load` is called.
+
+    The process that unpickles the handle owns the output, and removes it with
+    `release` or when the handle is garbage collected. A handle should be
+    unpickled by a single process. A handle that was not pickled, e.g. when
+    `compile_standard_shared` is called in the consumer itself, must be
+    released explicitly.
+    """
+
+    def __init__(
+        self,
+        transport: str,
+        name: str,
+        size: int,
+        command: List,
+        return_code: int,
+        stderr_data: str,
+        owner: bool = False,
+    ) -> None:
+        self.transport = transport
+        self.name = name
+        self.size = size
+        self.command = command
+        self.return_code = return_code
+        self.stderr_data = stderr_data
+        self._resources: Dict[str, Any] = {}
+        self._finalizer = None
+        if owner:
+            self._finalizer = weakref.finalize(self, _release, transport, name, self._resources)
+
+    def __repr__(self) -> str:
+        return f"<SharedOutput {self.transport}:{self.name} ({self.size} bytes)>"
+
+    def __reduce__(self) -> tuple:
+        return (
+            _restore,
+            (
+                self.transport,
+                self.name,
+                self.size,
+                [str(i) for i in self.command],
+                self.return_code,
+                self.stderr_data,
+            ),
+        )
+
+    def __enter__(self) -> "SharedOutput":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.release()
+
+    def _buffer(self) -> memoryview:
+        if "view" not in self._resources:
+            if self.transport == "shm":
+                shm = shared_memory.SharedMemory(name=self.name)
+                self._resources["shm"] = shm
+                self._resources["view"] = shm.buf
+            elif self.size:
+                with open(self.name, "rb") as fp:
+                    mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+                self._resources["mmap"] = mapped
+                self._resources["view"] = memoryview(mapped)
+            else:
+                # an empty file cannot be memory mapped
+                self._resources["view"] = memoryview(b"")
+        return self._resources["view"][: self.size]
+
+    @contextmanager
+    def view(self) -> Iterator[memoryview]:
+        """
+        Give read-only access to the raw output, without copying it.
+
+        The view must not be used after the context exits.
+        """
+        view = self._buffer()
+        readonly = view.toreadonly()
+        try:
+            yield readonly
+        finally:
+            readonly.release()
+            view.release()
+
+    def read(self) -> bytes:
+        """
+        Return a copy of the raw output.
+        """
+        with self.view() as view:
+            return bytes(view)
+
+    def load(self) -> Dict:
+        """
+        Parse the output as compiler JSON output.
+
+        Raises `VyperError` if the output contains errors, as `compile_standard` does.
+        """
+        stdoutdata = self.read().decode("utf8")
+        compiler_output = json.loads(stdoutdata)
+        main._check_errors(
+            compiler_output, self.command, self.return_code, None, stdoutdata, self.stderr_data
+        )
+        return compiler_output
+
+    def release(self) -> None:
+        """
+        Remove the output from shared memory or disk.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+        else:
+            _release(self.transport, self.name, self._resources)
+
+
+def _restore(
+    transport: str, name: str, size: int, command: List, return_code: int, stderr_data: str
+) -> SharedOutput:
+    return SharedOutput(transport, name, size, command, return_code, stderr_data, owner=True)
+
+
+def compile_standard_shared(
+    input_data: Dict,
+    base_path: str = None,
+    vyper_binary: Union[str, Path] = None,
+    vyper_version: Version = None,
+    timeout: float = None,
+    cpu_time_limit: int = None,
+    memory_limit: int = None,
+    output_fields: Optional[List[str]] = None,
+    transport: str = "auto",
+) -> SharedOutput:
+    """
+    Compile Vyper contracts using the JSON-input-output interface, and keep the
+    output in shared memory.
+
+    Intended to be called in the workers of a process pool, such as
+    `concurrent.futures.ProcessPoolExecutor`. The output is not parsed in the
+    worker, and the returned `SharedOutput` pickles to a small handle, so large
+    outputs (e.g. with ASTs and source maps) are neither parsed nor copied
+    through the pool's pipe. Call `SharedOutput.load` in the consumer to parse
+    the output and check it for errors.
+
+    The remote cache and compile history are not used, as both need the
+    parsed output.
+
+    Arguments
+    ---------
+    input_data : Dict
+        Compiler JSON input.
+    base_path : Path | str, optional
+        Use the given path as the root of the source tree instead of the root
+        of the filesystem.
+    vyper_binary : str | Path, optional
+        Path of the `vyper` binary to use. If not given, the currently active
+        version is used (as set by `vvm.set_vyper_version`)
+    vyper_version: Version, optional
+        `vyper` version to use. If not given, the currently active version is used.
+        Ignored if `vyper_binary` is also given.
+    timeout : float, optional
+        Wall-clock time limit for the compiler, in seconds. Raises `VyperTimeoutError`
+        if exceeded.
+    cpu_time_limit : int, optional
+        CPU time limit for the compiler, in seconds. Not available on Windows.
+    memory_limit : int, optional
+        Address space limit for the compiler, in bytes. Not available on Windows.
+    output_fields : List, optional
+        Outputs that are actually used. See `compile_standard`.
+    transport : str, optional
+        `"shm"` to use `multiprocessing.shared_memory`, `"file"` to use a
+        memory-mapped spill file in `vvm.exceptions.SPILL_DIRECTORY`, or
+        `"auto"` to use shared memory where it is available and a spill file
+        otherwise.
+
+    Returns
+    -------
+    SharedOutput
+        Handle of the raw compiler output.
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"transport must be one of {', '.join(TRANSPORTS)}")
+    if output_fields is not None:
+        input_data = main._narrow_input(input_data, output_fields)
+    if vyper_binary is None:
+        vyper_binary = get_executable(vyper_version)
+
+    stdoutdata, stderrdata, command, proc = wrapper.vyper_wrapper(
+        vyper_binary=vyper_binary,
+        stdin=json.dumps(input_data),
+        standard_json=True,
+        p=base_path,
+        timeout=timeout,
+        cpu_time_limit=cpu_time_limit,
+        memory_limit=memory_limit,
+    )
+    data = stdoutdata.encode("utf8")
+
+    name = None
+    if transport in ("auto", "shm") and shared_memory is not None:
+        try:
+            name = _create_shared_memory(data)
+            transport = "shm"
+        except OSError:
+            # e.g. no /dev/shm in a container
+            if transport == "shm":
+                raise
+    if name is None:
+        name = _create_spill_file(data)
+        transport = "file"
+    return SharedOutput(transport, name, len(data), command, proc.returncode, stderrdata)
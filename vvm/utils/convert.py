@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Any, Optional, Union
 
 from packaging.version import Version
 
@@ -8,3 +8,12 @@ def to_vyper_version(version: Union[str, Version]) -> Version:
         version = Version(version)
 
     return version
+
+
+def hex_size(value: Any) -> Optional[int]:
+    """
+    Return the size in bytes of hex encoded data, or `None` if `value` is not a string.
+    """
+    if not isinstance(value, str):
+        return None
+    return len(value[2:] if value.startswith("0x") else value) // 2
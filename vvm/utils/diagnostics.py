@@ -0,0 +1,94 @@
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+# `vyper.exceptions.StructureException: Invalid top-level statement`
+EXCEPTION_REGEX = re.compile(r"^vyper\.(?:\w+\.)*(?P<type>\w+): ?(?P<message>.*)$", re.MULTILINE)
+
+# `contract "contracts/Foo.vy:3", function "bar", line 3:11` or, for older versions,
+# a message prefixed with `line 3:11`
+LOCATION_REGEX = re.compile(
+    r'(?:contract "(?P<file>[^"]*?)(?::\d+)?"[^\n]*?)?\bline (?P<line>\d+):(?P<column>\d+)'
+)
+
+
+class Diagnostic(NamedTuple):
+    """
+    A single error or warning reported by `vyper`.
+    """
+
+    file: Optional[str]
+    line: Optional[int]
+    column: Optional[int]
+    severity: str
+    type: Optional[str]
+    message: str
+
+    def __str__(self) -> str:
+        location = ":".join(str(i) for i in (self.file, self.line, self.column) if i is not None)
+        kind = f"{self.severity}: {self.type}" if self.type else self.severity
+        return f"{location}: {kind}: {self.message}" if location else f"{kind}: {self.message}"
+
+
+def _to_int(value: object) -> Optional[int]:
+    return value if isinstance(value, int) else None
+
+
+def from_standard_json(errors: List[Dict]) -> List[Diagnostic]:
+    """
+    Convert the `errors` field of standard JSON output to diagnostics.
+    """
+    diagnostics = []
+    for error in errors:
+        location = error.get("sourceLocation") or {}
+        line = _to_int(location.get("lineno"))
+        column = _to_int(location.get("col_offset"))
+        if line is None:
+            # most versions only include the line and column in the formatted message
+            match = LOCATION_REGEX.search(error.get("formattedMessage") or "")
+            if match is not None:
+                line, column = int(match["line"]), int(match["column"])
+        diagnostics.append(
+            Diagnostic(
+                location.get("file"),
+                line,
+                column,
+                error.get("severity", "error"),
+                error.get("type"),
+                (error.get("message") or error.get("formattedMessage") or "").strip(),
+            )
+        )
+    return diagnostics
+
+
+def from_stderr(stderr: str) -> List[Diagnostic]:
+    """
+    Parse diagnostics from the `stderr` output of a failed `vyper` call.
+
+    If no exception can be found, the last line of the output is returned as a
+    diagnostic without a location.
+    """
+    matches = list(EXCEPTION_REGEX.finditer(stderr))
+    if not matches:
+        lines = [i for i in stderr.splitlines() if i.strip()]
+        if not lines:
+            return []
+        return [Diagnostic(None, None, None, "error", None, lines[-1].strip())]
+
+    diagnostics = []
+    for match, end in zip(matches, [i.start() for i in matches[1:]] + [len(stderr)]):
+        message = match["message"].strip()
+        location = LOCATION_REGEX.search(stderr, match.start(), end)
+        if location is not None and message.startswith(location.group()):
+            # older versions prefix the message with the location
+            message = message[len(location.group()) :].strip()
+        diagnostics.append(
+            Diagnostic(
+                location["file"] if location else None,
+                int(location["line"]) if location else None,
+                int(location["column"]) if location else None,
+                "error",
+                match["type"],
+                message,
+            )
+        )
+    return diagnostics
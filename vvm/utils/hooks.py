@@ -0,0 +1,36 @@
+import threading
+from contextlib import contextmanager
+from typing import Generic, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+class HookRegistry(Generic[T]):
+    """
+    Thread-safe registry of the recorders, such as a `CompileHistory`, that are
+    called by `vvm` after each compile.
+    """
+
+    def __init__(self) -> None:
+        self._active: List[T] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def register(self, recorder: T) -> Iterator[T]:
+        """
+        Register a recorder for the duration of the context.
+        """
+        with self._lock:
+            self._active.append(recorder)
+        try:
+            yield recorder
+        finally:
+            with self._lock:
+                self._active.remove(recorder)
+
+    def active(self) -> List[T]:
+        """
+        Return the registered recorders, in order of registration.
+        """
+        with self._lock:
+            return self._active.copy()
@@ -0,0 +1,87 @@
+from typing import List
+
+# Keccak-256 as used by Ethereum, which differs from `hashlib.sha3_256` in its padding
+
+_MASK = 2**64 - 1
+_RATE = 136
+
+_ROUND_CONSTANTS = [
+    0x0000000000000001,
+    0x0000000000008082,
+    0x800000000000808A,
+    0x8000000080008000,
+    0x000000000000808B,
+    0x0000000080000001,
+    0x8000000080008081,
+    0x8000000000008009,
+    0x000000000000008A,
+    0x0000000000000088,
+    0x0000000080008009,
+    0x000000008000000A,
+    0x000000008000808B,
+    0x800000000000008B,
+    0x8000000000008089,
+    0x8000000000008003,
+    0x8000000000008002,
+    0x8000000000000080,
+    0x000000000000800A,
+    0x800000008000000A,
+    0x8000000080008081,
+    0x8000000000008080,
+    0x0000000080000001,
+    0x8000000080008008,
+]
+
+# rotation offsets, indexed by `[y][x]`
+_ROTATIONS = [
+    [0, 1, 62, 28, 27],
+    [36, 44, 6, 55, 20],
+    [3, 10, 43, 25, 39],
+    [41, 45, 15, 21, 8],
+    [18, 2, 61, 56, 14],
+]
+
+
+def _rotate(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (64 - shift))) & _MASK if shift else value
+
+
+def _permute(state: List[int]) -> None:
+    for constant in _ROUND_CONSTANTS:
+        # theta
+        c = [
+            state[x] ^ state[x + 5] ^ state[x + 10] ^ state[x + 15] ^ state[x + 20]
+            for x in range(5)
+        ]
+        d = [c[(x - 1) % 5] ^ _rotate(c[(x + 1) % 5], 1) for x in range(5)]
+        for i in range(25):
+            state[i] ^= d[i % 5]
+        # rho and pi
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = _rotate(state[x + 5 * y], _ROTATIONS[y][x])
+        # chi
+        for y in range(0, 25, 5):
+            for x in range(5):
+                state[y + x] = b[y + x] ^ (~b[y + (x + 1) % 5] & b[y + (x + 2) % 5])
+        # iota
+        state[0] ^= constant
+
+
+def keccak256(data: bytes) -> bytes:
+    """
+    Return the Keccak-256 hash of `data`.
+    """
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b"\x00" * (-len(padded) % _RATE))
+    padded[-1] |= 0x80
+
+    state = [0] * 25
+    for offset in range(0, len(padded), _RATE):
+        for i in range(_RATE // 8):
+            start = offset + i * 8
+            state[i] ^= int.from_bytes(padded[start : start + 8], "little")
+        _permute(state)
+    return b"".join(i.to_bytes(8, "little") for i in state[:4])
@@ -1,9 +1,11 @@
+import hashlib
 import os
 import sys
 import tempfile
 import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, Iterator, Union
 
 if sys.platform == "win32":
     import msvcrt
@@ -88,3 +90,44 @@ class WindowsLock(_ProcessLock):
     def release(self) -> None:
         msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)  # type: ignore
         self._lock.release()
+
+
+def _get_in_use_path(binary: Union[Path, str]) -> Path:
+    digest = hashlib.sha256(str(Path(binary).absolute()).encode()).hexdigest()[:16]
+    return Path(tempfile.gettempdir()).joinpath(f".vvm-in-use-{digest}")
+
+
+@contextmanager
+def binary_in_use(binary: Union[Path, str]) -> Iterator[None]:
+    """
+    Mark a binary as in use, in this and other processes, for the duration of the context.
+
+    Any number of threads and processes may hold the lock at once. On Windows
+    nothing is locked, as an executable cannot be removed while it is running.
+    """
+    if sys.platform == "win32":
+        yield
+        return
+    # each use opens its own file, as flock locks are per open file
+    with _get_in_use_path(binary).open("a") as fp:
+        fcntl.flock(fp, fcntl.LOCK_SH)
+        yield
+
+
+@contextmanager
+def binary_not_in_use(binary: Union[Path, str]) -> Iterator[bool]:
+    """
+    Prevent a binary from being marked as in use for the duration of the context.
+
+    Yields False, without waiting, if the binary is currently in use.
+    """
+    if sys.platform == "win32":
+        yield True
+        return
+    with _get_in_use_path(binary).open("a") as fp:
+        try:
+            fcntl.flock(fp, NON_BLOCKING)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
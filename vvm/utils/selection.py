@@ -0,0 +1,49 @@
+from typing import Dict, List, Union
+
+_Selection = Union[List[str], Dict[str, List[str]]]
+
+
+def _narrow_outputs(selected: List[str], fields: List[str]) -> List[str]:
+    outputs: List[str] = []
+    for field in fields:
+        if any(i == "*" or field == i or field.startswith(f"{i}.") for i in selected):
+            # the selection includes the whole field
+            outputs.append(field)
+        else:
+            # the selection includes only part of the field
+            outputs.extend(i for i in selected if i.startswith(f"{field}."))
+    return list(dict.fromkeys(outputs))
+
+
+def narrow_output_selection(output_selection: Dict[str, _Selection], fields: List[str]) -> Dict:
+    """
+    Reduce a standard JSON `outputSelection` to the given output fields.
+
+    Outputs that are not in `fields` are removed, so that the compiler does not
+    generate them. Fields that were not selected are not added.
+
+    Arguments
+    ---------
+    output_selection : Dict
+        `settings.outputSelection` of a standard JSON input, mapping source paths
+        (or `*`) to lists of outputs, or to mappings of contract names to lists.
+    fields : List
+        Outputs that are used, e.g. `["abi", "evm.bytecode.object"]`.
+
+    Returns
+    -------
+    Dict
+        Narrowed output selection. Sources without any remaining outputs are removed.
+    """
+    narrowed: Dict[str, _Selection] = {}
+    for path, selection in output_selection.items():
+        if isinstance(selection, dict):
+            contracts = {k: _narrow_outputs(v, fields) for k, v in selection.items()}
+            contracts = {k: v for k, v in contracts.items() if v}
+            if contracts:
+                narrowed[path] = contracts
+        else:
+            outputs = _narrow_outputs(selection, fields)
+            if outputs:
+                narrowed[path] = outputs
+    return narrowed
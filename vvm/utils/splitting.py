@@ -0,0 +1,362 @@
+import posixpath
+import re
+from typing import Any, Dict, List, Optional, Set
+
+# `import a.b.c as d` and `from a.b import c, d` statements, including relative imports
+IMPORT_REGEX = re.compile(r"^[ \t]*import[ \t]+([\w.]+)", re.MULTILINE)
+FROM_IMPORT_REGEX = re.compile(
+    r"^[ \t]*from[ \t]+(\.*[\w.]*)[ \t]+import[ \t]+\(?([\w \t,\\\n]+?)\)?[ \t]*(?:#.*)?$",
+    re.MULTILINE,
+)
+
+# modules that ship with the compiler
+BUILTIN_MODULES = ("vyper", "ethereum")
+
+SOURCE_SUFFIXES = (".vy", ".vyi", ".json")
+
+# outputs that only need a source to be parsed. vyper 0.4 analyses a source for
+# any other output, which loads its imports and gives them source ids
+PARSE_OUTPUTS = ("ast",)
+
+
+def _selection_for(output_selection: Dict, path: str) -> Optional[Any]:
+    # returns the output selection that applies to a source, or `None` if it is not selected
+    if path in output_selection:
+        return output_selection[path]
+    return output_selection.get("*")
+
+
+def _loads_imports(selection: Any) -> Optional[bool]:
+    # whether compiling a source with this selection loads its imports, or `None` if unknown
+    if isinstance(selection, str):
+        selection = [selection]
+    if not isinstance(selection, list) or not selection:
+        return None
+    return any(i not in PARSE_OUTPUTS for i in selection)
+
+
+def _has_annotated_ast(selection: Any) -> bool:
+    if isinstance(selection, str):
+        selection = [selection]
+    return "*" in selection or "annotated_ast" in selection
+
+
+def _with_annotated_ast(selection: Any) -> List:
+    if isinstance(selection, str):
+        selection = [selection]
+    return selection if _has_annotated_ast(selection) else [*selection, "annotated_ast"]
+
+
+def _target_order(input_data: Dict) -> List[str]:
+    # vyper 0.4 compiles the selected sources in the order of the output
+    # selection, where `*` stands for every source in input order
+    sources = input_data.get("sources", {})
+    output_selection = input_data.get("settings", {}).get("outputSelection", {})
+    order: Dict[str, None] = {}
+    for key in output_selection:
+        for path in sources if key == "*" else [key]:
+            if path in sources:
+                order.setdefault(path)
+    return list(order)
+
+
+def _module_candidates(module: str, importer: str, search_paths: List[str]) -> List[str]:
+    level = len(module) - len(module.lstrip("."))
+    name = module[level:].replace(".", "/")
+    if level:
+        base = posixpath.dirname(importer)
+        for _ in range(level - 1):
+            base = posixpath.dirname(base)
+        bases = [base]
+    else:
+        bases = search_paths
+    candidates: List[str] = []
+    for base in bases:
+        path = posixpath.normpath(posixpath.join(base, name)) if name else posixpath.normpath(base)
+        candidates.extend(path + suffix for suffix in SOURCE_SUFFIXES)
+    return candidates
+
+
+def get_imported_modules(content: str) -> List[List[str]]:
+    """
+    Return the modules imported by a Vyper source.
+
+    Each item is a list of the possible module names for one import, because
+    `from a import b` may import the module `a.b` or a member of the module `a`.
+    Relative imports keep their leading dots.
+    """
+    modules = [[module] for module in IMPORT_REGEX.findall(content)]
+    for module, names in FROM_IMPORT_REGEX.findall(content):
+        for name in names.replace("\\", " ").split(","):
+            name = name.split()[0] if name.split() else ""
+            if name:
+                # `from a import b` imports either the module `a/b` or a member of `a`
+                joined = f"{module}.{name}" if module.strip(".") else module + name
+                modules.append([joined, module])
+    return modules
+
+
+def _get_imports(
+    path: str, content: str, sources: Set[str], search_paths: List[str]
+) -> Optional[Set[str]]:
+    # returns the sources imported by `path`, or `None` if an import cannot be resolved
+    imports: Set[str] = set()
+    for options in get_imported_modules(content):
+        for module in options:
+            found = [i for i in _module_candidates(module, path, search_paths) if i in sources]
+            if found:
+                imports.add(found[0])
+                break
+        else:
+            if options[0].split(".")[0] not in BUILTIN_MODULES:
+                return None
+    return imports
+
+
+def split_standard_input(input_data: Dict, source_ids: bool = False) -> List[Dict]:
+    """
+    Split a standard JSON input into one input per selected source.
+
+    Each input holds a single source in its `outputSelection`, along with the
+    sources it imports, directly or indirectly. If the imports of a source
+    cannot be resolved, its input keeps all of the sources.
+
+    Arguments
+    ---------
+    input_data : Dict
+        Compiler JSON input.
+    source_ids : bool, optional
+        If True, each input also selects the annotated AST of its source, and of
+        the other `.vy` sources that it holds, after its own source. The ASTs
+        give the source id of every loaded file, which `merge_standard_output`
+        needs to renumber the outputs of vyper 0.4.0 and later.
+
+    Returns
+    -------
+    List
+        Compiler JSON inputs, in the order of `input_data["sources"]`. A single
+        input with the original data is returned if there is nothing to split.
+    """
+    sources: Dict = input_data.get("sources", {})
+    settings: Dict = input_data.get("settings", {})
+    output_selection = settings.get("outputSelection", {})
+    search_paths = [posixpath.normpath(i) for i in settings.get("search_paths", ["."])]
+    if "." not in search_paths:
+        search_paths.append(".")
+
+    targets = [i for i in sources if _selection_for(output_selection, i) is not None]
+    if len(targets) < 2:
+        return [input_data]
+
+    source_paths = set(sources)
+    imports: Dict[str, Optional[Set[str]]] = {}
+    for path, source in sources.items():
+        content = source.get("content")
+        if content is None:
+            imports[path] = None
+        else:
+            imports[path] = _get_imports(path, content, source_paths, search_paths)
+
+    inputs = []
+    for target in targets:
+        required = {target}
+        pending = [target]
+        while pending:
+            found = imports[pending.pop()]
+            if found is None:
+                required = source_paths
+                break
+            pending.extend(found - required)
+            required |= found
+
+        target_selection = _selection_for(output_selection, target)
+        selection = {target: target_selection}
+        if source_ids and _loads_imports(target_selection):
+            # sources selected after the target do not change the ids of the files
+            # that the target loads
+            selection[target] = _with_annotated_ast(target_selection)
+            for path in sources:
+                if path in required and path != target and path.endswith(".vy"):
+                    selection[path] = ["annotated_ast"]
+        sub_settings = dict(settings, outputSelection=selection)
+        sub_input = dict(input_data, settings=sub_settings)
+        sub_input["sources"] = {k: v for k, v in sources.items() if k in required}
+        inputs.append(sub_input)
+    return inputs
+
+
+def _remap_pos_map(pos_map: str, mapping: Dict[int, int]) -> str:
+    # compressed source maps are `start:length:source_id:jump` entries split by `;`,
+    # where empty fields repeat the previous entry and -1 is no source
+    entries = []
+    for entry in pos_map.split(";"):
+        fields = entry.split(":")
+        if len(fields) > 2 and fields[2] not in ("", "-1"):
+            fields[2] = str(mapping.get(int(fields[2]), int(fields[2])))
+        entries.append(":".join(fields))
+    return ";".join(entries)
+
+
+def _remap_source_ids(value: Any, mapping: Dict[int, int], paths: Set[str]) -> None:
+    # rewrites the source ids found in ASTs and source maps, in place. modules that
+    # ship with the compiler are numbered separately, and are not in `paths`.
+    if isinstance(value, list):
+        for item in value:
+            _remap_source_ids(item, mapping, paths)
+    elif isinstance(value, dict):
+        builtin = "resolved_path" in value and value["resolved_path"] not in paths
+        for key, item in value.items():
+            if key == "source_id" and isinstance(item, int):
+                if not builtin:
+                    value[key] = mapping.get(item, item)
+            elif key == "src" and isinstance(item, str) and item.count(":") == 2:
+                start, length, source_id = item.split(":")
+                value[key] = f"{start}:{length}:{mapping.get(int(source_id), int(source_id))}"
+            elif key == "pc_ast_map" and isinstance(item, dict):
+                for pc, node in item.items():
+                    if isinstance(node, list) and node:
+                        item[pc] = [mapping.get(node[0], node[0]), *node[1:]]
+            elif key in ("sourceMap", "pc_pos_map_compressed") and isinstance(item, str):
+                value[key] = _remap_pos_map(item, mapping)
+            else:
+                _remap_source_ids(item, mapping, paths)
+
+
+def _collect_import_ids(value: Any, found: Dict[str, int]) -> None:
+    # the import info of each import in an annotated AST gives the path and
+    # source id of the imported file
+    if isinstance(value, list):
+        for item in value:
+            _collect_import_ids(item, found)
+    elif isinstance(value, dict):
+        info = value.get("import_info")
+        if (
+            isinstance(info, dict)
+            and isinstance(info.get("resolved_path"), str)
+            and isinstance(info.get("source_id"), int)
+        ):
+            found.setdefault(info["resolved_path"], info["source_id"])
+        for item in value.values():
+            _collect_import_ids(item, found)
+
+
+def _is_vyper_04(outputs: List[Dict]) -> bool:
+    compiler = next((i["compiler"] for i in outputs if "compiler" in i), "")
+    match = re.search(r"(\d+)\.(\d+)\.(\d+)", compiler)
+    return match is not None and tuple(int(i) for i in match.groups()) >= (0, 4, 0)
+
+
+def _get_source_ids(input_data: Dict, inputs: List[Dict], outputs: List[Dict]) -> List[Dict]:
+    # returns, for each output, the mapping of its source ids to those of a single
+    # compile. raises `ValueError` if the ids cannot be derived from the outputs.
+    paths = input_data.get("sources", {})
+    output_selection = input_data.get("settings", {}).get("outputSelection", {})
+    found: List[Dict[str, int]] = []
+    for sub_input, output in zip(inputs, outputs):
+        ids = {
+            path: data["id"]
+            for path, data in output.get("sources", {}).items()
+            if isinstance(data, dict) and isinstance(data.get("id"), int)
+        }
+        _collect_import_ids(output.get("sources", {}), ids)
+        found.append({k: v for k, v in ids.items() if k in paths})
+
+    if not _is_vyper_04(outputs):
+        # before 0.4.0, every source is compiled, and sources are numbered in sorted order
+        source_ids = {path: i for i, path in enumerate(sorted(paths))}
+        for sub_input, ids in zip(inputs, found):
+            if set(sub_input["sources"]) - set(ids):
+                raise ValueError("Source ids are missing from the split output")
+    else:
+        # from 0.4.0, files are numbered as they are loaded. each selected source is
+        # loaded in turn, followed by its imports if the selected outputs need them
+        targets = {next(iter(i["settings"]["outputSelection"])): n for n, i in enumerate(inputs)}
+        source_ids = {}
+        for target in _target_order(input_data):
+            ids = found[targets[target]]
+            loads_imports = _loads_imports(_selection_for(output_selection, target))
+            if loads_imports is None or target not in ids:
+                raise ValueError(f"Cannot derive the source ids loaded by {target}")
+            if loads_imports:
+                if set(inputs[targets[target]]["sources"]) - set(ids):
+                    raise ValueError(f"Cannot derive the source ids loaded by {target}")
+                loaded = sorted(ids, key=ids.__getitem__)
+            else:
+                loaded = [target]
+            for path in loaded:
+                source_ids.setdefault(path, len(source_ids))
+
+    return [{v: source_ids[k] for k, v in ids.items() if k in source_ids} for ids in found]
+
+
+def merge_standard_output(input_data: Dict, outputs: List[Dict]) -> Dict:
+    """
+    Merge the outputs of inputs created with `split_standard_input`.
+
+    Each source is taken from the output of its own input. Source ids are
+    renumbered in the `sources` output, ASTs and source maps, to the ids of a
+    single compile of `input_data`. For vyper 0.4.0 and later, the inputs must
+    have been split with `source_ids=True`, and the annotated ASTs that were
+    added for this are removed. Duplicate errors and warnings are removed.
+
+    Arguments
+    ---------
+    input_data : Dict
+        Original compiler JSON input.
+    outputs : List
+        Compiler JSON outputs, one for each split input. The outputs are
+        modified in place.
+
+    Returns
+    -------
+    Dict
+        Compiler JSON output, in the same format as for the original input.
+
+    Raises
+    ------
+    ValueError
+        If the source ids of a single compile cannot be derived from the outputs,
+        e.g. because an output has errors.
+    """
+    inputs = split_standard_input(input_data)
+    if len(inputs) != len(outputs):
+        raise ValueError("Expected one output for each split input")
+    mappings = _get_source_ids(input_data, inputs, outputs)
+    paths = set(input_data.get("sources", {}))
+    output_selection = input_data.get("settings", {}).get("outputSelection", {})
+
+    merged: Dict = {}
+    contracts: Dict = {}
+    sources: Dict = {}
+    errors: List = []
+
+    for sub_input, output, mapping in zip(inputs, outputs, mappings):
+        target = next(iter(sub_input["settings"]["outputSelection"]))
+        selection = _selection_for(output_selection, target)
+        # only the output of the target is kept, without the outputs added for source ids
+        target_sources = {k: v for k, v in output.get("sources", {}).items() if k == target}
+        target_contracts = {k: v for k, v in output.get("contracts", {}).items() if k == target}
+        for data in target_sources.values():
+            if isinstance(data, dict) and not _has_annotated_ast(selection or []):
+                data.pop("annotated_ast", None)
+        _remap_source_ids(target_sources, mapping, paths)
+        _remap_source_ids(target_contracts, mapping, paths)
+        for path, data in target_sources.items():
+            if isinstance(data, dict) and "id" in data:
+                data["id"] = mapping.get(data["id"], data["id"])
+            sources[path] = data
+        contracts.update(target_contracts)
+        for error in output.get("errors", []):
+            if error not in errors:
+                errors.append(error)
+        for key, value in output.items():
+            if key not in ("contracts", "sources", "errors"):
+                merged.setdefault(key, value)
+
+    if contracts:
+        merged["contracts"] = {k: contracts[k] for k in sorted(contracts)}
+    if sources:
+        merged["sources"] = {k: sources[k] for k in sorted(sources)}
+    if errors:
+        merged["errors"] = errors
+    return merged
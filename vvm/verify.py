@@ -0,0 +1,239 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+
+from vvm.contract import _decode_hex
+from vvm.install import LOGGER, get_executable, get_installed_vyper_versions
+from vvm.main import compile_source
+from vvm.utils.convert import to_vyper_version
+from vvm.utils.versioning import detect_version_specifier_set
+
+# EVM versions tried by `verify_bytecode`. `None` is the compiler default.
+EVM_VERSIONS = (None, "cancun", "shanghai", "paris", "london", "berlin", "istanbul")
+
+
+class VerificationResult(NamedTuple):
+    """
+    Compiler settings that reproduce a deployed runtime bytecode.
+    """
+
+    version: Version
+    evm_version: Optional[str]
+    metadata_match: bool
+    immutables: bytes
+    output: Dict
+
+
+def _decode_cbor(data: bytes, offset: int = 0) -> Tuple[Any, int]:
+    # minimal CBOR decoder for the types used in vyper metadata. returns the
+    # decoded value and the offset of the next item.
+    major, info = data[offset] >> 5, data[offset] & 0x1F
+    offset += 1
+    if info < 24:
+        value = info
+    elif info <= 27:
+        size = 1 << (info - 24)
+        if offset + size > len(data):
+            raise ValueError("Truncated CBOR data")
+        value = int.from_bytes(data[offset : offset + size], "big")
+        offset += size
+    else:
+        raise ValueError("Unsupported CBOR length")
+
+    if major == 0:
+        return value, offset
+    if major in (2, 3):
+        if offset + value > len(data):
+            raise ValueError("Truncated CBOR data")
+        raw = data[offset : offset + value]
+        return (raw if major == 2 else raw.decode()), offset + value
+    if major == 4:
+        items = []
+        for _ in range(value):
+            item, offset = _decode_cbor(data, offset)
+            items.append(item)
+        return items, offset
+    if major == 5:
+        mapping = {}
+        for _ in range(value):
+            key, offset = _decode_cbor(data, offset)
+            mapping[key], offset = _decode_cbor(data, offset)
+        return mapping, offset
+    if major == 7 and info in (20, 21, 22):
+        return {20: False, 21: True, 22: None}[info], offset
+    raise ValueError(f"Unsupported CBOR type {major}")
+
+
+def split_metadata(bytecode: Union[str, bytes]) -> Tuple[bytes, Optional[Any]]:
+    """
+    Split the CBOR metadata appended by `vyper` from a bytecode.
+
+    The metadata ends with its length as a two byte integer. Versions before
+    0.3.10 append it to the runtime bytecode, later versions only to the
+    deployment bytecode, where it also includes the size of the immutables.
+
+    Arguments
+    ---------
+    bytecode : str | bytes
+        Bytecode, as bytes or a hex string.
+
+    Returns
+    -------
+    bytes
+        Bytecode without the metadata.
+    Any
+        Decoded metadata, or `None` if the bytecode has no metadata.
+    """
+    code = _decode_hex(bytecode)
+    if len(code) < 2:
+        return code, None
+    length = int.from_bytes(code[-2:], "big")
+    # since 0.3.10 the length includes the two length bytes
+    for start in (len(code) - length - 2, len(code) - length):
+        if length < 2 or start < 0:
+            continue
+        try:
+            metadata, end = _decode_cbor(code, start)
+        except (ValueError, IndexError, UnicodeDecodeError):
+            continue
+        if end == len(code) - 2 and _has_version(metadata):
+            return code[:start], metadata
+    return code, None
+
+
+def _has_version(metadata: Any) -> bool:
+    if isinstance(metadata, list) and metadata:
+        metadata = metadata[-1]
+    return isinstance(metadata, dict) and "vyper" in metadata
+
+
+def _immutables_size(bytecode: bytes) -> Optional[int]:
+    # since 0.3.10 the deployment metadata includes the size of the immutables
+    _, metadata = split_metadata(bytecode)
+    if isinstance(metadata, list) and len(metadata) >= 2 and isinstance(metadata[-2], int):
+        return metadata[-2]
+    return None
+
+
+def _check_immutables(extra: bytes, immutables_size: Optional[int]) -> bool:
+    if immutables_size is None:
+        return len(extra) % 32 == 0
+    return len(extra) == immutables_size
+
+
+def _match(target: bytes, runtime: bytes, bytecode: bytes) -> Optional[Tuple[bool, bytes]]:
+    # returns (metadata_match, immutables) if `target` is `runtime` deployed
+    immutables_size = _immutables_size(bytecode)
+    if target.startswith(runtime):
+        extra = target[len(runtime) :]
+        if _check_immutables(extra, immutables_size):
+            return True, extra
+
+    code, metadata = split_metadata(runtime)
+    if metadata is None or not target.startswith(code):
+        return None
+    # same code, but different metadata
+    metadata_size = len(runtime) - len(code)
+    rest = target[len(code) :]
+    other_code, other_metadata = split_metadata(rest[:metadata_size])
+    extra = rest[metadata_size:]
+    if other_metadata is None or other_code or not _check_immutables(extra, immutables_size):
+        return None
+    return False, extra
+
+
+def _verify_one(
+    source: str, target: bytes, version: Version, evm_version: Optional[str]
+) -> Optional[VerificationResult]:
+    try:
+        vyper_binary = get_executable(version)
+        output = compile_source(source, evm_version=evm_version, vyper_binary=vyper_binary)
+    except Exception as exc:
+        LOGGER.debug(f"Cannot compile with vyper {version} and evm version {evm_version}: {exc}")
+        return None
+
+    data = output["<stdin>"]
+    result = _match(target, _decode_hex(data["bytecode_runtime"]), _decode_hex(data["bytecode"]))
+    if result is None:
+        return None
+    return VerificationResult(version, evm_version, result[0], result[1], data)
+
+
+def verify_bytecode(
+    source: str,
+    runtime_bytecode: Union[str, bytes],
+    versions: Union[SpecifierSet, Iterable[Union[str, Version]], None] = None,
+    evm_versions: Optional[Iterable[Optional[str]]] = None,
+    max_workers: Optional[int] = None,
+) -> Optional[VerificationResult]:
+    """
+    Find the compiler version and EVM version that produce a deployed bytecode.
+
+    Candidates are compiled in parallel with explicit binaries, and the search
+    stops at the first exact match. Values of immutable variables appended to
+    the deployed bytecode are ignored. If no candidate matches exactly, a
+    candidate that only differs in the CBOR metadata is returned.
+
+    Arguments
+    ---------
+    source : str
+        Vyper contract to be verified.
+    runtime_bytecode : str | bytes
+        Deployed runtime bytecode, as bytes or a hex string.
+    versions : SpecifierSet | List, optional
+        Versions to try. A `SpecifierSet` selects all matching installed versions.
+        If not given, the specifier from the pragma of `source` is used, or all
+        installed versions if the source has no pragma.
+    evm_versions : List, optional
+        EVM versions to try with each version. A value of `None` uses the compiler
+        default. Defaults to `EVM_VERSIONS`.
+    max_workers : int, optional
+        Maximum number of concurrent compiles. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    VerificationResult
+        Matching settings and compiler output, or `None` if no candidate matches.
+    """
+    target = _decode_hex(runtime_bytecode)
+    if versions is None:
+        versions = detect_version_specifier_set(source) or SpecifierSet()
+    if isinstance(versions, SpecifierSet):
+        version_list = list(versions.filter(get_installed_vyper_versions(), prereleases=True))
+    else:
+        version_list = sorted((to_vyper_version(i) for i in versions), reverse=True)
+
+    jobs = [(v, e) for v in version_list for e in (evm_versions or EVM_VERSIONS)]
+    partial: List[Tuple[int, VerificationResult]] = []
+    exact: Optional[Tuple[int, VerificationResult]] = None
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        futures: Dict[Future, int] = {
+            executor.submit(_verify_one, source, target, v, e): i for i, (v, e) in enumerate(jobs)
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                result = future.result()
+                if result is None:
+                    continue
+                if not result.metadata_match:
+                    partial.append((futures[future], result))
+                elif exact is None or futures[future] < exact[0]:
+                    exact = (futures[future], result)
+            if exact is not None:
+                # an exact match earlier in the search order may still be running,
+                # so only the later candidates are cancelled
+                for future in [i for i in pending if futures[i] > exact[0]]:
+                    if future.cancel():
+                        pending.discard(future)
+
+    if exact is not None:
+        return exact[1]
+    # prefer the candidate that comes first in the search order
+    return min(partial, key=lambda i: i[0])[1] if partial else None
@@ -0,0 +1,105 @@
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Union
+
+from packaging.version import Version
+
+from vvm import wrapper
+from vvm.install import LOGGER, get_executable
+from vvm.utils.convert import to_vyper_version
+from vvm.utils.versioning import _pick_vyper_version, detect_version_specifier_set
+
+_READ_CHUNK_SIZE = 2**20
+
+
+def _versions_from_sources(source_tree: Union[Path, str]) -> Set[Version]:
+    # installed versions that satisfy the pragmas of all contracts in a directory
+    versions = set()
+    for path in Path(source_tree).rglob("*.vy"):
+        try:
+            specifier_set = detect_version_specifier_set(path.read_text())
+            if specifier_set is not None:
+                versions.add(_pick_vyper_version(specifier_set, check_installable=False))
+        except Exception as exc:
+            LOGGER.debug(f"Cannot detect vyper version for {path}: {exc}")
+    return versions
+
+
+def _warm_up_version(version: Version, compile_empty: bool) -> Optional[Version]:
+    try:
+        vyper_binary = get_executable(version)
+        # read the binary once so that it is in the page cache
+        with vyper_binary.open("rb") as fp:
+            while fp.read(_READ_CHUNK_SIZE):
+                pass
+        wrapper._get_vyper_version(vyper_binary)
+        if compile_empty:
+            # calls the wrapper directly, so that the compile is not recorded by
+            # the compile history, artifact index, trace or remote cache
+            with tempfile.NamedTemporaryFile(suffix=".vy", prefix="vyper-") as source_file:
+                wrapper.vyper_wrapper(
+                    vyper_binary=vyper_binary,
+                    source_files=[source_file.name],
+                    f="bytecode",
+                    record=False,
+                )
+    except Exception as exc:
+        LOGGER.warning(f"Failed to warm up vyper {version}: {exc}")
+        return None
+    LOGGER.debug(f"Warmed up vyper {version}")
+    return version
+
+
+def warm_up(
+    versions: Optional[Iterable[Union[str, Version]]] = None,
+    source_tree: Union[Path, str] = None,
+    compile_empty: bool = True,
+    wait: bool = False,
+) -> "Future[List[Version]]":
+    """
+    Pre-load `vyper` binaries so that later compiles do not pay cold-start costs.
+
+    For each version, the binary is read into the OS page cache, its version is
+    queried (populating the version cache used by `vvm`) and, optionally, an
+    empty contract is compiled. Warm-up runs in background threads and is best
+    effort: failures are logged and otherwise ignored.
+
+    Arguments
+    ---------
+    versions : List, optional
+        Installed `vyper` versions to warm up.
+    source_tree : Path | str, optional
+        Directory to search for `.vy` files. The installed versions that satisfy
+        their pragmas are warmed up in addition to `versions`.
+    compile_empty : bool, optional
+        If True, also compile an empty contract with each version.
+    wait : bool, optional
+        If True, block until warm-up has finished.
+
+    Returns
+    -------
+    Future
+        Resolves to a list of the versions that were successfully warmed up.
+    """
+    future: "Future[List[Version]]" = Future()
+    version_list = {to_vyper_version(i) for i in versions or []}
+
+    def run() -> None:
+        try:
+            if source_tree is not None:
+                version_list.update(_versions_from_sources(source_tree))
+            with ThreadPoolExecutor(max(len(version_list), 1)) as executor:
+                results = executor.map(
+                    _warm_up_version, sorted(version_list), [compile_empty] * len(version_list)
+                )
+            future.set_result([i for i in results if i is not None])
+        except Exception as exc:
+            future.set_exception(exc)
+
+    if wait:
+        run()
+    else:
+        threading.Thread(target=run, daemon=True).start()
+    return future
@@ -1,14 +1,34 @@
+import itertools
+import os
+import signal
 import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from packaging.version import Version
 
-from vvm import install
-from vvm.exceptions import UnknownOption, UnknownValue, VyperError
+from vvm import install, scheduler, trace
+from vvm.exceptions import (
+    UnknownOption,
+    UnknownValue,
+    VyperError,
+    VyperResourceError,
+    VyperTimeoutError,
+)
 from vvm.utils.convert import to_vyper_version
+from vvm.utils.lock import binary_in_use
+
+try:
+    import resource
+except ImportError:
+    resource = None  # type: ignore
 
 _version_cache: Dict[str, Version] = {}
+_version_locks: Dict[str, threading.Lock] = {}
+_version_locks_lock = threading.Lock()
 
 
 def _get_vyper_version(vyper_binary: Union[Path, str]) -> Version:
@@ -16,10 +36,15 @@ def _get_vyper_version(vyper_binary: Union[Path, str]) -> Version:
     cache_key = str(vyper_binary)
 
     if cache_key not in _version_cache:
-        # cache the version info, because vyper binaries can be slow to load
-        stdout_data = subprocess.check_output([vyper_binary, "--version"], encoding="utf8")
-        version_str = stdout_data.split("+")[0]
-        _version_cache[cache_key] = to_vyper_version(version_str)
+        # one lock per binary, so that concurrent callers only query each binary once
+        with _version_locks_lock:
+            lock = _version_locks.setdefault(cache_key, threading.Lock())
+        with lock:
+            if cache_key not in _version_cache:
+                # cache the version info, because vyper binaries can be slow to load
+                stdout_data = subprocess.check_output([vyper_binary, "--version"], encoding="utf8")
+                version_str = stdout_data.split("+")[0]
+                _version_cache[cache_key] = to_vyper_version(version_str)
 
     return _version_cache[cache_key]
 
@@ -35,12 +60,87 @@ def _to_string(key: str, value: Any) -> str:
         raise TypeError(f"Invalid type for {key}: {type(value)}")
 
 
+# applies resource limits and then replaces itself with the `vyper` command.
+# used where `resource.prlimit` is not available, e.g. on macOS
+_LIMIT_SCRIPT = """
+import os, resource, sys
+cpu_time_limit, memory_limit = (int(i) if i else None for i in sys.argv[1:3])
+if cpu_time_limit is not None:
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_limit, cpu_time_limit + 1))
+if memory_limit is not None:
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+os.execvp(sys.argv[3], sys.argv[3:])
+"""
+
+
+def _limit_command(
+    command: List, cpu_time_limit: Optional[int], memory_limit: Optional[int]
+) -> List:
+    # returns the command to spawn. limits are not applied with `preexec_fn`,
+    # which is not safe to use when other threads are running
+    if cpu_time_limit is None and memory_limit is None:
+        return command
+    if resource is None:
+        raise OSError(f"Resource limits are not supported on {sys.platform}")
+    if hasattr(resource, "prlimit"):
+        # applied by `_apply_limits` once the process has started
+        return command
+    limits = [str(i) if i is not None else "" for i in (cpu_time_limit, memory_limit)]
+    return [sys.executable, "-c", _LIMIT_SCRIPT, *limits, *(str(i) for i in command)]
+
+
+def _apply_limits(
+    proc: subprocess.Popen, cpu_time_limit: Optional[int], memory_limit: Optional[int]
+) -> None:
+    # applies resource limits to a running process, where `resource.prlimit` is available
+    if resource is None or not hasattr(resource, "prlimit"):
+        return
+    try:
+        if cpu_time_limit is not None:
+            # SIGXCPU at the soft limit, SIGKILL one second later
+            resource.prlimit(proc.pid, resource.RLIMIT_CPU, (cpu_time_limit, cpu_time_limit + 1))
+        if memory_limit is not None:
+            resource.prlimit(proc.pid, resource.RLIMIT_AS, (memory_limit, memory_limit))
+    except ProcessLookupError:
+        # the process has already exited
+        pass
+
+
+def _kill_process_group(proc: subprocess.Popen) -> None:
+    # vyper binaries may spawn child processes of their own, so the whole
+    # process group is killed rather than only the direct child
+    if proc.poll() is not None:
+        return
+    if sys.platform == "win32":
+        proc.kill()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _is_resource_error(
+    return_code: int, stderrdata: str, cpu_time_limit: Optional[int], memory_limit: Optional[int]
+) -> bool:
+    if cpu_time_limit is not None and return_code in (
+        -signal.SIGKILL,
+        -getattr(signal, "SIGXCPU", 0),
+    ):
+        return True
+    return memory_limit is not None and "MemoryError" in stderrdata
+
+
 def vyper_wrapper(
     vyper_binary: Union[Path, str] = None,
     stdin: str = None,
     source_files: Union[List, Path, str] = None,
     success_return_code: int = 0,
     paths: Optional[List[Union[Path, str]]] = None,
+    timeout: Optional[float] = None,
+    cpu_time_limit: Optional[int] = None,
+    memory_limit: Optional[int] = None,
+    record: bool = True,
     **kwargs: Any,
 ) -> Tuple[str, str, List, subprocess.Popen]:
     """
@@ -56,6 +156,17 @@ def vyper_wrapper(
         Path or list of paths of source files to compile
     success_return_code : int, optional
         Expected exit code. Raises `VyperError` if the process returns a different value.
+    timeout : float, optional
+        Wall-clock time limit in seconds. If exceeded, the process and all of its
+        children are killed and `VyperTimeoutError` is raised.
+    cpu_time_limit : int, optional
+        CPU time limit in seconds, applied to the process via `setrlimit`. Not
+        available on Windows.
+    memory_limit : int, optional
+        Address space limit in bytes, applied to the process via `setrlimit`. Not
+        available on Windows.
+    record : bool, optional
+        If False, the call is not recorded by `vvm.trace`.
 
     Keyword Arguments
     -----------------
@@ -116,17 +227,60 @@ def vyper_wrapper(
     if stdin is not None:
         stdin = str(stdin)
 
-    proc = subprocess.Popen(
-        command,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        encoding="utf8",
-    )
+    popen_command = _limit_command(command, cpu_time_limit, memory_limit)
+    # held until the compile finishes, so that `vvm.prune` does not remove the binary
+    with binary_in_use(vyper_binary):
+        for attempt in itertools.count():
+            with scheduler._admit():
+                proc = subprocess.Popen(
+                    popen_command,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    encoding="utf8",
+                    start_new_session=sys.platform != "win32",
+                )
+                try:
+                    _apply_limits(proc, cpu_time_limit, memory_limit)
+                except BaseException:
+                    _kill_process_group(proc)
+                    proc.wait()
+                    raise
+
+                start = time.perf_counter()
+                try:
+                    stdoutdata, stderrdata = proc.communicate(stdin, timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    _kill_process_group(proc)
+                    stdoutdata, stderrdata = proc.communicate()
+                    raise VyperTimeoutError(
+                        f"Compilation did not finish within {timeout} seconds",
+                        command=command,
+                        return_code=proc.returncode,
+                        stdin_data=stdin,
+                        stdout_data=stdoutdata,
+                        stderr_data=stderrdata,
+                    )
+                except BaseException:
+                    _kill_process_group(proc)
+                    proc.wait()
+                    raise
+                duration = time.perf_counter() - start
+            if not scheduler._retry(proc.returncode, cpu_time_limit, attempt):
+                break
 
-    stdoutdata, stderrdata = proc.communicate(stdin)
+    if record:
+        trace._record(version, command, stdin, source_files, duration, proc.returncode, stdoutdata)
 
     if proc.returncode != success_return_code:
+        if _is_resource_error(proc.returncode, stderrdata, cpu_time_limit, memory_limit):
+            raise VyperResourceError(
+                command=command,
+                return_code=proc.returncode,
+                stdin_data=stdin,
+                stdout_data=stdoutdata,
+                stderr_data=stderrdata,
+            )
         if stderrdata.startswith("unrecognised option"):
             # unrecognised option '<FLAG>'
             flag = stderrdata.split("'")[1]